@@ -4,20 +4,31 @@ DieCastTracker - FastAPI Web Application
 Hot Wheels Collection Management System - Web Interface
 """
 
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, HTTPException, Query
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from pydantic import BaseModel
 import pandas as pd
+import numpy as np
 import os
 from typing import List, Dict, Any, Optional
 import uvicorn
-from openpyxl import load_workbook
 import sys
 import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'series-management'))
-from utils.backup_utils import create_backup
+from utils.backup_worker import get_backup_worker
+from utils.backup_catalog import list_table_backups, compare_table_backups, restore_table
+from utils.collection_store import load_collection, get_derived, loaded_version, table_changes, record_rows
+from utils.storage import COLLECTION, PREORDERS, SERIAL_COLUMN, ID_COLUMN, get_storage
+from utils.table_query import TableQuery
+from utils.compactor import start_compactor, stop_compactor
+from utils.write_queue import get_write_queue
+from utils.worker_pool import get_worker_pool
+from utils.json_response import FastJSONResponse, JSONPayload, dump_json, COMPRESS_MIN_BYTES, GZIP_LEVEL
+from utils.http_cache import make_etag, table_etag, etag_matches, not_modified, with_etag
+from utils.static_assets import AssetFiles, asset_url, precompress_assets
+from utils.change_events import get_change_events
 from series_config import SERIES_OPTIONS, SERIES_METADATA, get_all_series, get_subseries, get_series_info
 from collections import Counter
 from datetime import datetime
@@ -25,13 +36,22 @@ from datetime import datetime
 app = FastAPI(
     title="DieCast Tracker",
     description="Hot Wheels Collection Management System - Web Interface",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
+# Responses above the size threshold are gzip-compressed (unless they already are)
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=GZIP_LEVEL)
+
+# Directories served as static assets, by URL prefix
+ASSET_DIRECTORIES = {"/static": "static", "/pages": "pages"}
+
 # Mount static files and templates
-app.mount("/static", StaticFiles(directory="static"), name="static")
-app.mount("/pages", StaticFiles(directory="pages"), name="pages")
+for prefix, directory in ASSET_DIRECTORIES.items():
+    app.mount(prefix, AssetFiles(directory=directory), name=directory)
 templates = Jinja2Templates(directory="pages")
+# Templates link assets as {{ asset_url('/static/shared.css') }} so each URL changes with the file's content
+templates.env.globals["asset_url"] = lambda url: asset_url(url, ASSET_DIRECTORIES)
 
 # Path to the Excel file
 EXCEL_FILE_PATH = os.path.join("data", "HW_list.xlsx")
@@ -47,14 +67,24 @@ class NewCarModel(BaseModel):
     series: str
     subseries: str
 
-# Data model for updating cars
+# Data model for updating cars (rows are addressed by their record ID, not the displayed S.No)
 class UpdateCarModel(BaseModel):
-    serial_number: int
+    id: int
     updates: Dict[str, Any]  # Dictionary of field_name: new_value pairs
 
 # Data model for deleting cars
 class DeleteCarModel(BaseModel):
-    serial_number: int
+    id: int
+
+# Data models for bulk changes (each list is validated up front and saved in one write)
+class BulkAddModels(BaseModel):
+    models: List[NewCarModel]
+
+class BulkUpdateModels(BaseModel):
+    updates: List[UpdateCarModel]
+
+class BulkDeleteModels(BaseModel):
+    ids: List[int]
 
 # Data model for adding new field
 class AddFieldModel(BaseModel):
@@ -70,6 +100,19 @@ class PreorderModel(BaseModel):
     on_arrival_amount: Optional[float] = None
     delivery_status: Optional[str] = "Pending"
 
+class UpdatePreorderModel(BaseModel):
+    id: int
+    updates: Dict[str, Any]  # Dictionary of field_name: new_value pairs (API field names)
+
+class BulkAddPreorders(BaseModel):
+    preorders: List[PreorderModel]
+
+class BulkUpdatePreorders(BaseModel):
+    updates: List[UpdatePreorderModel]
+
+class BulkDeletePreorders(BaseModel):
+    ids: List[int]
+
 # Data model for series management
 class SeriesUpdateModel(BaseModel):
     main_series: str
@@ -91,6 +134,12 @@ class AddSeriesModel(BaseModel):
     price_range: str = None
     rarity: str = None
 
+# Data model for restoring a backup (by name, or the last one taken at or before "at")
+class RestoreBackupModel(BaseModel):
+    table: str = COLLECTION
+    name: Optional[str] = None
+    at: Optional[str] = None
+
 class SeriesMetadataModel(BaseModel):
     main_series: str
     description: str = None
@@ -99,18 +148,52 @@ class SeriesMetadataModel(BaseModel):
 
 
 def load_excel_data() -> pd.DataFrame:
-    """Load data from the Excel file"""
+    """Load the collection data (cached until it changes)"""
     try:
-        if os.path.exists(EXCEL_FILE_PATH):
-            df = pd.read_excel(EXCEL_FILE_PATH)
-            # Convert NaN values to empty strings for better JSON serialization
-            df = df.fillna("")
+        df = load_collection()
+        if df is not None:
             return df
         else:
-            raise FileNotFoundError(f"Excel file not found: {EXCEL_FILE_PATH}")
+            raise FileNotFoundError(f"Collection not found: {EXCEL_FILE_PATH}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading Excel file: {str(e)}")
 
+@app.on_event("startup")
+def start_background_compaction():
+    """Fold pending changes into the Excel files in the background while the server runs"""
+    start_compactor()
+
+@app.on_event("startup")
+def start_backup_worker():
+    """Take the Excel backups in the background, off the write path"""
+    get_backup_worker().start()
+
+@app.on_event("startup")
+def start_change_watcher():
+    """Watch for changes made outside the web app (Excel edits, the CLI) to push to the open pages"""
+    get_change_events().start()
+
+@app.on_event("startup")
+def compress_static_assets():
+    """Make the gzip/brotli copies of the static assets"""
+    try:
+        precompress_assets(ASSET_DIRECTORIES.values())
+    except Exception as e:
+        print(f"[WARNING] Could not compress static assets: {str(e)}")
+
+@app.on_event("shutdown")
+def export_excel_files():
+    """Write any pending changes back to the Excel files when the server stops"""
+    try:
+        get_write_queue().stop()
+        get_change_events().stop()
+        get_worker_pool().shutdown()
+        stop_compactor()
+        get_storage().export_all()
+        get_backup_worker().stop()
+    except Exception as e:
+        print(f"[ERROR] Error exporting Excel files: {str(e)}")
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page with the data table"""
@@ -126,33 +209,105 @@ async def add_field_page(request: Request):
     """Add field page"""
     return templates.TemplateResponse("add-field/add-field.html", {"request": request})
 
+def bulk_error_response(error_msg: str) -> FastJSONResponse:
+    """Error response for a bulk change (400 if the batch was rejected by validation)"""
+    invalid = any(text in error_msg for text in ("Invalid", "not found", "Unknown fields", "given"))
+    return FastJSONResponse(
+        status_code=400 if invalid else 500,
+        content={"success": False, "error": error_msg}
+    )
+
+def collection_page(limit, cursor, sort, q, filters) -> dict:
+    """Build the /api/data response body"""
+    df = load_excel_data()
+    query = get_derived(COLLECTION, "table_query", TableQuery)
+    
+    # Free-text search goes through the collection's search index
+    search_mask = None
+    if q:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'home'))
+        from home import get_search_index
+        
+        indexed_df, positions = get_search_index().search(q)
+        if indexed_df is query.df:
+            search_mask = np.zeros(len(indexed_df), dtype=bool)
+            search_mask[positions] = True
+    
+    data, total_matching, next_cursor = query.page(
+        limit=limit, cursor=cursor, sort=sort, filters=filters,
+        search=q if q and search_mask is None else "", mask=search_mask
+    )
+    
+    # Get column names (the record ID is sent with each row but is not a display column)
+    columns = [column for column in df.columns if column != ID_COLUMN]
+    
+    # Get basic statistics
+    total_records = len(df)
+    
+    response_data = {
+        "success": True,
+        "data": data,
+        "columns": columns,
+        "total_records": total_records,
+        "total_matching": total_matching,
+        "next_cursor": next_cursor,
+        "version": loaded_version(COLLECTION, df),
+        "message": f"Successfully loaded {len(data)} of {total_matching} records"
+    }
+    
+    return response_data
+
+def collection_page_response(limit, cursor, sort, q, filters, accept_encoding="") -> FastJSONResponse:
+    """Build the /api/data response (runs on the worker pool)"""
+    if limit is None and not cursor and not q and not filters and sort in (None, "", SERIAL_COLUMN):
+        # The whole collection is serialised (and compressed) once per version of the data and reused until it changes
+        payload = get_derived(
+            COLLECTION, "full_payload", lambda df: JSONPayload(dump_json(collection_page(None, None, None, "", {})))
+        )
+        if payload is not None:
+            return payload.response(accept_encoding)
+    return FastJSONResponse(content=collection_page(limit, cursor, sort, q, filters))
+
 @app.get("/api/data")
-async def get_data() -> JSONResponse:
-    """Get all Excel data as JSON"""
+async def get_data(request: Request, limit: Optional[int] = None, cursor: Optional[str] = None,
+                   sort: Optional[str] = None, q: str = "") -> FastJSONResponse:
+    """
+    Get the collection as JSON, optionally one page at a time
+    Query parameters: limit (page size), cursor (next_cursor from the previous page),
+    sort (column name, prefix with '-' for descending), q (free-text search) and
+    filter[<column>]=<text> for case-insensitive per-column filters.
+    Without a limit every matching row is returned.
+    """
     try:
-        df = load_excel_data()
-        
-        # Convert DataFrame to list of dictionaries
-        data = df.to_dict('records')
-        
-        # Get column names
-        columns = df.columns.tolist()
-        
-        # Get basic statistics
-        total_records = len(df)
-        
-        response_data = {
-            "success": True,
-            "data": data,
-            "columns": columns,
-            "total_records": total_records,
-            "message": f"Successfully loaded {total_records} records"
+        # Per-column filters arrive as filter[Column Name]=value
+        filters = {
+            key[len("filter["):-1]: value
+            for key, value in request.query_params.items()
+            if key.startswith("filter[") and key.endswith("]")
         }
         
-        return JSONResponse(content=response_data)
+        # Answer from the collection's version alone when the client already has this page
+        etag = await get_worker_pool().run(table_etag, "data", [COLLECTION], sorted(request.query_params.multi_items()))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = await get_worker_pool().run(
+            collection_page_response, limit, cursor, sort, q.strip(), filters, request.headers.get("accept-encoding", "")
+        )
+        return with_etag(response, etag)
     
+    except ValueError as e:
+        return FastJSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "data": [],
+                "columns": [],
+                "total_records": 0,
+                "message": f"Error: {str(e)}"
+            }
+        )
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "success": False,
@@ -163,82 +318,129 @@ async def get_data() -> JSONResponse:
             }
         )
 
+def collection_stats_response() -> FastJSONResponse:
+    """Build the /api/stats response (runs on the worker pool)"""
+    df = load_excel_data()
+    
+    columns = [column for column in df.columns if column != ID_COLUMN]
+    stats = {
+        "total_models": len(df),
+        "columns": columns,
+        "column_info": {}
+    }
+    
+    # Get information about each column
+    for col in columns:
+        if df[col].dtype == 'object':  # String columns
+            unique_values = df[col].value_counts()
+            stats["column_info"][col] = {
+                "type": "text",
+                "unique_values": len(unique_values),
+                "top_values": unique_values.head(5).to_dict() if len(unique_values) > 0 else {}
+            }
+        else:  # Numeric columns
+            stats["column_info"][col] = {
+                "type": "numeric",
+                "min": float(df[col].min()) if pd.notna(df[col].min()) else 0,
+                "max": float(df[col].max()) if pd.notna(df[col].max()) else 0,
+                "mean": float(df[col].mean()) if pd.notna(df[col].mean()) else 0
+            }
+    
+    return FastJSONResponse(content={"success": True, "stats": stats})
+
 @app.get("/api/stats")
-async def get_statistics() -> JSONResponse:
+async def get_statistics(request: Request) -> FastJSONResponse:
     """Get collection statistics"""
     try:
-        df = load_excel_data()
-        
-        stats = {
-            "total_models": len(df),
-            "columns": df.columns.tolist(),
-            "column_info": {}
-        }
-        
-        # Get information about each column
-        for col in df.columns:
-            if df[col].dtype == 'object':  # String columns
-                unique_values = df[col].value_counts()
-                stats["column_info"][col] = {
-                    "type": "text",
-                    "unique_values": len(unique_values),
-                    "top_values": unique_values.head(5).to_dict() if len(unique_values) > 0 else {}
-                }
-            else:  # Numeric columns
-                stats["column_info"][col] = {
-                    "type": "numeric",
-                    "min": float(df[col].min()) if pd.notna(df[col].min()) else 0,
-                    "max": float(df[col].max()) if pd.notna(df[col].max()) else 0,
-                    "mean": float(df[col].mean()) if pd.notna(df[col].mean()) else 0
-                }
-        
-        return JSONResponse(content={"success": True, "stats": stats})
+        etag = await get_worker_pool().run(table_etag, "stats", [COLLECTION])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return with_etag(await get_worker_pool().run(collection_stats_response), etag)
     
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
 @app.get("/api/dropdown-options")
-async def get_dropdown_options() -> JSONResponse:
+async def get_dropdown_options() -> FastJSONResponse:
     """Get dropdown options for series and their subseries"""
     try:
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "success": True,
             "series": SERIES_OPTIONS
         })
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
 @app.post("/api/add-model")
-async def add_new_model(model: NewCarModel) -> JSONResponse:
+async def add_new_model(model: NewCarModel) -> FastJSONResponse:
     """Add a new model to the Excel file"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'add-model'))
         from add_model import add_model
         
-        result = add_model(model.model_name, model.series, model.subseries)
-        return JSONResponse(content=result)
+        result = await get_write_queue().run(add_model, model.model_name, model.series, model.subseries)
+        return FastJSONResponse(content=result)
         
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
+@app.post("/api/models/bulk")
+async def add_models_bulk(bulk: BulkAddModels) -> FastJSONResponse:
+    """Add a list of models with one backup and one save"""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'add-model'))
+        from add_model import add_models
+        
+        result = await get_write_queue().run(add_models, [dict(model) for model in bulk.models])
+        return FastJSONResponse(content=result)
+    except Exception as e:
+        return bulk_error_response(str(e))
+
+@app.put("/api/models/bulk")
+async def update_models_bulk(bulk: BulkUpdateModels) -> FastJSONResponse:
+    """Update a list of models with one backup and one save"""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'home'))
+        from home import update_models
+        
+        if len({model.id for model in bulk.updates}) != len(bulk.updates):
+            raise Exception("Invalid updates: a record ID appears more than once")
+        updates = {model.id: model.updates for model in bulk.updates}
+        result = await get_write_queue().run(update_models, updates)
+        return FastJSONResponse(content=result)
+    except Exception as e:
+        return bulk_error_response(str(e))
+
+@app.delete("/api/models/bulk")
+async def delete_models_bulk(bulk: BulkDeleteModels) -> FastJSONResponse:
+    """Delete a list of models with one backup and one save"""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'home'))
+        from home import delete_models
+        
+        result = await get_write_queue().run(delete_models, bulk.ids)
+        return FastJSONResponse(content=result)
+    except Exception as e:
+        return bulk_error_response(str(e))
+
 @app.get("/api/search")
-async def search_data(q: str = "") -> JSONResponse:
+async def search_data(q: str = "") -> FastJSONResponse:
     """Search through the data"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'home'))
         from home import search_models
         
-        data = search_models(q)
-        return JSONResponse(content={
+        data = await get_worker_pool().run(search_models, q)
+        return FastJSONResponse(content={
             "success": True,
             "data": data,
             "total_found": len(data),
@@ -246,70 +448,186 @@ async def search_data(q: str = "") -> JSONResponse:
         })
     
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
 @app.put("/api/update-model")
-async def update_model(model: UpdateCarModel) -> JSONResponse:
+async def update_model(model: UpdateCarModel) -> FastJSONResponse:
     """Update an existing model in the Excel file"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'home'))
         from home import update_model as update_model_func
         
-        update_model_func(model.serial_number, model.updates)
-        return JSONResponse(content={
+        await get_write_queue().run(update_model_func, model.id, model.updates)
+        return FastJSONResponse(content={
             "success": True,
-            "message": f"Successfully updated model with serial number {model.serial_number}!"
+            "message": "Successfully updated model!"
         })
         
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
 @app.delete("/api/delete-model")
-async def delete_model(model: DeleteCarModel) -> JSONResponse:
+async def delete_model(model: DeleteCarModel) -> FastJSONResponse:
     """Delete a model from the Excel file"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'home'))
         from home import delete_model as delete_model_func
         
-        delete_model_func(model.serial_number)
-        return JSONResponse(content={
+        await get_write_queue().run(delete_model_func, model.id)
+        return FastJSONResponse(content={
             "success": True,
-            "message": f"Successfully deleted model with serial number {model.serial_number}!"
+            "message": "Successfully deleted model!"
         })
         
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
+def changed_records(table, rows) -> list:
+    """Encode changed rows the way /api/data or /api/preorders sends them"""
+    if table == PREORDERS:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
+        from preorders import preorder_frame, preorders_to_json
+        
+        return json.loads(preorders_to_json(preorder_frame(rows)))
+    return rows.to_dict("records")
+
+def changes_response(table, since) -> FastJSONResponse:
+    """Build the /api/changes response (runs on the worker pool)"""
+    df, version, changes = table_changes(table, since)
+    if changes is None:
+        # Too far behind (or a column was added, renamed or re-imported): the page reloads the table
+        return FastJSONResponse(content={"success": True, "table": table, "version": version, "reset": True})
+    
+    inserted = [record_id for record_id, op in changes.items() if op == "insert"]
+    updated = [record_id for record_id, op in changes.items() if op == "update"]
+    return FastJSONResponse(content={
+        "success": True,
+        "table": table,
+        "version": version,
+        "reset": False,
+        "inserted": changed_records(table, record_rows(df, inserted)),
+        "updated": changed_records(table, record_rows(df, updated)),
+        "deleted": sorted(record_id for record_id, op in changes.items() if op == "delete"),
+        "total_records": len(df)
+    })
+
+@app.get("/api/changes")
+async def get_changes(since: int, table: str = COLLECTION) -> FastJSONResponse:
+    """
+    Get the rows inserted, updated and deleted after a data version
+    The version comes from /api/data, /api/preorders or the previous call; table is 'collection' or
+    'preorders'. "reset": true means the changes are not known any more and the table has to be reloaded.
+    """
+    try:
+        if table not in (COLLECTION, PREORDERS):
+            return FastJSONResponse(
+                status_code=400,
+                content={"success": False, "error": f"Unknown table: {table}"}
+            )
+        return await get_worker_pool().run(changes_response, table, since)
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={"success": False, "error": str(e)}
+        )
+
+@app.get("/api/events")
+async def stream_events() -> StreamingResponse:
+    """
+    Live updates as Server-Sent Events: a "change" event with {"table", "version"} whenever the
+    collection or the preorders change; the pages then fetch the changed rows from /api/changes
+    """
+    return StreamingResponse(
+        get_change_events().stream(),
+        media_type="text/event-stream",
+        # Content-Encoding keeps GZipMiddleware from holding events back in its buffer
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity", "X-Accel-Buffering": "no"}
+    )
+
+# Backup Routes
+def backup_error(e):
+    """Error response for the backup endpoints"""
+    error_msg = str(e)
+    status_code = 404 if "not found" in error_msg or "No backup" in error_msg \
+        else 400 if "Unknown table" in error_msg or "Invalid date" in error_msg else 500
+    return FastJSONResponse(status_code=status_code, content={"success": False, "error": error_msg})
+
+@app.get("/api/backups")
+async def get_backups(table: str = COLLECTION) -> FastJSONResponse:
+    """List a table's backups, newest first: name, created, size, sha256 and row count"""
+    try:
+        backups = await get_worker_pool().run(list_table_backups, table)
+        return FastJSONResponse(content={"success": True, "table": table, "backups": backups})
+    except Exception as e:
+        return backup_error(e)
+
+@app.get("/api/backups/diff")
+async def get_backup_diff(table: str = COLLECTION, from_: str = Query(..., alias="from"), to: Optional[str] = None) -> FastJSONResponse:
+    """Get the rows added, removed and changed between two backups (to defaults to the newest backup)"""
+    try:
+        diff = await get_worker_pool().run(compare_table_backups, table, from_, to)
+        return FastJSONResponse(content={"success": True, "table": table, **diff})
+    except Exception as e:
+        return backup_error(e)
+
+@app.post("/api/backups/restore")
+async def restore_backup_endpoint(restore: RestoreBackupModel) -> FastJSONResponse:
+    """Replace a table's rows with a backup, given by name or as a point in time (at, ISO date/time)"""
+    try:
+        # A restore rewrites the table, so it queues behind the other writes
+        result = await get_write_queue().run(restore_table, restore.table, restore.name, restore.at)
+        return FastJSONResponse(content=result)
+    except Exception as e:
+        return backup_error(e)
+
 # Analytics Routes
+@app.get("/api/metrics")
+async def get_metrics() -> FastJSONResponse:
+    """Get worker pool and write queue load (queue depth, running and completed jobs)"""
+    return FastJSONResponse(content={
+        "success": True,
+        "worker_pool": get_worker_pool().stats(),
+        "write_queue": {"depth": get_write_queue().depth()}
+    })
+
 @app.get("/analytics", response_class=HTMLResponse)
 async def analytics_page(request: Request):
     """Analytics page"""
     return templates.TemplateResponse("analytics/analytics.html", {"request": request})
 
 @app.get("/api/analytics")
-async def get_analytics() -> JSONResponse:
+async def get_analytics(request: Request) -> FastJSONResponse:
     """Get comprehensive analytics data"""
     try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'series-management'))
+        from manage_series import get_series_config
+        
+        # The main series breakdown follows the series configuration, so its content is part of the ETag
+        series_options = dump_json(get_series_config()["series_options"])
+        etag = await get_worker_pool().run(table_etag, "analytics", [COLLECTION], series_options)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'analytics'))
         from analytics import get_collection_statistics
         
-        analytics = get_collection_statistics()
-        return JSONResponse(content={
+        analytics = await get_worker_pool().run(get_collection_statistics)
+        return with_etag(FastJSONResponse(content={
             "success": True,
             "analytics": analytics
-        })
+        }), etag)
         
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
@@ -320,76 +638,54 @@ async def preorders_page(request: Request):
     """Preorders management page"""
     return templates.TemplateResponse("preorders/preorders.html", {"request": request})
 
+def preorders_payload(df) -> JSONPayload:
+    """Serialise the /api/preorders response body (kept until the preorders change)"""
+    from preorders import load_preorders_data, preorders_to_json
+    
+    # The records are encoded by pandas in one pass (NaN and inf become null)
+    records = preorders_to_json(load_preorders_data())
+    message = json.dumps(f"Successfully loaded {len(df)} preorders")
+    version = json.dumps(loaded_version(PREORDERS, df))
+    return JSONPayload(
+        f'{{"success":true,"data":{records},"total_records":{len(df)},"version":{version},"message":{message}}}'.encode("utf-8")
+    )
+
+def preorders_response(accept_encoding="") -> FastJSONResponse:
+    """Build the /api/preorders response (runs on the worker pool)"""
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
+    payload = get_derived(PREORDERS, "payload", preorders_payload)
+    if payload is None:
+        return FastJSONResponse(content={
+            "success": True,
+            "data": [],
+            "message": "No preorders found"
+        })
+    return payload.response(accept_encoding)
+
 @app.get("/api/preorders")
-async def get_preorders() -> JSONResponse:
+async def get_preorders(request: Request) -> FastJSONResponse:
     """Get all preorders as JSON"""
     try:
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
-        from preorders import load_preorders_data
-        import json
-        import math
-        
-        df = load_preorders_data()
-        if df is None:
-            return JSONResponse(content={
-                "success": True,
-                "data": [],
-                "message": "No preorders found"
-            })
-        
-        # Convert to dict and clean up any problematic values
-        data = df.to_dict('records')
-        
-        # Clean data for JSON serialization - replace inf, -inf, NaN
-        def clean_value(value):
-            if value is None:
-                return ""
-            if isinstance(value, float):
-                if math.isinf(value) or math.isnan(value):
-                    return ""
-                # Convert large floats to string to avoid JSON issues
-                try:
-                    # Check if value is within JSON range
-                    json.dumps(value)
-                    return value
-                except (OverflowError, ValueError):
-                    return ""
-            if pd.isna(value):
-                return ""
-            # Handle string values that might contain 'inf' or 'nan'
-            if isinstance(value, str):
-                if value.lower() in ['inf', '-inf', 'nan', '']:
-                    return ""
-            return value
-        
-        # Clean all values in the data
-        cleaned_data = []
-        for record in data:
-            cleaned_record = {}
-            for key, value in record.items():
-                cleaned_record[key] = clean_value(value)
-            cleaned_data.append(cleaned_record)
-        
-        return JSONResponse(content={
-            "success": True,
-            "data": cleaned_data,
-            "total_records": len(cleaned_data),
-            "message": f"Successfully loaded {len(cleaned_data)} preorders"
-        })
+        etag = await get_worker_pool().run(table_etag, "preorders", [PREORDERS])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = await get_worker_pool().run(preorders_response, request.headers.get("accept-encoding", ""))
+        return with_etag(response, etag)
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
 @app.post("/api/preorders")
-async def add_preorder_endpoint(preorder: PreorderModel) -> JSONResponse:
+async def add_preorder_endpoint(preorder: PreorderModel) -> FastJSONResponse:
     """Add a new preorder"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
         from preorders import add_preorder as add_preorder_func
         
-        result = add_preorder_func(
+        result = await get_write_queue().run(
+            add_preorder_func,
             preorder.seller,
             preorder.models,
             preorder.eta,
@@ -397,79 +693,112 @@ async def add_preorder_endpoint(preorder: PreorderModel) -> JSONResponse:
             preorder.po_amount,
             preorder.on_arrival_amount
         )
-        return JSONResponse(content=result)
+        return FastJSONResponse(content=result)
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
-@app.put("/api/preorders/{serial_number}")
-async def update_preorder(serial_number: int, updates: dict) -> JSONResponse:
+@app.post("/api/preorders/bulk")
+async def add_preorders_bulk(bulk: BulkAddPreorders) -> FastJSONResponse:
+    """Add a list of preorders with one backup and one save"""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
+        from preorders import add_preorders
+        
+        result = await get_write_queue().run(add_preorders, [dict(preorder) for preorder in bulk.preorders])
+        return FastJSONResponse(content=result)
+    except Exception as e:
+        return bulk_error_response(str(e))
+
+@app.put("/api/preorders/bulk")
+async def update_preorders_bulk(bulk: BulkUpdatePreorders) -> FastJSONResponse:
+    """Update a list of preorders with one backup and one save"""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
+        from preorders import update_preorders, map_preorder_fields
+        
+        if len({preorder.id for preorder in bulk.updates}) != len(bulk.updates):
+            raise Exception("Invalid updates: a record ID appears more than once")
+        updates = {preorder.id: map_preorder_fields(preorder.updates) for preorder in bulk.updates}
+        result = await get_write_queue().run(update_preorders, updates)
+        return FastJSONResponse(content=result)
+    except Exception as e:
+        return bulk_error_response(str(e))
+
+@app.delete("/api/preorders/bulk")
+async def delete_preorders_bulk(bulk: BulkDeletePreorders) -> FastJSONResponse:
+    """Delete a list of preorders with one backup and one save"""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
+        from preorders import delete_preorders
+        
+        result = await get_write_queue().run(delete_preorders, bulk.ids)
+        return FastJSONResponse(content=result)
+    except Exception as e:
+        return bulk_error_response(str(e))
+
+@app.put("/api/preorders/{record_id}")
+async def update_preorder(record_id: int, updates: dict) -> FastJSONResponse:
     """Update an existing preorder"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
-        from preorders import update_preorder as update_preorder_func
+        from preorders import update_preorder as update_preorder_func, map_preorder_fields
         
         # Map frontend field names to Excel column names
-        mapped_updates = {}
-        field_mapping = {
-            'seller': 'Seller',
-            'models': 'Models',
-            'eta': 'ETA',
-            'total_price': 'Total Price',
-            'po_amount': 'PO Amount',
-            'on_arrival_amount': 'On Arrival Amount',
-            'delivery_status': 'Delivery Status'
-        }
+        mapped_updates = map_preorder_fields(updates)
         
-        for key, value in updates.items():
-            if key in field_mapping:
-                mapped_updates[field_mapping[key]] = value
-        
-        update_preorder_func(serial_number, mapped_updates)
-        return JSONResponse(content={
+        await get_write_queue().run(update_preorder_func, record_id, mapped_updates)
+        return FastJSONResponse(content={
             "success": True,
-            "message": f"Successfully updated preorder #{serial_number}!"
+            "message": "Successfully updated preorder!"
         })
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
-@app.delete("/api/preorders/{serial_number}")
-async def delete_preorder_endpoint(serial_number: int) -> JSONResponse:
+@app.delete("/api/preorders/{record_id}")
+async def delete_preorder_endpoint(record_id: int) -> FastJSONResponse:
     """Delete a preorder"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
         from preorders import delete_preorder as delete_preorder_func
         
-        delete_preorder_func(serial_number)
-        return JSONResponse(content={
+        await get_write_queue().run(delete_preorder_func, record_id)
+        return FastJSONResponse(content={
             "success": True,
-            "message": f"Successfully deleted preorder #{serial_number}!"
+            "message": "Successfully deleted preorder!"
         })
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
 @app.get("/api/preorders/statistics")
-async def get_preorders_statistics() -> JSONResponse:
+async def get_preorders_statistics(request: Request) -> FastJSONResponse:
     """Get preorders statistics"""
     try:
+        # Upcoming arrivals also depend on the current month
+        etag = await get_worker_pool().run(
+            table_etag, "preorder-statistics", [PREORDERS], datetime.now().strftime("%Y-%m")
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
         from preorders import get_preorders_statistics
         
-        stats = get_preorders_statistics()
-        return JSONResponse(content={
+        stats = await get_worker_pool().run(get_preorders_statistics)
+        return with_etag(FastJSONResponse(content={
             "success": True,
             "statistics": stats
-        })
+        }), etag)
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
@@ -481,44 +810,48 @@ async def series_management_page(request: Request):
     return templates.TemplateResponse("series-management/series-management.html", {"request": request})
 
 @app.get("/api/series")
-async def get_series_config() -> JSONResponse:
+async def get_series_config(request: Request) -> FastJSONResponse:
     """Get current series configuration"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'series-management'))
         from manage_series import get_series_config
         
+        # The series configuration lives in memory, so its ETag is taken from its content
         config = get_series_config()
-        return JSONResponse(content={
+        etag = make_etag("series", dump_json(config))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return with_etag(FastJSONResponse(content={
             "success": True,
             "series_options": config["series_options"],
             "series_metadata": config["series_metadata"]
-        })
+        }), etag)
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
 
 @app.post("/api/add-field")
-async def add_field(field: AddFieldModel) -> JSONResponse:
+async def add_field(field: AddFieldModel) -> FastJSONResponse:
     """Add a new field/column to the Excel file"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'add-field'))
         from add_field import add_field as add_field_func
         
-        result = add_field_func(field.field_name)
-        return JSONResponse(content=result)
+        result = await get_write_queue().run(add_field_func, field.field_name)
+        return FastJSONResponse(content=result)
         
     except Exception as e:
         error_msg = str(e)
         status_code = 400 if "already exists" in error_msg or "cannot be empty" in error_msg or "too long" in error_msg or "invalid characters" in error_msg else 500
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status_code,
             content={"success": False, "error": error_msg}
         )
 
 @app.post("/api/series/update")
-async def update_series_config(update: SeriesUpdateModel) -> JSONResponse:
+async def update_series_config(update: SeriesUpdateModel) -> FastJSONResponse:
     """Update series configuration"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'series-management'))
@@ -526,86 +859,86 @@ async def update_series_config(update: SeriesUpdateModel) -> JSONResponse:
         
         if update.action == 'add':
             result = add_subseries(update.main_series, update.subseries)
-            return JSONResponse(content=result)
+            return FastJSONResponse(content=result)
         elif update.action == 'remove':
             result = remove_subseries(update.main_series, update.subseries)
-            return JSONResponse(content=result)
+            return FastJSONResponse(content=result)
         else:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=400,
                 content={"success": False, "error": "Invalid action"}
             )
     except Exception as e:
         error_msg = str(e)
         status_code = 400 if "not found" in error_msg or "already exists" in error_msg else 500
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status_code,
             content={"success": False, "error": error_msg}
         )
 
 @app.post("/api/series/rename")
-async def rename_series(rename: RenameSeriesModel) -> JSONResponse:
+async def rename_series(rename: RenameSeriesModel) -> FastJSONResponse:
     """Rename a main series"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'series-management'))
         from manage_series import rename_series as rename_series_func
         
         result = rename_series_func(rename.old_name, rename.new_name)
-        return JSONResponse(content=result)
+        return FastJSONResponse(content=result)
     except Exception as e:
         error_msg = str(e)
         status_code = 404 if "not found" in error_msg else 400 if "already exists" in error_msg else 500
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status_code,
             content={"success": False, "error": error_msg}
         )
 
 @app.post("/api/series/rename-subseries")
-async def rename_subseries(rename: RenameSubseriesModel) -> JSONResponse:
+async def rename_subseries(rename: RenameSubseriesModel) -> FastJSONResponse:
     """Rename a subseries"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'series-management'))
         from manage_series import rename_subseries as rename_subseries_func
         
         result = rename_subseries_func(rename.main_series, rename.old_name, rename.new_name)
-        return JSONResponse(content=result)
+        return FastJSONResponse(content=result)
     except Exception as e:
         error_msg = str(e)
         status_code = 404 if "not found" in error_msg else 400 if "already exists" in error_msg else 500
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status_code,
             content={"success": False, "error": error_msg}
         )
 
 @app.post("/api/series/add")
-async def add_series(series: AddSeriesModel) -> JSONResponse:
+async def add_series(series: AddSeriesModel) -> FastJSONResponse:
     """Add a new main series"""
     try:
         sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'series-management'))
         from manage_series import add_series as add_series_func
         
         result = add_series_func(series.series_name, series.description, series.price_range, series.rarity)
-        return JSONResponse(content=result)
+        return FastJSONResponse(content=result)
     except Exception as e:
         error_msg = str(e)
         status_code = 400 if "already exists" in error_msg or "cannot be empty" in error_msg else 500
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status_code,
             content={"success": False, "error": error_msg}
         )
 
 @app.post("/api/series/metadata")
-async def update_series_metadata(metadata: SeriesMetadataModel) -> JSONResponse:
+async def update_series_metadata(metadata: SeriesMetadataModel) -> FastJSONResponse:
     """Update series metadata"""
     try:
         # Metadata updates can be done by renaming or modifying series
         # This endpoint is kept for future implementation
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "success": False,
             "message": "Series metadata updates are handled through series rename operations."
         })
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"success": False, "error": str(e)}
         )
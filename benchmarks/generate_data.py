@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Synthetic Data Generator
+Writes a synthetic HW_list.xlsx and preorders.xlsx of any size for the benchmarks.
+Subseries follow the real collection: each subseries in SERIES_OPTIONS is picked as often as it occurs in
+data/HW_list.xlsx (plus one, so subseries nobody owns yet still appear).
+
+Usage: python benchmarks/generate_data.py --rows 10000 [--output benchmarks/data] [--seed 42]
+"""
+
+import os
+import sys
+import random
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'pages', 'series-management'))
+from series_config import SERIES_OPTIONS
+from utils.storage import COLLECTION, PREORDERS, DEFAULT_HEADERS, ID_COLUMN, open_excel_rows, write_excel_rows
+
+# The real collection the subseries distribution is taken from
+SOURCE_COLLECTION = os.path.join(ROOT_DIR, "data", "HW_list.xlsx")
+
+# Words the synthetic model names are made of
+MAKES = ["Nissan", "Toyota", "Honda", "Mazda", "Porsche", "BMW", "Ford", "Chevy", "Dodge", "Lamborghini",
+         "Ferrari", "McLaren", "Volkswagen", "Datsun", "Subaru", "Mitsubishi", "Audi", "Mercedes-Benz"]
+MODELS = ["Skyline GT-R", "Supra", "Civic Type R", "RX-7", "911 GT3", "M3", "Mustang", "Camaro", "Charger",
+          "Countach", "F40", "Senna", "Beetle", "240Z", "WRX STI", "Lancer Evolution", "Quattro", "AMG GT"]
+SUFFIXES = ["", "", "", " Custom", " Gasser", " Drift", " Race Team", " Widebody", " Concept", " '71", " '95"]
+
+# Preorder columns
+SELLERS = ["Karzone", "Toycra", "Hobby Shop", "Diecast Depot", "Collector's Corner", "Hamleys"]
+STATUSES = ["Pending", "Pending", "Shipped", "Delivered", "Delivered", "Cancelled"]
+
+def subseries_weights(source=SOURCE_COLLECTION):
+    """Get [(subseries, weight), ...] for every subseries in SERIES_OPTIONS, weighted by the real collection"""
+    counts = Counter()
+    if os.path.exists(source):
+        try:
+            with open_excel_rows(source) as (headers, rows):
+                column = headers.index("Series")
+                for row in rows:
+                    if column < len(row) and row[column]:
+                        counts[str(row[column]).strip()] += 1
+        except Exception as e:
+            print(f"[WARNING] Could not read {source}, using an even distribution: {str(e)}", file=sys.stderr)
+    return [(subseries, counts[subseries] + 1)
+            for subseries_list in SERIES_OPTIONS.values() for subseries in subseries_list]
+
+def model_name(rng):
+    """Make up a model name"""
+    return f"{rng.choice(MAKES)} {rng.choice(MODELS)}{rng.choice(SUFFIXES)}"
+
+def generate_collection(file_path, rows, seed=42):
+    """Write a synthetic collection (S.No, Model Name, Series and the record IDs)"""
+    rng = random.Random(seed)
+    subseries, weights = zip(*subseries_weights())
+    picks = rng.choices(subseries, weights=weights, k=rows)
+    headers = DEFAULT_HEADERS[COLLECTION] + [ID_COLUMN]
+    write_excel_rows(file_path, headers, ([n, model_name(rng), picks[n - 1], n] for n in range(1, rows + 1)))
+
+def generate_preorders(file_path, rows, seed=42):
+    """Write a synthetic preorders table, with ETAs around the current month"""
+    rng = random.Random(seed)
+    today = datetime.now()
+    months = [(today.replace(day=1) + timedelta(days=31 * offset)).strftime("%Y-%m") for offset in range(-6, 9)]
+
+    def row(n):
+        total = float(rng.randrange(200, 20000))
+        po_amount = float(round(total * rng.choice([0, 0.1, 0.25, 0.5])))
+        added = today - timedelta(days=rng.randrange(0, 730))
+        return [n, rng.choice(SELLERS), ", ".join(model_name(rng) for _ in range(rng.randint(1, 3))),
+                rng.choice(months), total, po_amount, total - po_amount, rng.choice(STATUSES),
+                added.strftime("%Y-%m-%d"), n]
+
+    headers = DEFAULT_HEADERS[PREORDERS] + [ID_COLUMN]
+    write_excel_rows(file_path, headers, (row(n) for n in range(1, rows + 1)))
+
+def generate_data(directory, rows, preorder_rows=None, seed=42):
+    """Write both synthetic files into a directory (preorders default to a tenth of the collection)"""
+    os.makedirs(directory, exist_ok=True)
+    generate_collection(os.path.join(directory, "HW_list.xlsx"), rows, seed)
+    generate_preorders(os.path.join(directory, "preorders.xlsx"), preorder_rows or max(rows // 10, 1), seed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic collection and preorders")
+    parser.add_argument("--rows", type=int, default=10000, help="models in the collection")
+    parser.add_argument("--preorders", type=int, help="preorders (default: a tenth of --rows)")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "data"), help="directory to write to")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    generate_data(args.output, args.rows, args.preorders, args.seed)
+    print(f"[SUCCESS] Wrote {args.rows} models and {args.preorders or max(args.rows // 10, 1)} preorders to {args.output}")
+
+if __name__ == "__main__":
+    main()
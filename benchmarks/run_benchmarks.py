@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Benchmark Suite
+Times the hot paths on synthetic collections (see generate_data.py): loading, searching, the statistics,
+adding/updating/deleting a model, and the JSON endpoints through an ASGI test client.
+Results are written as JSON; --compare prints the change of every median against an earlier run.
+
+Usage: python benchmarks/run_benchmarks.py [--sizes 1000 10000 100000 500000] [--repeat 5]
+                                           [--output results.json] [--compare previous.json]
+Each size runs in its own process, in a temporary directory holding the synthetic data/ folder.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+# Add parent directory to path for imports
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+from generate_data import generate_data
+
+# Collection sizes benchmarked by default
+DEFAULT_SIZES = [1000, 10000, 100000, 500000]
+
+# Searches timed: a common model, a whole subseries and a query with no matches
+SEARCH_QUERIES = ["skyline", "mainlines", "no such model"]
+
+# Directories of the repository the web app expects in its working directory
+APP_DIRECTORIES = ["pages", "static"]
+
+# A change of the median beyond this ratio is reported as slower/faster by --compare
+COMPARE_THRESHOLD = 1.10
+
+def summarize(times):
+    """Summarise run times (seconds) in milliseconds; the first run is reported on its own (cold caches)"""
+    ms = [t * 1000 for t in times]
+    runs = ms[1:] or ms
+    return {
+        "first_ms": round(ms[0], 3),
+        "min_ms": round(min(runs), 3),
+        "median_ms": round(statistics.median(runs), 3),
+        "mean_ms": round(statistics.mean(runs), 3),
+        "max_ms": round(max(runs), 3),
+        "runs": len(ms),
+    }
+
+def timed(func, repeat, *args):
+    """Call func(*args) 1 + repeat times, returns the summary and the last result"""
+    times = []
+    for _ in range(repeat + 1):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    return summarize(times), result
+
+def timed_each(func, arguments):
+    """Call func once per argument tuple (e.g. one write per record), returns the summary and the results"""
+    times, results = [], []
+    for args in arguments:
+        start = time.perf_counter()
+        results.append(func(*args))
+        times.append(time.perf_counter() - start)
+    return summarize(times), results
+
+def benchmark_functions(repeat):
+    """Time the page functions the web app and the CLI call"""
+    for page in ["home", "add-model", "analytics", "preorders"]:
+        sys.path.insert(0, os.path.join(ROOT_DIR, 'pages', page))
+    from home import load_excel_data, search_models, update_model, delete_model
+    from add_model import add_model
+    from analytics import get_collection_statistics
+    from preorders import get_preorders_statistics
+
+    results = {}
+    results["load_excel_data"], df = timed(load_excel_data, repeat)
+    for query in SEARCH_QUERIES:
+        results[f"search_models[{query}]"], _ = timed(search_models, repeat, query)
+    results["get_collection_statistics"], _ = timed(get_collection_statistics, repeat)
+    results["get_preorders_statistics"], _ = timed(get_preorders_statistics, repeat)
+
+    results["add_model"], added = timed_each(
+        add_model, [(f"Benchmark Model {n}", "Mainlines", "Mainlines") for n in range(repeat + 1)])
+    record_ids = [result["id"] for result in added]
+    results["update_model"], _ = timed_each(
+        update_model, [(record_id, {"Model Name": f"Benchmark Model {record_id} Updated"}) for record_id in record_ids])
+    # Reads right after a write pay for refreshing the caches
+    results["search_models[after write]"], _ = timed_each(search_models, [("skyline",)] * (repeat + 1))
+    results["delete_model"], _ = timed_each(delete_model, [(record_id,) for record_id in record_ids])
+    return results, len(df)
+
+def benchmark_endpoints(repeat):
+    """Time the JSON endpoints through the ASGI app (startup and shutdown hooks included)"""
+    from fastapi.testclient import TestClient
+    import app as web_app
+
+    def request(client, method, url, body=None):
+        response = client.request(method, url, json=body)
+        if response.status_code != 200:
+            raise Exception(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    reads = ["/api/data", "/api/data?limit=50", "/api/stats", "/api/search?q=skyline", "/api/analytics",
+             "/api/preorders", "/api/preorders/statistics", "/api/series"]
+    results = {}
+    with TestClient(web_app.app) as client:
+        for url in reads:
+            results[f"GET {url}"], _ = timed(request, repeat, client, "GET", url)
+
+        results["POST /api/add-model"], responses = timed_each(request, [
+            (client, "POST", "/api/add-model",
+             {"model_name": f"Endpoint Model {n}", "series": "Mainlines", "subseries": "Mainlines"})
+            for n in range(repeat + 1)
+        ])
+        record_ids = [response.json()["id"] for response in responses]
+        results["PUT /api/update-model"], _ = timed_each(request, [
+            (client, "PUT", "/api/update-model", {"id": record_id, "updates": {"Model Name": f"Endpoint Model {record_id} Updated"}})
+            for record_id in record_ids
+        ])
+        results["DELETE /api/delete-model"], _ = timed_each(request, [
+            (client, "DELETE", "/api/delete-model", {"id": record_id}) for record_id in record_ids
+        ])
+    return results
+
+def measure(result_path, repeat):
+    """Run every benchmark in this process (its working directory holds the data) and save the results"""
+    start = time.perf_counter()
+    functions, rows = benchmark_functions(repeat)
+    endpoints = benchmark_endpoints(repeat)
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "functions": functions, "endpoints": endpoints,
+                   "total_seconds": round(time.perf_counter() - start, 2)}, f)
+
+def prepare_directory(directory, rows):
+    """Lay out a working directory like the repository's: the synthetic data/ and the app's directories"""
+    generate_data(os.path.join(directory, "data"), rows)
+    for name in APP_DIRECTORIES:
+        try:
+            os.symlink(os.path.join(ROOT_DIR, name), os.path.join(directory, name), target_is_directory=True)
+        except OSError:
+            # Symlinks may need extra privileges (e.g. on Windows)
+            shutil.copytree(os.path.join(ROOT_DIR, name), os.path.join(directory, name))
+
+def run_size(rows, repeat, backend):
+    """Benchmark one collection size in a fresh directory and process, returns its results"""
+    with tempfile.TemporaryDirectory(prefix="diecast-bench-") as directory:
+        start = time.perf_counter()
+        prepare_directory(directory, rows)
+        generate_seconds = time.perf_counter() - start
+
+        result_path = os.path.join(directory, "result.json")
+        env = dict(os.environ, DIECAST_STORAGE=backend)
+        # The app's own log lines go to the console; the results come back through result_path
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--measure", result_path, "--repeat", str(repeat)],
+            cwd=directory, env=env, check=True, stdout=sys.stderr
+        )
+        with open(result_path, encoding="utf-8") as f:
+            result = json.load(f)
+    result["generate_seconds"] = round(generate_seconds, 2)
+    return result
+
+def compare(previous, current):
+    """Print the change of every median between two result files, returns the operations that got slower"""
+    slower = []
+    print(f"\n{'Rows':>8}  {'Operation':<40} {'Before (ms)':>12} {'After (ms)':>12} {'Ratio':>7}")
+    for size, result in current["results"].items():
+        before = previous.get("results", {}).get(size)
+        if before is None:
+            continue
+        for group in ["functions", "endpoints"]:
+            for name, timing in result[group].items():
+                old = before.get(group, {}).get(name)
+                if old is None or not old["median_ms"]:
+                    continue
+                ratio = timing["median_ms"] / old["median_ms"]
+                flag = "  slower" if ratio > COMPARE_THRESHOLD else "  faster" if ratio < 1 / COMPARE_THRESHOLD else ""
+                if flag == "  slower":
+                    slower.append(f"{size}:{name}")
+                print(f"{size:>8}  {name:<40} {old['median_ms']:>12.2f} {timing['median_ms']:>12.2f} {ratio:>6.2f}x{flag}")
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DieCastTracker hot paths on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="collection sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per operation after the first")
+    parser.add_argument("--backend", default=os.environ.get("DIECAST_STORAGE", "sqlite"),
+                        choices=["sqlite", "excel"], help="storage engine")
+    parser.add_argument("--output", help="write the results to this file (default: print them)")
+    parser.add_argument("--compare", help="results of an earlier run to compare against")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.repeat)
+        return
+
+    results = {}
+    for rows in args.sizes:
+        print(f"[INFO] Benchmarking {rows} rows...", file=sys.stderr)
+        results[str(rows)] = run_size(rows, args.repeat, args.backend)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[SUCCESS] Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous.get("backend") != report["backend"]:
+            print(f"[WARNING] Comparing the {report['backend']} backend against {previous.get('backend')}", file=sys.stderr)
+        slower = compare(previous, report)
+        if slower:
+            print(f"\n[WARNING] {len(slower)} operations got more than {COMPARE_THRESHOLD - 1:.0%} slower", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
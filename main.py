@@ -6,19 +6,29 @@ Interactive command-line interface for managing Hot Wheels collection
 
 import os
 import sys
+import csv
+import json
+import argparse
 
 # Add pages directories to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'add-model'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'add-field'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'analytics'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'home'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'preorders'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pages', 'series-management'))
 
-from add_model import add_model
+from add_model import add_model, add_models
 from add_field import add_field
 from analytics import get_collection_statistics
-from home import search_models, update_model, delete_model, load_excel_data
+from home import search_models, update_model, delete_model, load_excel_data, update_models, delete_models
+from preorders import add_preorders, update_preorders, delete_preorders, map_preorder_fields
 from series_config import SERIES_OPTIONS, get_all_series, get_subseries
+from utils.storage import COLLECTION, PREORDERS, SERIAL_COLUMN, ID_COLUMN, get_storage
+from utils.collection_store import find_row, record_ids_for_serials
+from utils.file_lock import write_lock
+from utils.backup_worker import get_backup_worker
+from utils.backup_catalog import list_table_backups, compare_table_backups, restore_table
 
 # Path to the Excel file
 EXCEL_FILE_PATH = os.path.join("data", "HW_list.xlsx")
@@ -93,7 +103,7 @@ def add_model_interactive():
         result = add_model(model_name, main_series, subseries)
         if result.get("success"):
             print(f"\n[SUCCESS] {result.get('message')}")
-            print(f"   Serial Number: {result.get('serial_number')}")
+            print(f"   Record ID: {result.get('id')}")
         else:
             print(f"\n[ERROR] {result.get('error', 'Unknown error')}")
     
@@ -243,12 +253,8 @@ def update_model_interactive():
             print("[ERROR] No data found!")
             return
         
-        # Find the model
-        model_row = None
-        for idx, row in df.iterrows():
-            if row.get('S.No') == serial_number:
-                model_row = row
-                break
+        # Find the model (through the serial number index)
+        model_row = find_row(COLLECTION, serial_number)
         
         if model_row is None:
             print(f"[ERROR] Model with serial number {serial_number} not found!")
@@ -261,7 +267,7 @@ def update_model_interactive():
         print("\nEnter updates (leave empty to skip):")
         updates = {}
         for col in df.columns:
-            if col == 'S.No':
+            if col in (SERIAL_COLUMN, ID_COLUMN):
                 continue
             new_value = input(f"  {col} (current: {model_row.get(col, '')}): ").strip()
             if new_value:
@@ -277,7 +283,7 @@ def update_model_interactive():
             print("[INFO] Update cancelled.")
             return
         
-        update_model(serial_number, updates)
+        update_model(model_row[ID_COLUMN], updates)
         print(f"\n[SUCCESS] Model #{serial_number} updated successfully!")
     
     except ValueError:
@@ -306,12 +312,8 @@ def delete_model_interactive():
             print("[ERROR] No data found!")
             return
         
-        # Find the model
-        model_row = None
-        for idx, row in df.iterrows():
-            if row.get('S.No') == serial_number:
-                model_row = row
-                break
+        # Find the model (through the serial number index)
+        model_row = find_row(COLLECTION, serial_number)
         
         if model_row is None:
             print(f"[ERROR] Model with serial number {serial_number} not found!")
@@ -335,7 +337,7 @@ def delete_model_interactive():
             print("[INFO] Deletion cancelled.")
             return
         
-        delete_model(serial_number)
+        delete_model(model_row[ID_COLUMN])
         print(f"\n[SUCCESS] Model #{serial_number} deleted successfully!")
     
     except ValueError:
@@ -345,12 +347,26 @@ def delete_model_interactive():
     except Exception as e:
         print(f"\n[ERROR] {str(e)}")
 
+def export_excel_files():
+    """Write any database changes back to the Excel files"""
+    try:
+        # One lock for both files so the web app cannot write in between
+        with write_lock():
+            get_storage().export_all()
+        # Back up the overwritten files if their backup is due (otherwise the web app or the next run will)
+        get_backup_worker().run_once()
+    except Exception as e:
+        print(f"[ERROR] Error exporting Excel files: {str(e)}")
+
 def open_excel_file():
     """Open the Excel file"""
     print("\nOPEN EXCEL FILE")
     print("-" * 60)
     
     try:
+        # Make sure the Excel file has the latest changes
+        export_excel_files()
+        
         if not os.path.exists(EXCEL_FILE_PATH):
             print(f"[ERROR] Excel file not found: {EXCEL_FILE_PATH}")
             print("   The file will be created when you add your first model.")
@@ -386,12 +402,14 @@ DieCast Tracker - Hot Wheels Collection Manager
   • Automatic backups before any changes
 
 [DATA]
-  • Data stored in: data/HW_list.xlsx
+  • Data stored in: data/diecast.db (exported to data/HW_list.xlsx on exit)
   • Backups stored in: data/backups/
   • All operations create automatic backups
 
 [USAGE]
   • Use the menu numbers to navigate
+  • Bulk changes: python main.py models add haul.csv (see python main.py --help)
+  • Backups: python main.py backups list models (also diff and restore)
   • Press Ctrl+C to cancel any operation
   • All changes are saved automatically
 
@@ -401,6 +419,151 @@ DieCast Tracker - Hot Wheels Collection Manager
   • Run 'python start_web.py' to start web interface
     """)
 
+def read_bulk_file(file_path):
+    """Read a list of records from a .json file (a list of objects) or a .csv file (with a header row)"""
+    if file_path.lower().endswith(".json"):
+        with open(file_path, encoding="utf-8") as f:
+            records = json.load(f)
+        if not isinstance(records, list):
+            raise Exception("JSON file must contain a list of objects")
+        return records
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        return [{key.strip(): value for key, value in row.items() if key} for row in csv.DictReader(f)]
+
+def to_record_ids(table, serial_numbers):
+    """Translate the serial numbers shown in the table into record IDs"""
+    record_ids, missing = record_ids_for_serials(table, serial_numbers)
+    if missing:
+        raise Exception(f"Serial numbers not found: {', '.join(str(s) for s in missing)}")
+    return record_ids
+
+def record_key(record):
+    """Pop the row key of a bulk file record: ("id", record ID) or ("serial", serial number), None if missing"""
+    for name, kind in (("id", "id"), (ID_COLUMN, "id"), ("serial_number", "serial"), (SERIAL_COLUMN, "serial")):
+        value = record.pop(name, None)
+        if value not in (None, ""):
+            return kind, int(value)
+    return None
+
+def read_bulk_updates(file_path, table):
+    """
+    Read {record_id: {field: value}} updates from a file; blank CSV cells leave a field unchanged
+    Rows are given by an id column, or by a serial_number column translated to record IDs.
+    """
+    keys, changes = [], []
+    is_csv = not file_path.lower().endswith(".json")
+    for number, record in enumerate(read_bulk_file(file_path), start=1):
+        record = dict(record)
+        key = record_key(record)
+        if key is None:
+            raise Exception(f"Invalid updates: #{number}: id or serial_number is missing")
+        keys.append(key)
+        changes.append({field_name: value for field_name, value in record.items() if not (is_csv and value == "")})
+    
+    serial_ids = iter(to_record_ids(table, [value for kind, value in keys if kind == "serial"]))
+    updates = {}
+    for (kind, value), fields in zip(keys, changes):
+        record_id = next(serial_ids) if kind == "serial" else value
+        if record_id in updates:
+            raise Exception(f"Invalid updates: record ID {record_id} appears more than once")
+        updates[record_id] = fields
+    return updates
+
+def read_record_ids(items, table):
+    """Get record IDs from serial numbers on the command line, or from a file with an id or serial_number column"""
+    if len(items) == 1 and not items[0].isdigit():
+        keys = [record_key(dict(record)) for record in read_bulk_file(items[0])]
+        if None in keys:
+            raise Exception("Invalid file: every row needs an id or serial_number")
+        serial_ids = iter(to_record_ids(table, [value for kind, value in keys if kind == "serial"]))
+        return [next(serial_ids) if kind == "serial" else value for kind, value in keys]
+    return to_record_ids(table, [int(item) for item in items])
+
+def run_bulk_command(argv):
+    """Run a bulk command given on the command line, returns the exit code"""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Bulk changes with one backup and one save per batch (run without arguments for the interactive menu)",
+        epilog="add/update take a .csv or .json file; delete takes serial numbers or a file with an id or serial_number column"
+    )
+    parser.add_argument("table", choices=["models", "preorders"])
+    parser.add_argument("action", choices=["add", "update", "delete"])
+    parser.add_argument("items", nargs="+", help="file for add/update, serial numbers (or a file) for delete")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.action in ("add", "update") and len(args.items) != 1:
+            raise Exception(f"'{args.action}' takes exactly one file")
+        
+        if args.table == "models":
+            if args.action == "add":
+                result = add_models(read_bulk_file(args.items[0]))
+            elif args.action == "update":
+                result = update_models(read_bulk_updates(args.items[0], COLLECTION))
+            else:
+                result = delete_models(read_record_ids(args.items, COLLECTION))
+        else:
+            if args.action == "add":
+                result = add_preorders(read_bulk_file(args.items[0]))
+            elif args.action == "update":
+                updates = read_bulk_updates(args.items[0], PREORDERS)
+                result = update_preorders({record_id: map_preorder_fields(fields) for record_id, fields in updates.items()})
+            else:
+                result = delete_preorders(read_record_ids(args.items, PREORDERS))
+        
+        print(f"[SUCCESS] {result['message']}")
+        export_excel_files()
+        return 0
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        return 1
+
+def run_backup_command(argv):
+    """Run a backups command given on the command line (list, diff or restore), returns the exit code"""
+    parser = argparse.ArgumentParser(
+        prog="main.py backups",
+        description="Browse and restore the backups of the collection (models) or the preorders"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="list the backups, newest first")
+    list_parser.add_argument("table", choices=["models", "preorders"])
+    diff_parser = commands.add_parser("diff", help="show the rows that differ between two backups")
+    diff_parser.add_argument("table", choices=["models", "preorders"])
+    diff_parser.add_argument("old", help="name of the older backup")
+    diff_parser.add_argument("new", nargs="?", help="name of the newer backup (default: the newest)")
+    restore_parser = commands.add_parser("restore", help="replace the rows with a backup")
+    restore_parser.add_argument("table", choices=["models", "preorders"])
+    restore_parser.add_argument("name", nargs="?", help="name of the backup (default: the newest)")
+    restore_parser.add_argument("--at", help="restore the last backup taken at or before this date/time (e.g. 2025-01-31T18:00)")
+    args = parser.parse_args(argv)
+    table = COLLECTION if args.table == "models" else PREORDERS
+    
+    try:
+        if args.command == "list":
+            backups = list_table_backups(table)
+            if not backups:
+                print("[INFO] No backups found")
+            for backup in backups:
+                rows = backup["rows"] if backup["rows"] is not None else "?"
+                print(f"{backup['created']}  {rows:>6} rows  {backup['size']:>9} bytes  {backup['name']}")
+        elif args.command == "diff":
+            diff = compare_table_backups(table, args.old, args.new)
+            print(f"{diff['from']} -> {diff['to']}")
+            for row in diff["added"]:
+                print(f"  + {row['key']}: {row['values']}")
+            for row in diff["removed"]:
+                print(f"  - {row['key']}: {row['values']}")
+            for row in diff["changed"]:
+                print(f"  ~ {row['key']}: {row['before']} -> {row['after']}")
+            print(f"[INFO] {len(diff['added'])} added, {len(diff['removed'])} removed, {len(diff['changed'])} changed")
+        else:
+            result = restore_table(table, args.name, args.at)
+            print(f"[SUCCESS] {result['message']}")
+        return 0
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        return 1
+
 def main():
     """Main CLI interface loop"""
     print_header()
@@ -427,6 +590,7 @@ def main():
             elif choice == "8":
                 show_help()
             elif choice == "9":
+                export_excel_files()
                 print("\nThank you for using DieCast Tracker!")
                 print("   Happy collecting!")
                 break
@@ -438,6 +602,7 @@ def main():
                 print("\n" * 2)
         
         except KeyboardInterrupt:
+            export_excel_files()
             print("\n\nGoodbye! Thank you for using DieCast Tracker!")
             break
         except Exception as e:
@@ -446,5 +611,11 @@ def main():
             print("\n" * 2)
 
 if __name__ == "__main__":
+    # python main.py <models|preorders> <add|update|delete> ... runs one bulk change,
+    # python main.py backups <list|diff|restore> ... works with the backups, otherwise the menu starts
+    if len(sys.argv) > 1 and sys.argv[1] == "backups":
+        sys.exit(run_backup_command(sys.argv[2:]))
+    if len(sys.argv) > 1:
+        sys.exit(run_bulk_command(sys.argv[1:]))
     main()
 
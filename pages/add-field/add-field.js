@@ -25,8 +25,7 @@ class AddFieldForm {
 
     async loadCurrentFields() {
         try {
-            const response = await fetch('/api/data');
-            const result = await response.json();
+            const result = await fetchJSONCached('/api/data');
             
             if (result.success && result.columns) {
                 this.displayCurrentFields(result.columns);
@@ -9,17 +9,19 @@ import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from utils.backup_utils import create_backup
-from openpyxl import load_workbook
+from utils.collection_store import edit_table
+from utils.storage import COLLECTION, get_storage
 
 # Path to the Excel file
 EXCEL_FILE_PATH = os.path.join("data", "HW_list.xlsx")
 
 def add_field(field_name: str):
-    """Add a new field/column to the Excel file"""
+    """Add a new field/column to the collection"""
     try:
+        storage = get_storage()
+        
         # Create backup before adding field
-        if not create_backup(EXCEL_FILE_PATH):
+        if not storage.backup(COLLECTION):
             raise Exception("Failed to create backup")
         
         # Validate field name
@@ -35,24 +37,18 @@ def add_field(field_name: str):
         if any(char in field_name for char in invalid_chars):
             raise Exception(f"Field name contains invalid characters: {', '.join(invalid_chars)}")
         
-        # Load workbook
-        if not os.path.exists(EXCEL_FILE_PATH):
-            raise Exception("Excel file not found")
-        
-        wb = load_workbook(EXCEL_FILE_PATH)
-        ws = wb.active
+        if not storage.exists(COLLECTION):
+            raise Exception("Collection not found")
         
         # Check if field already exists
-        headers = [cell.value for cell in ws[1]]
-        if field_name in headers:
+        headers = storage.headers(COLLECTION)
+        if field_name.lower() in [str(h).lower() for h in headers]:
             raise Exception(f"Field '{field_name}' already exists")
         
-        # Add the new field
+        # Add the new field (the cached collection is re-read with it)
+        with edit_table(COLLECTION) as collection:
+            collection.add_column(field_name)
         new_column = len(headers) + 1
-        ws.cell(row=1, column=new_column, value=field_name)
-        
-        # Save workbook
-        wb.save(EXCEL_FILE_PATH)
         
         return {
             "success": True,
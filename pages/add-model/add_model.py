@@ -9,46 +9,74 @@ import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from utils.backup_utils import create_backup
-from openpyxl import load_workbook
+from utils.collection_store import edit_table
+from utils.storage import COLLECTION, get_storage
 
 # Path to the Excel file
 EXCEL_FILE_PATH = os.path.join("data", "HW_list.xlsx")
 
 def add_model(model_name: str, series: str, subseries: str):
-    """Add a new model to the Excel file"""
+    """Add a new model to the collection"""
     try:
-        # Create backup before adding (if file exists)
-        if os.path.exists(EXCEL_FILE_PATH):
-            if not create_backup(EXCEL_FILE_PATH):
-                raise Exception("Failed to create backup")
+        storage = get_storage()
         
-        # Load existing workbook or create new one
-        if os.path.exists(EXCEL_FILE_PATH):
-            wb = load_workbook(EXCEL_FILE_PATH)
-            ws = wb.active
-            last_serial_number = ws.max_row
-        else:
-            from openpyxl import Workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.append(["S.No", "Model Name", "Series"])
-            last_serial_number = 1
+        # Create backup before adding (if the collection exists)
+        if storage.exists(COLLECTION):
+            if not storage.backup(COLLECTION):
+                raise Exception("Failed to create backup")
         
         # Add new row (using subseries as the series field in Excel)
-        ws.append([
-            last_serial_number,
-            model_name.strip(),
-            subseries
-        ])
-        
-        # Save workbook
-        wb.save(EXCEL_FILE_PATH)
+        with edit_table(COLLECTION) as collection:
+            record_id = collection.insert_rows([{
+                "Model Name": model_name.strip(),
+                "Series": subseries
+            }])[0]
         
         return {
             "success": True,
-            "serial_number": last_serial_number,
+            "id": record_id,
             "message": f"Successfully added '{model_name}' to the collection!"
         }
     except Exception as e:
         raise Exception(f"Error adding model: {str(e)}")
+
+def add_models(models: list):
+    """
+    Add several models at once with a single backup and a single save
+    models is a list of {"model_name", "series", "subseries"} dicts; nothing is added if any of them is invalid.
+    """
+    try:
+        # Validate the whole batch before touching the collection
+        errors = []
+        for number, model in enumerate(models, start=1):
+            if not str(model.get("model_name") or "").strip():
+                errors.append(f"#{number}: model name cannot be empty")
+            if not str(model.get("subseries") or "").strip():
+                errors.append(f"#{number}: subseries cannot be empty")
+        if not models:
+            errors.append("no models given")
+        if errors:
+            raise Exception("Invalid models: " + "; ".join(errors))
+        
+        storage = get_storage()
+        
+        # One backup for the whole batch (if the collection exists)
+        if storage.exists(COLLECTION):
+            if not storage.backup(COLLECTION):
+                raise Exception("Failed to create backup")
+        
+        # Add every row in one transaction (using subseries as the series field in Excel)
+        with edit_table(COLLECTION) as collection:
+            record_ids = collection.insert_rows([{
+                "Model Name": str(model["model_name"]).strip(),
+                "Series": str(model["subseries"]).strip()
+            } for model in models])
+        
+        return {
+            "success": True,
+            "ids": record_ids,
+            "added": len(record_ids),
+            "message": f"Successfully added {len(record_ids)} models to the collection!"
+        }
+    except Exception as e:
+        raise Exception(f"Error adding models: {str(e)}")
@@ -6,153 +6,278 @@ Utility functions for analytics page operations
 
 import os
 import sys
+import heapq
+import threading
 from collections import Counter
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from utils.backup_utils import create_backup
+# Add the project root as well so the verification below can run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.collection_store import load_collection, get_derived
+from utils.storage import COLLECTION
+
+# Series configuration lives in the series-management page folder
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'series-management'))
 
 # Path to the Excel file
 EXCEL_FILE_PATH = os.path.join("data", "HW_list.xlsx")
 
+# Words ignored by the model name insights
+STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'series'}
+
+# Collection size milestones
+MILESTONES = [10, 25, 50, 100, 250, 500, 1000]
+
 def load_excel_data():
-    """Load data from the Excel file"""
+    """Load the collection data (cached until it changes)"""
     try:
-        if os.path.exists(EXCEL_FILE_PATH):
-            import pandas as pd
-            df = pd.read_excel(EXCEL_FILE_PATH)
-            df = df.fillna("")
-            return df
-        else:
-            return None
+        return load_collection()
     except Exception as e:
         raise Exception(f"Error loading Excel file: {str(e)}")
 
-def get_collection_statistics():
-    """Get comprehensive collection statistics"""
+def empty_statistics():
+    """Statistics for an empty collection"""
+    return {
+        "total_models": 0,
+        "series_breakdown": {},
+        "main_series_breakdown": {},
+        "recent_additions": [],
+        "collection_goals": {},
+        "collection_insights": {}
+    }
+
+def get_series_column(df):
+    """Get the column holding the subseries"""
+    return 'Series' if 'Series' in df.columns else df.columns[2] if len(df.columns) > 2 else None
+
+def get_model_column(df):
+    """Get the column holding the model names"""
+    return 'Model Name' if 'Model Name' in df.columns else df.columns[1] if len(df.columns) > 1 else None
+
+def model_name_words(name):
+    """Split a model name into the words counted by the insights"""
+    return [w.lower().strip('.,!?()[]{}') for w in name.split() if len(w) > 2 and w.lower() not in STOP_WORDS]
+
+def order_series_breakdown(series_counts):
+    """Order subseries counts most collected first (ties by name)"""
+    return dict(sorted(series_counts.items(), key=lambda x: (-x[1], str(x[0]))))
+
+def top_words(word_counts, count=8):
+    """Get the most common model name words (ties by word)"""
+    return dict(heapq.nsmallest(count, word_counts.items(), key=lambda x: (-x[1], x[0])))
+
+def build_statistics(total_models, series_breakdown, common_words, recent_additions):
+    """
+    Build the statistics response from the ordered subseries counts, the most common
+    model name words and the last rows added (oldest first)
+    """
+    from series_config import find_main_series_for_subseries, get_all_series
+    
+    # Group by main series categories
+    main_series_breakdown = {}
+    for subseries, count in series_breakdown.items():
+        main_series = find_main_series_for_subseries(subseries) if subseries else None
+        if main_series:
+            main_series_breakdown[main_series] = main_series_breakdown.get(main_series, 0) + count
+        else:
+            main_series_breakdown["Others"] = main_series_breakdown.get("Others", 0) + count
+    
+    # Recent additions - reversed so newest shows first
+    recent_additions = [dict(item) for item in reversed(recent_additions)]
+    
+    # Add main series information to each recent addition
+    if series_breakdown:
+        for item in recent_additions:
+            subseries = item.get('Series', '')
+            if subseries:
+                main_series = find_main_series_for_subseries(subseries)
+                item['Main Series'] = main_series if main_series else 'Others'
+            else:
+                item['Main Series'] = 'Others'
+    
+    # Collection goals
+    next_milestone = None
+    for milestone in MILESTONES:
+        if total_models < milestone:
+            next_milestone = milestone
+            break
+    
+    collection_goals = {
+        "current_count": total_models,
+        "next_milestone": next_milestone,
+        "progress_percentage": (total_models / next_milestone * 100) if next_milestone else 100
+    }
+    
+    # Collection insights
+    collection_insights = {}
+    
+    # Top series (most collected)
+    if main_series_breakdown:
+        top_series = sorted(main_series_breakdown.items(), key=lambda x: x[1], reverse=True)
+        collection_insights["top_series"] = dict(top_series[:3])
+    
+    # Collection diversity
+    if main_series_breakdown and len(main_series_breakdown) > 0:
+        max_count = max(main_series_breakdown.values())
+        min_count = min(main_series_breakdown.values())
+        if max_count > 0:
+            diversity = (1 - (max_count - min_count) / max_count) * 100 if max_count > min_count else 100
+            collection_insights["diversity_score"] = round(diversity, 1)
+        else:
+            collection_insights["diversity_score"] = 0
+    
+    # Most popular subseries (top 5)
+    if series_breakdown:
+        top_subseries = sorted(series_breakdown.items(), key=lambda x: x[1], reverse=True)
+        collection_insights["top_subseries"] = dict(top_subseries[:5])
+    
+    # Series coverage
+    if main_series_breakdown:
+        all_main_series = get_all_series()
+        covered_series = len(main_series_breakdown)
+        total_possible_series = len(all_main_series)
+        collection_insights["series_coverage"] = {
+            "covered": covered_series,
+            "total": total_possible_series,
+            "percentage": round((covered_series / total_possible_series * 100) if total_possible_series > 0 else 0, 1)
+        }
+    
+    # Model name insights (common words only)
+    if common_words is not None:
+        collection_insights["common_words"] = common_words
+    
+    return {
+        "total_models": total_models,
+        "series_breakdown": series_breakdown,
+        "main_series_breakdown": main_series_breakdown,
+        "recent_additions": recent_additions,
+        "collection_goals": collection_goals,
+        "collection_insights": collection_insights
+    }
+
+def compute_collection_statistics(df):
+    """Compute the collection statistics from scratch (the full-rebuild path)"""
     try:
-        df = load_excel_data()
         if df is None or df.empty:
-            return {
-                "total_models": 0,
-                "series_breakdown": {},
-                "main_series_breakdown": {},
-                "recent_additions": [],
-                "collection_goals": {},
-                "collection_insights": {}
-            }
-        
-        # Basic statistics
-        total_models = len(df)
+            return empty_statistics()
         
         # Series breakdown (by subseries)
-        series_column = 'Series' if 'Series' in df.columns else df.columns[2] if len(df.columns) > 2 else None
-        series_breakdown = {}
-        main_series_breakdown = {}
+        series_column = get_series_column(df)
+        series_breakdown = order_series_breakdown(df[series_column].value_counts().to_dict()) if series_column else {}
         
-        if series_column:
-            series_counts = df[series_column].value_counts()
-            series_breakdown = series_counts.to_dict()
-            
-            # Group by main series categories
-            series_management_path = os.path.join(os.path.dirname(__file__), '..', 'series-management')
-            sys.path.insert(0, series_management_path)
-            from series_config import find_main_series_for_subseries
-            
-            for subseries, count in series_counts.items():
-                main_series = find_main_series_for_subseries(subseries) if subseries else None
-                if main_series:
-                    main_series_breakdown[main_series] = main_series_breakdown.get(main_series, 0) + count
-                else:
-                    main_series_breakdown["Others"] = main_series_breakdown.get("Others", 0) + count
+        # Model name word counts
+        model_column = get_model_column(df)
+        common_words = None
+        if model_column:
+            word_counts = Counter()
+            for name in df[model_column].dropna().astype(str):
+                word_counts.update(model_name_words(name))
+            common_words = top_words(word_counts)
         
-        # Recent additions (last 10) - reversed so newest shows first
+        # Last 10 rows added
         recent_additions = df.tail(10).to_dict('records')
-        recent_additions.reverse()
-        
-        # Add main series information to each recent addition
-        if series_column:
-            series_management_path = os.path.join(os.path.dirname(__file__), '..', 'series-management')
-            sys.path.insert(0, series_management_path)
-            from series_config import find_main_series_for_subseries
-            for item in recent_additions:
-                subseries = item.get('Series', '')
-                if subseries:
-                    main_series = find_main_series_for_subseries(subseries)
-                    item['Main Series'] = main_series if main_series else 'Others'
-                else:
-                    item['Main Series'] = 'Others'
-        
-        # Collection goals
-        milestones = [10, 25, 50, 100, 250, 500, 1000]
-        next_milestone = None
-        for milestone in milestones:
-            if total_models < milestone:
-                next_milestone = milestone
-                break
-        
-        collection_goals = {
-            "current_count": total_models,
-            "next_milestone": next_milestone,
-            "progress_percentage": (total_models / next_milestone * 100) if next_milestone else 100
-        }
         
-        # Collection insights
-        collection_insights = {}
-        
-        # Top series (most collected)
-        if main_series_breakdown:
-            top_series = sorted(main_series_breakdown.items(), key=lambda x: x[1], reverse=True)
-            collection_insights["top_series"] = dict(top_series[:3])
-        
-        # Collection diversity
-        if main_series_breakdown and len(main_series_breakdown) > 0:
-            max_count = max(main_series_breakdown.values())
-            min_count = min(main_series_breakdown.values())
-            if max_count > 0:
-                diversity = (1 - (max_count - min_count) / max_count) * 100 if max_count > min_count else 100
-                collection_insights["diversity_score"] = round(diversity, 1)
+        return build_statistics(len(df), series_breakdown, common_words, recent_additions)
+    except Exception as e:
+        raise Exception(f"Error getting statistics: {str(e)}")
+
+class AnalyticsState:
+    """
+    Materialised analytics for one collection: subseries and word counters that are
+    patched with each write instead of being recounted on every request
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.series_column = get_series_column(df)
+        self.model_column = get_model_column(df)
+        self.series_counts = Counter()
+        self.word_counts = Counter() if self.model_column else None
+        self._summary = None  # (series breakdown, common words), rebuilt after a change
+        self._lock = threading.Lock()
+        self._count_rows(df, 1)
+
+    def _count_rows(self, rows, sign):
+        """Add (sign=1) or remove (sign=-1) the contribution of some rows"""
+        if self.series_column:
+            values = rows[self.series_column].tolist()
+            if sign > 0:
+                self.series_counts.update(values)
             else:
-                collection_insights["diversity_score"] = 0
-        
-        # Most popular subseries (top 5)
-        if series_breakdown:
-            top_subseries = sorted(series_breakdown.items(), key=lambda x: x[1], reverse=True)
-            collection_insights["top_subseries"] = dict(top_subseries[:5])
-        
-        # Series coverage
-        if main_series_breakdown:
-            series_management_path = os.path.join(os.path.dirname(__file__), '..', 'series-management')
-            sys.path.insert(0, series_management_path)
-            from series_config import get_all_series
-            all_main_series = get_all_series()
-            covered_series = len(main_series_breakdown)
-            total_possible_series = len(all_main_series)
-            collection_insights["series_coverage"] = {
-                "covered": covered_series,
-                "total": total_possible_series,
-                "percentage": round((covered_series / total_possible_series * 100) if total_possible_series > 0 else 0, 1)
-            }
-        
-        # Model name insights (common words only)
-        model_column = 'Model Name' if 'Model Name' in df.columns else df.columns[1] if len(df.columns) > 1 else None
-        if model_column:
-            model_names = df[model_column].dropna().astype(str)
-            stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'series'}
-            all_words = []
-            for name in model_names:
-                words = [w.lower().strip('.,!?()[]{}') for w in name.split() if len(w) > 2 and w.lower() not in stop_words]
-                all_words.extend(words)
-            word_counts = Counter(all_words)
-            collection_insights["common_words"] = dict(word_counts.most_common(8))
-        
-        return {
-            "total_models": total_models,
-            "series_breakdown": series_breakdown,
-            "main_series_breakdown": main_series_breakdown,
-            "recent_additions": recent_additions,
-            "collection_goals": collection_goals,
-            "collection_insights": collection_insights
-        }
+                self.series_counts.subtract(values)
+                for value in set(values):
+                    if self.series_counts[value] <= 0:
+                        del self.series_counts[value]
+        if self.model_column:
+            words = []
+            for name in rows[self.model_column].dropna().astype(str):
+                words.extend(model_name_words(name))
+            if sign > 0:
+                self.word_counts.update(words)
+            else:
+                self.word_counts.subtract(words)
+                for word in set(words):
+                    if self.word_counts[word] <= 0:
+                        del self.word_counts[word]
+
+    def apply_change(self, kind, positions, old_df, df):
+        """Apply the deltas of rows inserted, updated or deleted; returns False if a rebuild is needed"""
+        if get_series_column(df) != self.series_column or get_model_column(df) != self.model_column:
+            return False
+        with self._lock:
+            if kind in ("update", "delete"):
+                self._count_rows(old_df.iloc[positions], -1)
+            if kind in ("insert", "update"):
+                self._count_rows(df.iloc[positions], 1)
+            elif kind != "delete":
+                return False
+            self.df = df
+            self._summary = None
+        return True
+
+    def statistics(self):
+        """Build the statistics response from the counters (treat the result as read-only)"""
+        with self._lock:
+            if self.df.empty:
+                return empty_statistics()
+            if self._summary is None:
+                self._summary = (
+                    order_series_breakdown(self.series_counts),
+                    top_words(self.word_counts) if self.word_counts is not None else None
+                )
+            series_breakdown, common_words = self._summary
+            total_models = len(self.df)
+            recent_additions = self.df.tail(10).to_dict('records')
+        return build_statistics(total_models, series_breakdown, common_words, recent_additions)
+
+def get_collection_statistics():
+    """Get comprehensive collection statistics"""
+    try:
+        state = get_derived(COLLECTION, "analytics", AnalyticsState)
+        if state is None:
+            return empty_statistics()
+        return state.statistics()
     except Exception as e:
         raise Exception(f"Error getting statistics: {str(e)}")
+
+def verify_collection_statistics():
+    """Check the live statistics against a full rebuild, returns the names of the fields that differ"""
+    live = get_collection_statistics()
+    full = compute_collection_statistics(load_excel_data())
+    mismatches = [key for key in full if key != "collection_insights" and live.get(key) != full[key]]
+    
+    live_insights = live.get("collection_insights", {})
+    full_insights = full.get("collection_insights", {})
+    for key in set(live_insights) | set(full_insights):
+        if live_insights.get(key) != full_insights.get(key):
+            mismatches.append(f"collection_insights.{key}")
+    return mismatches
+
+if __name__ == "__main__":
+    # Compare the incrementally maintained statistics with a full rebuild
+    mismatches = verify_collection_statistics()
+    if mismatches:
+        print(f"[ERROR] Live analytics differ from a full rebuild: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("[SUCCESS] Live analytics match a full rebuild")
@@ -2,8 +2,18 @@
 class DieCastTracker {
     constructor() {
         this.currentData = [];
-        this.filteredData = [];
         this.columns = [];
+        // Server-side paging state
+        this.pageSize = 100;
+        this.nextCursor = null;
+        this.sort = 'S.No';
+        this.query = '';
+        this.totalMatching = 0;
+        // Data version of the loaded rows, used to fetch only what changed since (/api/changes)
+        this.version = null;
+        this.syncChain = Promise.resolve();
+        this.isLoadingPage = false;
+        this.searchTimer = null;
         this.currentEditingRow = null;
         this.currentDeletingRow = null;
         this.init();
@@ -13,6 +23,12 @@ class DieCastTracker {
         this.bindEvents();
         this.loadData();
         this.setupModals();
+        // Changes made in another tab or by the CLI are patched in as they happen
+        onTableChange((table, version) => {
+            if (table === 'collection' && this.version !== null && version !== this.version) {
+                this.syncChanges();
+            }
+        });
     }
 
     setupModals() {
@@ -39,63 +55,175 @@ class DieCastTracker {
         const searchInput = document.getElementById('search-input');
         const clearSearchBtn = document.getElementById('clear-search');
         
-        searchInput.addEventListener('input', (e) => this.handleSearch(e.target.value));
+        // Debounce typing so the server is queried once the user pauses
+        searchInput.addEventListener('input', (e) => {
+            clearTimeout(this.searchTimer);
+            this.searchTimer = setTimeout(() => this.handleSearch(e.target.value), 250);
+        });
         clearSearchBtn.addEventListener('click', () => this.clearSearch());
 
         // Control buttons
         document.getElementById('refresh-btn').addEventListener('click', () => this.loadData());
         document.getElementById('export-btn').addEventListener('click', () => this.exportCSV());
+        document.getElementById('load-more-btn').addEventListener('click', () => this.loadMore());
+
+        // Fetch the next page when scrolling near the bottom of the table
+        const container = document.getElementById('table-container');
+        container.addEventListener('scroll', () => {
+            if (container.scrollTop + container.clientHeight >= container.scrollHeight - 100) {
+                this.loadMore();
+            }
+        });
 
         // Enter key for search
         searchInput.addEventListener('keydown', (e) => {
             if (e.key === 'Enter') {
+                clearTimeout(this.searchTimer);
                 this.handleSearch(e.target.value);
             }
         });
     }
 
+    buildDataUrl(cursor = null, paged = true) {
+        const params = new URLSearchParams();
+        if (paged) params.set('limit', this.pageSize);
+        if (cursor) params.set('cursor', cursor);
+        if (this.sort) params.set('sort', this.sort);
+        if (this.query) params.set('q', this.query);
+        return `/api/data?${params.toString()}`;
+    }
+
+    async fetchPage(cursor = null) {
+        const result = await fetchJSONCached(this.buildDataUrl(cursor));
+        if (!result.success) {
+            throw new Error(result.message || 'Failed to load data');
+        }
+        return result;
+    }
+
     async loadData() {
         this.showLoading();
         this.hideError();
         
+        this.isLoadingPage = true;
         try {
-            const response = await fetch('/api/data');
-            const result = await response.json();
-            
-            if (result.success) {
-                this.currentData = result.data;
-                this.filteredData = [...this.currentData];
-                this.columns = result.columns || [];
-                this.updateStats(result);
-                this.renderTable(this.filteredData, result.columns);
-                this.hideLoading();
-            } else {
-                throw new Error(result.message || 'Failed to load data');
-            }
+            const result = await this.fetchPage();
+            this.currentData = result.data;
+            this.columns = result.columns || [];
+            this.nextCursor = result.next_cursor;
+            this.version = result.version ?? null;
+            this.updateStats(result);
+            this.renderTable(this.currentData, this.columns);
+            this.hideLoading();
         } catch (error) {
             console.error('Error loading data:', error);
             this.showError(`Failed to load data: ${error.message}`);
             this.hideLoading();
+        } finally {
+            this.isLoadingPage = false;
+            this.updateLoadMore();
         }
     }
 
-    handleSearch(query) {
-        const searchBtn = document.getElementById('clear-search');
+    async loadMore() {
+        if (!this.nextCursor || this.isLoadingPage) return;
         
-        if (query.trim() === '') {
-            this.filteredData = [...this.currentData];
-            searchBtn.style.display = 'none';
-        } else {
-            searchBtn.style.display = 'block';
-            this.filteredData = this.currentData.filter(item => 
-                Object.values(item).some(value => 
-                    value.toString().toLowerCase().includes(query.toLowerCase())
-                )
-            );
+        this.isLoadingPage = true;
+        try {
+            const result = await this.fetchPage(this.nextCursor);
+            // The collection changed since the loaded pages were fetched: bring them up to date first
+            if (result.version !== this.version && !(await this.syncChanges())) return;
+            this.currentData = this.currentData.concat(result.data);
+            this.nextCursor = result.next_cursor;
+            this.updateStats(result);
+            this.appendRows(result.data, this.columns, this.currentData.length - result.data.length);
+        } catch (error) {
+            console.error('Error loading more data:', error);
+            this.showError(`Failed to load data: ${error.message}`);
+        } finally {
+            this.isLoadingPage = false;
+            this.updateLoadMore();
         }
-        
+    }
+
+    syncChanges() {
+        // One sync at a time, so the same changes are never applied twice
+        this.syncChain = this.syncChain.then(() => this.fetchChanges());
+        return this.syncChain;
+    }
+
+    async fetchChanges() {
+        // Patch the loaded rows with the rows changed since they were fetched; reload when the server cannot tell
+        if (this.version === null) {
+            await this.loadData();
+            return false;
+        }
+        const since = this.version;
+        try {
+            const response = await fetch(`/api/changes?table=collection&since=${since}`, { cache: 'no-store' });
+            const result = await response.json();
+            // Reloaded meanwhile, the rows are already current
+            if (this.version !== since) return true;
+            if (!result.success || result.reset) {
+                await this.loadData();
+                return false;
+            }
+            this.applyChanges(result);
+            return true;
+        } catch (error) {
+            console.error('Error loading changes:', error);
+            await this.loadData();
+            return false;
+        }
+    }
+
+    applyChanges(result) {
+        const deleted = new Set(result.deleted);
+        const updated = new Map(result.updated.map(row => [row['Record ID'], row]));
+        // S.No is the position in record ID order, so it drops by one for every earlier row deleted
+        const deletedBefore = (recordId) => {
+            let low = 0, high = result.deleted.length;
+            while (low < high) {
+                const middle = (low + high) >> 1;
+                if (result.deleted[middle] < recordId) low = middle + 1; else high = middle;
+            }
+            return low;
+        };
+
+        const loaded = this.currentData.length;
+        this.currentData = this.currentData
+            .filter(row => !deleted.has(row['Record ID']))
+            .map(row => {
+                if (updated.has(row['Record ID'])) return updated.get(row['Record ID']);
+                const shift = deletedBefore(row['Record ID']);
+                return shift ? { ...row, 'S.No': row['S.No'] - shift } : row;
+            });
+        let change = this.currentData.length - loaded;
+
+        // New rows come last in S.No order; in other views they show up with the next page or reload
+        if (!this.query && this.sort === 'S.No' && !this.nextCursor) {
+            this.currentData = this.currentData.concat(result.inserted);
+            change += result.inserted.length;
+        }
+
+        this.version = result.version;
+        document.getElementById('total-models').textContent = result.total_records;
+        this.totalMatching = Math.max(0, this.totalMatching + change);
         this.updateFilteredCount();
-        this.renderTable(this.filteredData);
+        this.renderTable(this.currentData, this.columns);
+    }
+
+    updateLoadMore() {
+        document.getElementById('load-more').style.display = this.nextCursor ? 'block' : 'none';
+    }
+
+    handleSearch(query) {
+        const searchBtn = document.getElementById('clear-search');
+        searchBtn.style.display = query.trim() === '' ? 'none' : 'block';
+        
+        if (query.trim() === this.query) return;
+        this.query = query.trim();
+        this.loadData();
     }
 
     clearSearch() {
@@ -104,18 +232,24 @@ class DieCastTracker {
         
         searchInput.value = '';
         clearSearchBtn.style.display = 'none';
-        this.filteredData = [...this.currentData];
-        this.updateFilteredCount();
-        this.renderTable(this.filteredData);
+        this.query = '';
+        this.loadData();
+    }
+
+    handleSort(column) {
+        // Clicking the sorted column again flips the direction
+        this.sort = this.sort === column ? `-${column}` : column;
+        this.loadData();
     }
 
     updateStats(result) {
         document.getElementById('total-models').textContent = result.total_records || 0;
+        this.totalMatching = result.total_matching ?? result.data.length;
         this.updateFilteredCount();
     }
 
     updateFilteredCount() {
-        document.getElementById('filtered-count').textContent = this.filteredData.length;
+        document.getElementById('filtered-count').textContent = this.totalMatching;
     }
 
     renderTable(data, columns = null) {
@@ -135,7 +269,7 @@ class DieCastTracker {
 
         // Get columns from data if not provided
         if (!columns && data.length > 0) {
-            columns = Object.keys(data[0]);
+            columns = Object.keys(data[0]).filter(col => col !== 'Record ID');
         }
 
         // Render header
@@ -143,8 +277,14 @@ class DieCastTracker {
         const headerRow = document.createElement('tr');
         columns.forEach(column => {
             const th = document.createElement('th');
-            th.className = 'px-3 py-4 text-left text-xs font-semibold text-white uppercase tracking-wider whitespace-nowrap';
+            th.className = 'px-3 py-4 text-left text-xs font-semibold text-white uppercase tracking-wider whitespace-nowrap cursor-pointer select-none hover:bg-white/10';
             th.textContent = this.formatColumnName(column);
+            if (this.sort === column || this.sort === `-${column}`) {
+                const icon = document.createElement('i');
+                icon.className = this.sort.startsWith('-') ? 'fas fa-sort-down ml-1' : 'fas fa-sort-up ml-1';
+                th.appendChild(icon);
+            }
+            th.onclick = () => this.handleSort(column);
             headerRow.appendChild(th);
         });
         // Add Actions column header
@@ -156,7 +296,13 @@ class DieCastTracker {
 
         // Render body
         tableBody.innerHTML = '';
-        data.forEach((row, index) => {
+        this.appendRows(data, columns);
+    }
+
+    appendRows(data, columns, offset = 0) {
+        const tableBody = document.getElementById('table-body');
+        data.forEach((row, rowIndex) => {
+            const index = offset + rowIndex;
             const tr = document.createElement('tr');
             tr.className = index % 2 === 0 ? 'bg-white hover:bg-gray-50 transition-colors' : 'bg-gray-50 hover:bg-gray-100 transition-colors';
             columns.forEach(column => {
@@ -208,20 +354,38 @@ class DieCastTracker {
         return value.toString();
     }
 
-    exportCSV() {
-        if (this.filteredData.length === 0) {
+    async exportCSV() {
+        // Export every matching row, not just the pages loaded so far
+        let rows, columns;
+        try {
+            const result = await fetchJSONCached(this.buildDataUrl(null, false));
+            if (!result.success) {
+                throw new Error(result.message || 'Failed to load data');
+            }
+            rows = result.data;
+            columns = result.columns;
+        } catch (error) {
+            console.error('Error exporting data:', error);
+            alert('Failed to export data: ' + error.message);
+            return;
+        }
+
+        if (rows.length === 0) {
             alert('No data to export');
             return;
         }
 
-        const columns = Object.keys(this.filteredData[0]);
+        // The visible columns only: the record ID stays internal
+        if (!columns || columns.length === 0) {
+            columns = Object.keys(rows[0]).filter(col => col !== 'Record ID');
+        }
         const csvContent = [];
         
         // Header
         csvContent.push(columns.map(col => `"${col}"`).join(','));
         
         // Data rows
-        this.filteredData.forEach(row => {
+        rows.forEach(row => {
             const values = columns.map(col => {
                 const value = row[col];
                 return `"${value?.toString().replace(/"/g, '""') || ''}"`;
@@ -286,10 +450,10 @@ class DieCastTracker {
         console.log('Row data keys:', Object.keys(row));
         console.log('Columns array:', this.columns);
         
-        // Generate form fields for all columns except S.No
+        // Generate form fields for all columns except S.No and the record ID
         columnsToShow.forEach(column => {
-            // Skip serial number and any empty column names
-            if (column === 'S.No' || !column || column.trim() === '') return;
+            // Skip serial number, the internal record ID and any empty column names
+            if (column === 'S.No' || column === 'Record ID' || !column || column.trim() === '') return;
             
             // Get value from row, handling different possible key formats
             let value = row[column];
@@ -420,7 +584,7 @@ class DieCastTracker {
         
         // Use FormData to collect all inputs - this avoids fragile getElementById lookups
         for (const [name, value] of formData.entries()) {
-            if (name === 'S.No' || !name || name.trim() === '') continue;
+            if (name === 'S.No' || name === 'Record ID' || !name || name.trim() === '') continue;
             
             const newValue = String(value || '').trim();
             const oldValue = String(this.currentEditingRow[name] ?? '').trim();
@@ -442,7 +606,7 @@ class DieCastTracker {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    serial_number: this.currentEditingRow['S.No'],
+                    id: this.currentEditingRow['Record ID'],
                     updates: updates
                 })
             });
@@ -452,7 +616,7 @@ class DieCastTracker {
             if (result.success) {
                 alert('Success: ' + result.message);
                 this.closeEditModal();
-                this.loadData(); // Refresh the data
+                this.syncChanges(); // Patch the edited row into the table
             } else {
                 alert('Error: ' + result.error);
             }
@@ -515,7 +679,7 @@ class DieCastTracker {
             return;
         }
         
-        const serialNumber = this.currentDeletingRow['S.No'];
+        const recordId = this.currentDeletingRow['Record ID'];
         
         try {
             const response = await fetch('/api/delete-model', {
@@ -524,7 +688,7 @@ class DieCastTracker {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    serial_number: serialNumber
+                    id: recordId
                 })
             });
 
@@ -533,7 +697,7 @@ class DieCastTracker {
             if (result.success) {
                 alert('Success: ' + result.message);
                 this.closeDeleteModal();
-                this.loadData(); // Refresh the data
+                this.syncChanges(); // Drop the deleted row from the table
             } else {
                 alert('Error: ' + result.error);
             }
@@ -9,120 +9,166 @@ import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from utils.backup_utils import create_backup
-from openpyxl import load_workbook
+from utils.collection_store import load_collection, get_derived, edit_table, missing_record_ids
+from utils.search_index import SearchIndex
+from utils.storage import COLLECTION, SERIAL_COLUMN, get_storage
 
 # Path to the Excel file
 EXCEL_FILE_PATH = os.path.join("data", "HW_list.xlsx")
 
 def load_excel_data():
-    """Load data from the Excel file"""
+    """Load the collection data (cached until it changes)"""
     try:
-        if os.path.exists(EXCEL_FILE_PATH):
-            import pandas as pd
-            df = pd.read_excel(EXCEL_FILE_PATH)
-            df = df.fillna("")
-            return df
-        else:
-            return None
+        return load_collection()
     except Exception as e:
         raise Exception(f"Error loading Excel file: {str(e)}")
 
-def update_model(serial_number: int, updates: dict):
-    """Update a model in the Excel file"""
+def update_model(record_id: int, updates: dict):
+    """Update a model in the collection"""
     try:
-        # Create backup before update
-        if not create_backup(EXCEL_FILE_PATH):
-            raise Exception("Failed to create backup")
-        
-        # Load existing workbook
-        if not os.path.exists(EXCEL_FILE_PATH):
-            raise Exception("Excel file not found")
+        storage = get_storage()
+        if not storage.exists(COLLECTION):
+            raise Exception("Collection not found")
         
-        wb = load_workbook(EXCEL_FILE_PATH)
-        ws = wb.active
+        # Only the collection's own columns can be changed (not S.No or the record ID)
+        if not updates:
+            raise Exception("No updates given")
+        columns = set(storage.headers(COLLECTION)) - {SERIAL_COLUMN}
+        unknown = sorted(set(updates) - columns)
+        if unknown:
+            raise Exception(f"Unknown fields: {', '.join(unknown)}")
         
-        # Find the row with the given serial number
-        target_row = None
-        for row_num in range(2, ws.max_row + 1):
-            if ws.cell(row=row_num, column=1).value == serial_number:
-                target_row = row_num
-                break
-        
-        if target_row is None:
-            raise Exception(f"Model with serial number {serial_number} not found")
-        
-        # Get headers from first row
-        headers = [cell.value for cell in ws[1]]
+        # Create backup before update
+        if not storage.backup(COLLECTION):
+            raise Exception("Failed to create backup")
         
         # Update the fields that are provided
-        for field_name, new_value in updates.items():
-            if field_name in headers:
-                col_index = headers.index(field_name) + 1
-                ws.cell(row=target_row, column=col_index, value=str(new_value).strip() if new_value else "")
+        values = {field_name: str(new_value).strip() if new_value else "" for field_name, new_value in updates.items()}
+        with edit_table(COLLECTION) as collection:
+            found = collection.update_rows({record_id: values})
+        if not found:
+            raise Exception(f"Model with record ID {record_id} not found")
         
-        # Save workbook
-        wb.save(EXCEL_FILE_PATH)
         return True
     except Exception as e:
         raise Exception(f"Error updating model: {str(e)}")
 
-def delete_model(serial_number: int):
-    """Delete a model from the Excel file"""
+def delete_model(record_id: int):
+    """Delete a model from the collection"""
     try:
+        storage = get_storage()
+        if not storage.exists(COLLECTION):
+            raise Exception("Collection not found")
+        
         # Create backup before deletion
-        if not create_backup(EXCEL_FILE_PATH):
+        if not storage.backup(COLLECTION):
             raise Exception("Failed to create backup")
         
-        # Load existing workbook
-        if not os.path.exists(EXCEL_FILE_PATH):
-            raise Exception("Excel file not found")
+        # Delete the row (the rows after it keep their record IDs)
+        with edit_table(COLLECTION) as collection:
+            deleted = collection.delete_rows([record_id])
+        if not deleted:
+            raise Exception(f"Model with record ID {record_id} not found")
         
-        wb = load_workbook(EXCEL_FILE_PATH)
-        ws = wb.active
+        return True
+    except Exception as e:
+        raise Exception(f"Error deleting model: {str(e)}")
+
+def update_models(updates: dict):
+    """
+    Update several models at once with a single backup and a single save
+    updates maps record IDs to {field_name: new_value}; nothing is changed if any of them is invalid.
+    """
+    try:
+        storage = get_storage()
+        if not storage.exists(COLLECTION):
+            raise Exception("Collection not found")
         
-        # Find the row with the given serial number
-        target_row = None
-        for row_num in range(2, ws.max_row + 1):
-            if ws.cell(row=row_num, column=1).value == serial_number:
-                target_row = row_num
-                break
+        # Validate the whole batch before touching the collection
+        if not updates:
+            raise Exception("No updates given")
+        missing = missing_record_ids(COLLECTION, updates)
+        if missing:
+            raise Exception(f"Models not found: {', '.join(str(r) for r in missing)}")
+        columns = set(storage.headers(COLLECTION)) - {SERIAL_COLUMN}
+        unknown = sorted({field_name for fields in updates.values() for field_name in fields} - columns)
+        if unknown:
+            raise Exception(f"Unknown fields: {', '.join(unknown)}")
         
-        if target_row is None:
-            raise Exception(f"Model with serial number {serial_number} not found")
+        # One backup for the whole batch
+        if not storage.backup(COLLECTION):
+            raise Exception("Failed to create backup")
         
-        # Delete the row
-        ws.delete_rows(target_row)
+        values = {
+            int(record_id): {field_name: str(new_value).strip() if new_value else "" for field_name, new_value in fields.items()}
+            for record_id, fields in updates.items()
+        }
+        with edit_table(COLLECTION) as collection:
+            found = collection.update_rows(values)
+            if found != len(values):
+                # Rolls the whole batch back
+                raise Exception("Some models were deleted while updating, nothing was changed")
         
-        # Renumber serial numbers
-        for row_num in range(2, ws.max_row + 1):
-            ws.cell(row=row_num, column=1, value=row_num - 1)
+        return {
+            "success": True,
+            "updated": found,
+            "message": f"Successfully updated {found} models!"
+        }
+    except Exception as e:
+        raise Exception(f"Error updating models: {str(e)}")
+
+def delete_models(record_ids: list):
+    """Delete several models at once with a single backup and a single save (nothing is deleted if any is missing)"""
+    try:
+        storage = get_storage()
+        if not storage.exists(COLLECTION):
+            raise Exception("Collection not found")
         
-        # Save workbook
-        wb.save(EXCEL_FILE_PATH)
-        return True
+        # Validate the whole batch before touching the collection
+        record_ids = sorted({int(record_id) for record_id in record_ids})
+        if not record_ids:
+            raise Exception("No record IDs given")
+        missing = missing_record_ids(COLLECTION, record_ids)
+        if missing:
+            raise Exception(f"Models not found: {', '.join(str(r) for r in missing)}")
+        
+        # One backup for the whole batch
+        if not storage.backup(COLLECTION):
+            raise Exception("Failed to create backup")
+        
+        # Delete the rows (the others keep their record IDs)
+        with edit_table(COLLECTION) as collection:
+            deleted = collection.delete_rows(record_ids)
+            if deleted != len(record_ids):
+                # Rolls the whole batch back
+                raise Exception("Some models were deleted while deleting, nothing was changed")
+        
+        return {
+            "success": True,
+            "deleted": deleted,
+            "message": f"Successfully deleted {deleted} models!"
+        }
     except Exception as e:
-        raise Exception(f"Error deleting model: {str(e)}")
+        raise Exception(f"Error deleting models: {str(e)}")
+
+def get_search_index():
+    """Get the search index of the collection (built once, then patched on every write)"""
+    return get_derived(COLLECTION, "search_index", SearchIndex)
 
 def search_models(query: str):
     """Search through the data"""
     try:
-        import pandas as pd
-        df = load_excel_data()
-        if df is None:
+        index = get_search_index()
+        if index is None:
             return []
         
         if not query:
             # Return all data if no search query
-            return df.to_dict('records')
+            return index.df.to_dict('records')
         else:
-            # Search across all text columns
-            mask = pd.Series([False] * len(df))
-            for col in df.select_dtypes(include=['object']).columns:
-                mask |= df[col].astype(str).str.contains(query, case=False, na=False)
-            
-            filtered_df = df[mask]
-            return filtered_df.to_dict('records')
+            # Case-insensitive substring match on any text column
+            df, positions = index.search(query)
+            return df.iloc[positions].to_dict('records')
     except Exception as e:
         raise Exception(f"Error searching models: {str(e)}")
 
@@ -2,6 +2,9 @@
 class PreordersManager {
     constructor() {
         this.preorders = [];
+        // Data version of the loaded preorders, used to fetch only what changed since (/api/changes)
+        this.version = null;
+        this.syncChain = Promise.resolve();
         this.init();
     }
 
@@ -9,6 +12,13 @@ class PreordersManager {
         this.bindEvents();
         this.loadPreorders();
         this.loadStatistics();
+        // Changes made in another tab or by the CLI are patched in as they happen
+        onTableChange((table, version) => {
+            if (table === 'preorders' && this.version !== null && version !== this.version) {
+                this.syncPreorders();
+                this.loadStatistics();
+            }
+        });
     }
 
     bindEvents() {
@@ -98,11 +108,11 @@ class PreordersManager {
 
     async loadPreorders() {
         try {
-            const response = await fetch('/api/preorders');
-            const result = await response.json();
+            const result = await fetchJSONCached('/api/preorders');
 
             if (result.success) {
                 this.preorders = result.data;
+                this.version = result.version ?? null;
                 this.renderPreorders();
             } else {
                 throw new Error(result.error || 'Failed to load preorders');
@@ -113,10 +123,46 @@ class PreordersManager {
         }
     }
 
-    async loadStatistics() {
+    syncPreorders() {
+        // One sync at a time, so the same changes are never applied twice
+        this.syncChain = this.syncChain.then(() => this.fetchChanges());
+        return this.syncChain;
+    }
+
+    async fetchChanges() {
+        // Patch the loaded preorders with the rows changed since they were fetched; reload when the server cannot tell
+        if (this.version === null) {
+            return this.loadPreorders();
+        }
+        const since = this.version;
         try {
-            const response = await fetch('/api/preorders/statistics');
+            const response = await fetch(`/api/changes?table=preorders&since=${since}`, { cache: 'no-store' });
             const result = await response.json();
+            // Reloaded meanwhile, the rows are already current
+            if (this.version !== since) return;
+            if (!result.success || result.reset) {
+                return this.loadPreorders();
+            }
+
+            const deleted = new Set(result.deleted);
+            const changed = new Map(result.inserted.concat(result.updated).map(p => [Number(p['Record ID']), p]));
+            this.preorders = this.preorders
+                .filter(p => !deleted.has(Number(p['Record ID'])) && !changed.has(Number(p['Record ID'])))
+                .concat([...changed.values()])
+                .sort((a, b) => Number(a['Record ID']) - Number(b['Record ID']));
+            // S.No is the position in record ID order
+            this.preorders.forEach((p, index) => { p['S.No'] = index + 1; });
+            this.version = result.version;
+            this.renderPreorders();
+        } catch (error) {
+            console.error('Error loading preorder changes:', error);
+            return this.loadPreorders();
+        }
+    }
+
+    async loadStatistics() {
+        try {
+            const result = await fetchJSONCached('/api/preorders/statistics');
 
             if (result.success) {
                 this.renderStatistics(result.statistics);
@@ -239,7 +285,7 @@ class PreordersManager {
                     <td class="py-3 px-4">${preorder['On Arrival Amount'] ? '₹' + this.formatAmount(preorder['On Arrival Amount']) : 'N/A'}</td>
                     <td class="py-3 px-4">
                         <div class="relative inline-block">
-                            <select class="status-dropdown ${statusClass}" data-serial="${preorder['S.No']}" onchange="preordersManager.updateStatus(this.dataset.serial, this.value)" title="Change delivery status">
+                            <select class="status-dropdown ${statusClass}" data-id="${preorder['Record ID']}" onchange="preordersManager.updateStatus(this.dataset.id, this.value)" title="Change delivery status">
                                 <option value="Pending" ${(preorder['Delivery Status'] || 'Pending') === 'Pending' ? 'selected' : ''}>Pending</option>
                                 <option value="Shipped" ${(preorder['Delivery Status'] || 'Pending') === 'Shipped' ? 'selected' : ''}>Shipped</option>
                                 <option value="Delivered" ${(preorder['Delivery Status'] || 'Pending') === 'Delivered' ? 'selected' : ''}>Delivered</option>
@@ -249,10 +295,10 @@ class PreordersManager {
                     </td>
                     <td class="py-3 px-4">
                         <div class="flex items-center gap-2">
-                            <button class="btn-action btn-edit inline-flex items-center justify-center" data-serial="${preorder['S.No']}" onclick="preordersManager.editPreorder(this.dataset.serial)" title="Edit">
+                            <button class="btn-action btn-edit inline-flex items-center justify-center" data-id="${preorder['Record ID']}" onclick="preordersManager.editPreorder(this.dataset.id)" title="Edit">
                                 <i class="fas fa-edit"></i>
                             </button>
-                            <button class="btn-action btn-delete inline-flex items-center justify-center" data-serial="${preorder['S.No']}" onclick="preordersManager.deletePreorder(this.dataset.serial)" title="Delete">
+                            <button class="btn-action btn-delete inline-flex items-center justify-center" data-id="${preorder['Record ID']}" onclick="preordersManager.deletePreorder(this.dataset.id)" title="Delete">
                                 <i class="fas fa-trash"></i>
                             </button>
                         </div>
@@ -273,23 +319,23 @@ class PreordersManager {
         }
     }
 
-    openModal(serialNumber = null) {
+    openModal(recordId = null) {
         const modal = document.getElementById('preorder-modal');
         const form = document.getElementById('preorder-form');
         const title = document.getElementById('modal-title');
-        const serialInput = document.getElementById('edit-serial');
+        const idInput = document.getElementById('edit-id');
 
-        if (serialNumber !== null && serialNumber !== undefined && serialNumber !== '') {
+        if (recordId !== null && recordId !== undefined && recordId !== '') {
             // Edit mode - convert to number for comparison
-            const serialNum = typeof serialNumber === 'string' ? parseInt(serialNumber, 10) : serialNumber;
+            const recordIdNum = typeof recordId === 'string' ? parseInt(recordId, 10) : recordId;
             const preorder = this.preorders.find(p => {
-                const pSerial = typeof p['S.No'] === 'string' ? parseInt(p['S.No'], 10) : p['S.No'];
-                return pSerial === serialNum;
+                const pId = typeof p['Record ID'] === 'string' ? parseInt(p['Record ID'], 10) : p['Record ID'];
+                return pId === recordIdNum;
             });
             
             if (preorder) {
                 title.textContent = 'Edit Preorder';
-                if (serialInput) serialInput.value = serialNum;
+                if (idInput) idInput.value = recordIdNum;
                 
                 const sellerEl = document.getElementById('seller');
                 const modelsEl = document.getElementById('models');
@@ -307,14 +353,14 @@ class PreordersManager {
                 if (onArrivalEl) onArrivalEl.value = preorder['On Arrival Amount'] || '';
                 if (deliveryStatusEl) deliveryStatusEl.value = preorder['Delivery Status'] || 'Pending';
             } else {
-                console.error('Preorder not found for serial number:', serialNumber);
+                console.error('Preorder not found for record ID:', recordId);
                 this.showError('Preorder not found!');
                 return;
             }
         } else {
             // Add mode
             title.textContent = 'Add Preorder';
-            serialInput.value = '';
+            idInput.value = '';
             form.reset();
         }
 
@@ -325,14 +371,14 @@ class PreordersManager {
         const modal = document.getElementById('preorder-modal');
         modal.classList.add('hidden');
         document.getElementById('preorder-form').reset();
-        document.getElementById('edit-serial').value = '';
+        document.getElementById('edit-id').value = '';
     }
 
     async handleSubmit(event) {
         event.preventDefault();
         
         const formData = new FormData(event.target);
-        const serialNumber = document.getElementById('edit-serial').value;
+        const recordId = document.getElementById('edit-id').value;
         
         const data = {
             seller: formData.get('seller').trim(),
@@ -358,9 +404,9 @@ class PreordersManager {
 
         try {
             let response;
-            if (serialNumber) {
+            if (recordId) {
                 // Update existing preorder
-                response = await fetch(`/api/preorders/${serialNumber}`, {
+                response = await fetch(`/api/preorders/${recordId}`, {
                     method: 'PUT',
                     headers: {
                         'Content-Type': 'application/json',
@@ -383,7 +429,7 @@ class PreordersManager {
             if (result.success) {
                 this.showSuccess(result.message);
                 this.closeModal();
-                this.loadPreorders();
+                this.syncPreorders();
                 this.loadStatistics();
             } else {
                 throw new Error(result.error || 'Failed to save preorder');
@@ -397,18 +443,18 @@ class PreordersManager {
         }
     }
 
-    editPreorder(serialNumber) {
+    editPreorder(recordId) {
         // Convert to number if needed
-        const serial = typeof serialNumber === 'string' ? parseInt(serialNumber) : serialNumber;
-        this.openModal(serial);
+        const id = typeof recordId === 'string' ? parseInt(recordId) : recordId;
+        this.openModal(id);
     }
 
-    async updateStatus(serialNumber, newStatus) {
+    async updateStatus(recordId, newStatus) {
         // Convert to number if needed
-        const serial = typeof serialNumber === 'string' ? parseInt(serialNumber) : serialNumber;
+        const id = typeof recordId === 'string' ? parseInt(recordId) : recordId;
         const preorder = this.preorders.find(p => {
-            const pSerial = typeof p['S.No'] === 'string' ? parseInt(p['S.No'], 10) : p['S.No'];
-            return pSerial === serial;
+            const pId = typeof p['Record ID'] === 'string' ? parseInt(p['Record ID'], 10) : p['Record ID'];
+            return pId === id;
         });
         
         if (!preorder) {
@@ -417,13 +463,13 @@ class PreordersManager {
         }
 
         // Show loading state on the dropdown
-        const dropdown = document.querySelector(`select[data-serial="${serial}"]`);
+        const dropdown = document.querySelector(`select[data-id="${id}"]`);
         const originalValue = dropdown.value;
         dropdown.disabled = true;
 
         try {
             // Update only the delivery status
-            const response = await fetch(`/api/preorders/${serial}`, {
+            const response = await fetch(`/api/preorders/${id}`, {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json',
@@ -444,7 +490,7 @@ class PreordersManager {
             if (result.success) {
                 // Update the dropdown class to match new status
                 dropdown.className = `status-dropdown ${this.getStatusClass(newStatus)}`;
-                this.loadPreorders();
+                this.syncPreorders();
                 this.loadStatistics();
             } else {
                 throw new Error(result.error || 'Failed to update status');
@@ -459,13 +505,13 @@ class PreordersManager {
         }
     }
 
-    async deletePreorder(serialNumber) {
+    async deletePreorder(recordId) {
         // Convert to number if needed
-        const serial = typeof serialNumber === 'string' ? parseInt(serialNumber) : serialNumber;
-        const preorder = this.preorders.find(p => String(p['S.No']) === String(serial));
+        const id = typeof recordId === 'string' ? parseInt(recordId) : recordId;
+        const preorder = this.preorders.find(p => String(p['Record ID']) === String(id));
         if (!preorder) return;
 
-        if (!confirm(`Are you sure you want to delete preorder #${serial}?\n\nSeller: ${preorder.Seller}\nModels: ${preorder.Models}\n\nThis action cannot be undone.`)) {
+        if (!confirm(`Are you sure you want to delete preorder #${preorder['S.No']}?\n\nSeller: ${preorder.Seller}\nModels: ${preorder.Models}\n\nThis action cannot be undone.`)) {
             return;
         }
 
@@ -475,7 +521,7 @@ class PreordersManager {
         }
 
         try {
-            const response = await fetch(`/api/preorders/${serial}`, {
+            const response = await fetch(`/api/preorders/${id}`, {
                 method: 'DELETE',
                 headers: {
                     'Content-Type': 'application/json',
@@ -486,7 +532,7 @@ class PreordersManager {
 
             if (result.success) {
                 this.showSuccess(result.message);
-                this.loadPreorders();
+                this.syncPreorders();
                 this.loadStatistics();
             } else {
                 throw new Error(result.error || 'Failed to delete preorder');
@@ -8,226 +8,412 @@ import os
 import sys
 from datetime import datetime
 import pandas as pd
-import math
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from utils.backup_utils import create_backup
-from openpyxl import load_workbook, Workbook
+from utils.collection_store import get_derived, edit_table, missing_record_ids, row_count
+from utils.storage import PREORDERS, SERIAL_COLUMN, get_storage
 
 # Path to the preorders Excel file
 PREORDERS_FILE_PATH = os.path.join("data", "preorders.xlsx")
 
+# API/CLI field names and the preorders columns they map to
+PREORDER_FIELDS = {
+    'seller': 'Seller',
+    'models': 'Models',
+    'eta': 'ETA',
+    'total_price': 'Total Price',
+    'po_amount': 'PO Amount',
+    'on_arrival_amount': 'On Arrival Amount',
+    'delivery_status': 'Delivery Status'
+}
+
+# Fields that must be numbers (or empty)
+PRICE_FIELDS = ['total_price', 'po_amount', 'on_arrival_amount']
+
+# Columns loaded as nullable floats
+AMOUNT_COLUMNS = ['Total Price', 'PO Amount', 'On Arrival Amount']
+
+# Columns loaded as categories (old files use "Status")
+STATUS_COLUMNS = ['Delivery Status', 'Status']
+
+# Characters stripped from amounts before they are parsed
+CURRENCY_CHARACTERS = r"[₹$,\s]"
+
+def parse_amounts(series):
+    """Parse a column of amounts ("₹1,500", 1500.0, "") into floats, NaN where there is no number"""
+    amounts = pd.to_numeric(series, errors="coerce").astype(float)
+    # Only the values that are not plain numbers need their currency symbols and commas removed
+    unparsed = amounts.isna() & series.notna()
+    if unparsed.any():
+        text = series[unparsed].astype(str).str.replace(CURRENCY_CHARACTERS, "", regex=True)
+        amounts[unparsed] = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float)
+    return amounts
+
+def parse_eta(series):
+    """Parse a column of ETAs (YYYY-MM, or full dates from older rows) into monthly periods, NaT if empty"""
+    months = series.astype(str).str[:7]
+    return pd.to_datetime(months, format="%Y-%m", errors="coerce").dt.to_period("M")
+
+def preorder_frame(df):
+    """
+    Build the typed preorders table from the stored one
+    Amounts become nullable floats, the delivery status a category and the ETA a monthly period.
+    """
+    typed = df.copy()
+    for col in AMOUNT_COLUMNS:
+        if col in typed.columns:
+            typed[col] = parse_amounts(typed[col]).astype("Float64")
+    for col in STATUS_COLUMNS:
+        if col in typed.columns:
+            typed[col] = typed[col].astype(str).astype("category")
+    if "ETA" in typed.columns:
+        typed["ETA"] = parse_eta(typed["ETA"])
+    return typed
+
 def load_preorders_data():
-    """Load data from the preorders Excel file"""
+    """Load the preorders as a typed table (built once and cached until the preorders change)"""
     try:
-        if os.path.exists(PREORDERS_FILE_PATH):
-            df = pd.read_excel(PREORDERS_FILE_PATH)
-            # Replace NaN, inf, and -inf values with empty strings or 0 for JSON compatibility
-            df = df.replace([float('inf'), float('-inf')], '')
-            df = df.fillna("")
-            
-            # Clean all columns to ensure JSON compatibility
-            for col in df.columns:
-                # Replace inf/-inf/NaN with empty string for all columns
-                df[col] = df[col].replace([float('inf'), float('-inf')], '')
-                df[col] = df[col].fillna('')
-                
-                # For numeric columns, handle conversion carefully
-                if df[col].dtype in ['float64', 'int64', 'float32', 'int32']:
-                    # Convert to string, handling any remaining issues
-                    df[col] = df[col].apply(lambda x: '' if pd.isna(x) or (isinstance(x, float) and (math.isinf(x) or math.isnan(x))) else str(x) if x != '' else '')
-                else:
-                    # For text columns, ensure they're strings and clean
-                    df[col] = df[col].astype(str).replace('nan', '').replace('None', '')
-            
-            return df
-        else:
-            return None
+        return get_derived(PREORDERS, "typed", preorder_frame)
     except Exception as e:
         raise Exception(f"Error loading preorders file: {str(e)}")
 
-def add_preorder(seller, models, eta, total_price, po_amount, on_arrival_amount, delivery_status=None):
-    """Add a new preorder to the Excel file"""
+def preorders_to_json(df):
+    """Encode the typed preorders as a JSON array of records; missing or infinite values become null"""
+    if "ETA" in df.columns:
+        df = df.assign(ETA=df["ETA"].dt.strftime("%Y-%m"))
+    return df.to_json(orient="records")
+
+def format_eta(eta):
+    """Format an ETA as a month (YYYY-MM) if it is a full date"""
+    # If it's already in YYYY-MM format, use it; otherwise try to parse
+    if len(str(eta)) == 7 and str(eta).count('-') == 1:
+        return str(eta)
     try:
-        # Create backup before adding (if file exists)
-        if os.path.exists(PREORDERS_FILE_PATH):
-            if not create_backup(PREORDERS_FILE_PATH):
-                raise Exception("Failed to create backup")
-        
-        # Load existing workbook or create new one
-        if os.path.exists(PREORDERS_FILE_PATH):
-            wb = load_workbook(PREORDERS_FILE_PATH)
-            ws = wb.active
-            # Check if we need to migrate from old "Status" column to "Delivery Status"
-            headers = [cell.value for cell in ws[1]]
-            if "Status" in headers and "Delivery Status" not in headers:
-                # Migrate old column name to new one
-                status_col = headers.index("Status") + 1
-                ws.cell(row=1, column=status_col, value="Delivery Status")
-                wb.save(PREORDERS_FILE_PATH)
-        else:
-            wb = Workbook()
-            ws = wb.active
-            # Add headers
-            ws.append(["S.No", "Seller", "Models", "ETA", "Total Price", "PO Amount", "On Arrival Amount", "Delivery Status", "Date Added"])
-        
-        # Get next serial number
-        if ws.max_row == 1:
-            serial_number = 1
-        else:
-            serial_number = ws.max_row
-        
+        # Try to parse as date and extract month
+        eta_date = datetime.strptime(str(eta), "%Y-%m-%d")
+        return eta_date.strftime("%Y-%m")
+    except:
+        return str(eta).strip()
+
+def migrate_status_column(storage):
+    """Rename the old "Status" column to "Delivery Status" if needed"""
+    if not storage.exists(PREORDERS):
+        return
+    headers = storage.headers(PREORDERS)
+    if "Status" in headers and "Delivery Status" not in headers:
+        with edit_table(PREORDERS) as preorders:
+            preorders.rename_column("Status", "Delivery Status")
+
+def preorder_row(seller, models, eta, total_price, po_amount, on_arrival_amount, delivery_status=None):
+    """Build the stored row for a new preorder"""
+    return {
+        "Seller": seller.strip() if seller else "",
+        "Models": models.strip() if models else "",
+        "ETA": format_eta(eta) if eta else "",
+        "Total Price": total_price if total_price else "",
+        "PO Amount": po_amount if po_amount else "",
+        "On Arrival Amount": on_arrival_amount if on_arrival_amount else "",
         # Set default delivery status if not provided
-        if not delivery_status:
-            delivery_status = "Pending"
+        "Delivery Status": delivery_status or "Pending",
+        "Date Added": datetime.now().strftime("%Y-%m-%d")
+    }
+
+def map_preorder_fields(updates):
+    """Map API/CLI field names to preorders columns, dropping unknown fields"""
+    return {PREORDER_FIELDS[key]: value for key, value in updates.items() if key in PREORDER_FIELDS}
+
+def add_preorder(seller, models, eta, total_price, po_amount, on_arrival_amount, delivery_status=None):
+    """Add a new preorder"""
+    try:
+        storage = get_storage()
         
-        # Format ETA as month (YYYY-MM) if provided
-        eta_formatted = ""
-        if eta:
-            # If it's already in YYYY-MM format, use it; otherwise try to parse
-            if len(str(eta)) == 7 and str(eta).count('-') == 1:
-                eta_formatted = str(eta)
-            else:
-                try:
-                    # Try to parse as date and extract month
-                    eta_date = datetime.strptime(str(eta), "%Y-%m-%d")
-                    eta_formatted = eta_date.strftime("%Y-%m")
-                except:
-                    eta_formatted = str(eta)
+        # Create backup before adding (if the preorders table exists)
+        if storage.exists(PREORDERS):
+            if not storage.backup(PREORDERS):
+                raise Exception("Failed to create backup")
         
-        # Add new row
-        ws.append([
-            serial_number,
-            seller.strip() if seller else "",
-            models.strip() if models else "",
-            eta_formatted,
-            total_price if total_price else "",
-            po_amount if po_amount else "",
-            on_arrival_amount if on_arrival_amount else "",
-            delivery_status,
-            datetime.now().strftime("%Y-%m-%d")
-        ])
+        # The new preorder gets the highest record ID, so it is shown after the current rows
+        serial_number = row_count(PREORDERS) + 1
         
-        # Save workbook
-        wb.save(PREORDERS_FILE_PATH)
+        with edit_table(PREORDERS) as preorders:
+            # Check if we need to migrate from old "Status" column to "Delivery Status"
+            migrate_status_column(storage)
+            
+            # Add new row
+            record_id = preorders.insert_rows([preorder_row(
+                seller, models, eta, total_price, po_amount, on_arrival_amount, delivery_status
+            )])[0]
         
         return {
             "success": True,
-            "serial_number": serial_number,
+            "id": record_id,
             "message": f"Successfully added preorder #{serial_number}!"
         }
     except Exception as e:
         raise Exception(f"Error adding preorder: {str(e)}")
 
-def update_preorder(serial_number, updates):
-    """Update a preorder in the Excel file"""
+def update_preorder(record_id, updates):
+    """Update a preorder"""
     try:
+        storage = get_storage()
+        if not storage.exists(PREORDERS):
+            raise Exception("Preorders file not found")
+        
         # Create backup before update
-        if not create_backup(PREORDERS_FILE_PATH):
+        if not storage.backup(PREORDERS):
             raise Exception("Failed to create backup")
         
-        # Load existing workbook
-        if not os.path.exists(PREORDERS_FILE_PATH):
+        # Format ETA as month if it's the ETA field
+        values = {}
+        for field_name, new_value in updates.items():
+            if field_name == "ETA" and new_value:
+                values[field_name] = format_eta(new_value)
+            else:
+                values[field_name] = str(new_value).strip() if new_value else ""
+        
+        with edit_table(PREORDERS) as preorders:
+            # Migrate old "Status" column to "Delivery Status" if needed
+            migrate_status_column(storage)
+            found = preorders.update_rows({record_id: values})
+        if not found:
+            raise Exception(f"Preorder with record ID {record_id} not found")
+        return True
+    except Exception as e:
+        raise Exception(f"Error updating preorder: {str(e)}")
+
+def delete_preorder(record_id):
+    """Delete a preorder"""
+    try:
+        storage = get_storage()
+        if not storage.exists(PREORDERS):
             raise Exception("Preorders file not found")
         
-        wb = load_workbook(PREORDERS_FILE_PATH)
-        ws = wb.active
+        # Create backup before deletion
+        if not storage.backup(PREORDERS):
+            raise Exception("Failed to create backup")
         
-        # Find the row with the given serial number
-        target_row = None
-        for row_num in range(2, ws.max_row + 1):
-            if ws.cell(row=row_num, column=1).value == serial_number:
-                target_row = row_num
-                break
+        # Delete the row (the rows after it keep their record IDs)
+        with edit_table(PREORDERS) as preorders:
+            deleted = preorders.delete_rows([record_id])
+        if not deleted:
+            raise Exception(f"Preorder with record ID {record_id} not found")
+        return True
+    except Exception as e:
+        raise Exception(f"Error deleting preorder: {str(e)}")
+
+def add_preorders(preorders: list):
+    """
+    Add several preorders at once with a single backup and a single save
+    preorders is a list of dicts with the PREORDER_FIELDS keys; nothing is added if any of them is invalid.
+    """
+    try:
+        # Validate the whole batch (and turn price text into numbers) before touching the table
+        errors = []
+        rows = []
+        for number, preorder in enumerate(preorders, start=1):
+            preorder = dict(preorder)
+            if not str(preorder.get("seller") or "").strip() and not str(preorder.get("models") or "").strip():
+                errors.append(f"#{number}: seller and models cannot both be empty")
+            for field_name in PRICE_FIELDS:
+                value = preorder.get(field_name)
+                if isinstance(value, str):
+                    try:
+                        preorder[field_name] = float(value) if value.strip() else None
+                    except ValueError:
+                        errors.append(f"#{number}: {field_name} must be a number")
+            rows.append(preorder)
+        if not preorders:
+            errors.append("no preorders given")
+        if errors:
+            raise Exception("Invalid preorders: " + "; ".join(errors))
+        
+        storage = get_storage()
+        
+        # One backup for the whole batch (if the preorders table exists)
+        if storage.exists(PREORDERS):
+            if not storage.backup(PREORDERS):
+                raise Exception("Failed to create backup")
         
-        if target_row is None:
-            raise Exception(f"Preorder with serial number {serial_number} not found")
+        with edit_table(PREORDERS) as preorders:
+            # Check if we need to migrate from old "Status" column to "Delivery Status"
+            migrate_status_column(storage)
+            record_ids = preorders.insert_rows([preorder_row(
+                row.get("seller"), row.get("models"), row.get("eta"), row.get("total_price"),
+                row.get("po_amount"), row.get("on_arrival_amount"), row.get("delivery_status")
+            ) for row in rows])
         
-        # Get headers from first row
-        headers = [cell.value for cell in ws[1]]
+        return {
+            "success": True,
+            "ids": record_ids,
+            "added": len(record_ids),
+            "message": f"Successfully added {len(record_ids)} preorders!"
+        }
+    except Exception as e:
+        raise Exception(f"Error adding preorders: {str(e)}")
+
+def update_preorders(updates: dict):
+    """
+    Update several preorders at once with a single backup and a single save
+    updates maps record IDs to {column: new_value}; nothing is changed if any of them is invalid.
+    """
+    try:
+        storage = get_storage()
+        if not storage.exists(PREORDERS):
+            raise Exception("Preorders file not found")
         
-        # Migrate old "Status" column to "Delivery Status" if needed
-        if "Status" in headers and "Delivery Status" not in headers:
-            status_col = headers.index("Status") + 1
-            ws.cell(row=1, column=status_col, value="Delivery Status")
-            headers[status_col - 1] = "Delivery Status"
-            wb.save(PREORDERS_FILE_PATH)
+        # Validate the whole batch before touching the table
+        if not updates:
+            raise Exception("No updates given")
+        missing = missing_record_ids(PREORDERS, updates)
+        if missing:
+            raise Exception(f"Preorders not found: {', '.join(str(r) for r in missing)}")
+        unknown = sorted({field_name for fields in updates.values() for field_name in fields} - set(PREORDER_FIELDS.values()))
+        if unknown:
+            raise Exception(f"Unknown fields: {', '.join(unknown)}")
+        
+        # One backup for the whole batch
+        if not storage.backup(PREORDERS):
+            raise Exception("Failed to create backup")
         
-        # Update the fields that are provided
-        for field_name, new_value in updates.items():
-            # Handle both old and new column names
-            if field_name in headers:
-                col_index = headers.index(field_name) + 1
-                # Format ETA as month if it's the ETA field
-                if field_name == "ETA" and new_value:
-                    # Format as YYYY-MM if it's a date or already a month
-                    if len(str(new_value)) == 7 and str(new_value).count('-') == 1:
-                        formatted_value = str(new_value)
-                    else:
-                        try:
-                            # Try to parse as date and extract month
-                            eta_date = datetime.strptime(str(new_value), "%Y-%m-%d")
-                            formatted_value = eta_date.strftime("%Y-%m")
-                        except:
-                            formatted_value = str(new_value).strip()
-                    ws.cell(row=target_row, column=col_index, value=formatted_value)
-                else:
-                    ws.cell(row=target_row, column=col_index, value=str(new_value).strip() if new_value else "")
-            elif field_name == "Delivery Status" and "Status" in headers:
-                # If updating Delivery Status but file has old "Status" column, migrate it
-                status_col = headers.index("Status") + 1
-                ws.cell(row=1, column=status_col, value="Delivery Status")
-                ws.cell(row=target_row, column=status_col, value=str(new_value).strip() if new_value else "")
-                headers[status_col - 1] = "Delivery Status"
+        # Format ETA as month if it's the ETA field
+        values = {}
+        for record_id, fields in updates.items():
+            values[int(record_id)] = {
+                field_name: format_eta(new_value) if field_name == "ETA" and new_value else str(new_value).strip() if new_value else ""
+                for field_name, new_value in fields.items()
+            }
         
-        # Update delivery status if provided (after migration check)
-        if "Delivery Status" in updates and "Delivery Status" in headers:
-            delivery_status_col = headers.index("Delivery Status") + 1
-            ws.cell(row=target_row, column=delivery_status_col, value=updates.get("Delivery Status"))
+        with edit_table(PREORDERS) as preorders:
+            # Migrate old "Status" column to "Delivery Status" if needed
+            migrate_status_column(storage)
+            found = preorders.update_rows(values)
+            if found != len(values):
+                # Rolls the whole batch back
+                raise Exception("Some preorders were deleted while updating, nothing was changed")
         
-        # Save workbook
-        wb.save(PREORDERS_FILE_PATH)
-        return True
+        return {
+            "success": True,
+            "updated": found,
+            "message": f"Successfully updated {found} preorders!"
+        }
     except Exception as e:
-        raise Exception(f"Error updating preorder: {str(e)}")
+        raise Exception(f"Error updating preorders: {str(e)}")
 
-def delete_preorder(serial_number):
-    """Delete a preorder from the Excel file"""
+def delete_preorders(record_ids: list):
+    """Delete several preorders at once with a single backup and a single save (nothing is deleted if any is missing)"""
     try:
-        # Create backup before deletion
-        if not create_backup(PREORDERS_FILE_PATH):
-            raise Exception("Failed to create backup")
-        
-        # Load existing workbook
-        if not os.path.exists(PREORDERS_FILE_PATH):
+        storage = get_storage()
+        if not storage.exists(PREORDERS):
             raise Exception("Preorders file not found")
         
-        wb = load_workbook(PREORDERS_FILE_PATH)
-        ws = wb.active
-        
-        # Find the row with the given serial number
-        target_row = None
-        for row_num in range(2, ws.max_row + 1):
-            if ws.cell(row=row_num, column=1).value == serial_number:
-                target_row = row_num
-                break
-        
-        if target_row is None:
-            raise Exception(f"Preorder with serial number {serial_number} not found")
+        # Validate the whole batch before touching the table
+        record_ids = sorted({int(record_id) for record_id in record_ids})
+        if not record_ids:
+            raise Exception("No record IDs given")
+        missing = missing_record_ids(PREORDERS, record_ids)
+        if missing:
+            raise Exception(f"Preorders not found: {', '.join(str(r) for r in missing)}")
         
-        # Delete the row
-        ws.delete_rows(target_row)
+        # One backup for the whole batch
+        if not storage.backup(PREORDERS):
+            raise Exception("Failed to create backup")
         
-        # Renumber serial numbers
-        for row_num in range(2, ws.max_row + 1):
-            ws.cell(row=row_num, column=1, value=row_num - 1)
+        # Delete the rows (the others keep their record IDs)
+        with edit_table(PREORDERS) as preorders:
+            deleted = preorders.delete_rows(record_ids)
+            if deleted != len(record_ids):
+                # Rolls the whole batch back
+                raise Exception("Some preorders were deleted while deleting, nothing was changed")
         
-        # Save workbook
-        wb.save(PREORDERS_FILE_PATH)
-        return True
+        return {
+            "success": True,
+            "deleted": deleted,
+            "message": f"Successfully deleted {deleted} preorders!"
+        }
     except Exception as e:
-        raise Exception(f"Error deleting preorder: {str(e)}")
+        raise Exception(f"Error deleting preorders: {str(e)}")
+
+# Statuses whose on-arrival amount has been paid
+PAID_STATUSES = ["shipped", "delivered"]
+
+def to_amounts(series):
+    """Get a column of amounts as floats, 0 where there is no number"""
+    return parse_amounts(series).fillna(0.0)
+
+def find_amount_column(df, names, words):
+    """Find an amount column by its name (ignoring surrounding whitespace) or by words in it"""
+    column_map = {col.strip(): col for col in df.columns}
+    for name in names:
+        if name in column_map:
+            return column_map[name]
+    for col in df.columns:
+        if all(word in str(col).lower() for word in words):
+            return col
+    return None
+
+def upcoming_months(today=None):
+    """Get the current and the next month as periods"""
+    current_month = pd.Period(today or datetime.now(), freq="M")
+    return current_month, current_month + 1
+
+def preorder_statistics(df, today=None):
+    """Calculate the preorder statistics of a typed preorders table (see preorder_frame)"""
+    total_value_col = find_amount_column(df, ["Total Price", "TotalPrice"], ["total", "price"])
+    po_amount_col = find_amount_column(df, ["PO Amount", "POAmount"], ["po", "amount"])
+    on_arrival_col = find_amount_column(df, ["On Arrival Amount", "OnArrivalAmount"], ["arrival", "amount"])
+    total_value = to_amounts(df[total_value_col]).sum() if total_value_col else 0
+    total_po_amount = to_amounts(df[po_amount_col]).sum() if po_amount_col else 0
+    on_arrival = to_amounts(df[on_arrival_col]) if on_arrival_col else None
+    total_on_arrival = on_arrival.sum() if on_arrival_col else 0
+    
+    # Handle both old and new column names for delivery status
+    status_col = "Delivery Status" if "Delivery Status" in df.columns else "Status"
+    if status_col in df.columns:
+        status = df[status_col]
+    else:
+        status = pd.Series("Pending", index=df.index)
+    
+    # Payment Done = All PO Amount + On Arrival Amount for Shipped/Delivered items
+    # Payment Remaining = On Arrival Amount for Pending items
+    payment_done = total_po_amount
+    payment_remaining = 0
+    if on_arrival_col:
+        # Mapped once per category rather than once per row
+        normalized_status = status.map(lambda value: str(value).strip().lower())
+        payment_done += on_arrival[normalized_status.isin(PAID_STATUSES)].sum()
+        payment_remaining = on_arrival[normalized_status == "pending"].sum()
+    
+    status_breakdown = df[status_col].value_counts().to_dict() if status_col in df.columns else {}
+    
+    # Upcoming arrivals (current month and next month) that have not been delivered
+    upcoming_arrivals = []
+    if "ETA" in df.columns:
+        current_month, next_month = upcoming_months(today)
+        upcoming = df[(status != "Delivered") & df["ETA"].between(current_month, next_month)]
+        columns = {
+            name: upcoming[name].tolist() if name in upcoming.columns else ["N/A"] * len(upcoming)
+            for name in [SERIAL_COLUMN, "Models", "Seller"]
+        }
+        months = upcoming["ETA"].dt.strftime("%Y-%m").tolist()
+        upcoming_arrivals = [
+            {"serial": serial, "models": models, "eta": month, "month": month, "seller": seller, "status": row_status}
+            for serial, models, month, seller, row_status in zip(
+                columns[SERIAL_COLUMN], columns["Models"], months, columns["Seller"],
+                status[upcoming.index].tolist()
+            )
+        ]
+    
+    return {
+        "total_preorders": len(df),
+        "total_value": round(total_value, 2),
+        "total_po_amount": round(total_po_amount, 2),
+        "total_on_arrival": round(total_on_arrival, 2),
+        "payment_done": round(payment_done, 2),
+        "payment_remaining": round(payment_remaining, 2),
+        "status_breakdown": status_breakdown,
+        "upcoming_arrivals": sorted(upcoming_arrivals, key=lambda x: x["month"])
+    }
 
 def get_preorders_statistics():
     """Get statistics about preorders"""
@@ -244,152 +430,6 @@ def get_preorders_statistics():
                 "status_breakdown": {},
                 "upcoming_arrivals": []
             }
-        
-        # Basic statistics
-        total_preorders = len(df)
-        
-        # Calculate totals
-        total_value = 0
-        total_po_amount = 0
-        total_on_arrival = 0
-        
-        # Helper function to safely convert to float
-        def safe_float(value):
-            if pd.isna(value) or value == '' or value is None:
-                return 0.0
-            try:
-                # If it's already a number, return it
-                if isinstance(value, (int, float)):
-                    return float(value)
-                # Convert to string and clean
-                value_str = str(value).strip()
-                # Remove any currency symbols, commas, and whitespace
-                value_str = value_str.replace('₹', '').replace(',', '').replace(' ', '').replace('$', '').strip()
-                if value_str == '' or value_str == '-' or value_str.lower() == 'nan':
-                    return 0.0
-                # Try to convert to float
-                return float(value_str)
-            except (ValueError, TypeError) as e:
-                return 0.0
-        
-        # Calculate totals - handle column names with potential whitespace
-        # Create a mapping of normalized column names
-        column_map = {col.strip(): col for col in df.columns}
-        
-        # Find and calculate Total Price
-        if "Total Price" in column_map:
-            total_value = df[column_map["Total Price"]].apply(safe_float).sum()
-        elif "TotalPrice" in column_map:
-            total_value = df[column_map["TotalPrice"]].apply(safe_float).sum()
-        else:
-            # Try to find column by partial match
-            for col in df.columns:
-                if "total" in str(col).lower() and "price" in str(col).lower():
-                    total_value = df[col].apply(safe_float).sum()
-                    break
-            
-        # Find and calculate PO Amount
-        if "PO Amount" in column_map:
-            total_po_amount = df[column_map["PO Amount"]].apply(safe_float).sum()
-        elif "POAmount" in column_map:
-            total_po_amount = df[column_map["POAmount"]].apply(safe_float).sum()
-        else:
-            # Try to find column by partial match
-            for col in df.columns:
-                if "po" in str(col).lower() and "amount" in str(col).lower():
-                    total_po_amount = df[col].apply(safe_float).sum()
-                    break
-                    
-        # Find and calculate On Arrival Amount
-        on_arrival_col = None
-        if "On Arrival Amount" in column_map:
-            on_arrival_col = column_map["On Arrival Amount"]
-            total_on_arrival = df[on_arrival_col].apply(safe_float).sum()
-        elif "OnArrivalAmount" in column_map:
-            on_arrival_col = column_map["OnArrivalAmount"]
-            total_on_arrival = df[on_arrival_col].apply(safe_float).sum()
-        else:
-            # Try to find column by partial match
-            for col in df.columns:
-                if "arrival" in str(col).lower() and "amount" in str(col).lower():
-                    on_arrival_col = col
-                    total_on_arrival = df[col].apply(safe_float).sum()
-                    break
-        
-        # Calculate Payment Done and Payment Remaining
-        # Payment Done = All PO Amount + On Arrival Amount for Shipped/Delivered items
-        # Payment Remaining = On Arrival Amount for Pending items
-        payment_done = total_po_amount  # Start with all PO amounts
-        payment_remaining = 0
-        
-        # Handle both old and new column names for delivery status
-        status_col = "Delivery Status" if "Delivery Status" in df.columns else "Status"
-        
-        if on_arrival_col:
-            for idx, row in df.iterrows():
-                on_arrival = safe_float(row.get(on_arrival_col, 0))
-                delivery_status = str(row.get(status_col, "Pending")).strip()
-                
-                # If status is Shipped or Delivered, add on_arrival to payment_done
-                if delivery_status.lower() in ["shipped", "delivered"]:
-                    payment_done += on_arrival
-                # If status is Pending, add to payment_remaining
-                elif delivery_status.lower() == "pending":
-                    payment_remaining += on_arrival
-        
-        # Delivery status breakdown (handle both old and new column names)
-        status_breakdown = {}
-        if "Delivery Status" in df.columns:
-            status_counts = df["Delivery Status"].value_counts()
-            status_breakdown = status_counts.to_dict()
-        elif "Status" in df.columns:
-            # Use old column name if new one doesn't exist
-            status_counts = df["Status"].value_counts()
-            status_breakdown = status_counts.to_dict()
-        
-        # Upcoming arrivals (current month and next month)
-        upcoming_arrivals = []
-        if "ETA" in df.columns:
-            today = datetime.now()
-            current_month = today.strftime("%Y-%m")
-            # Calculate next month
-            if today.month == 12:
-                next_month = f"{today.year + 1}-01"
-            else:
-                next_month = f"{today.year}-{today.month + 1:02d}"
-            # Handle both old and new column names
-            status_col = "Delivery Status" if "Delivery Status" in df.columns else "Status"
-            for idx, row in df.iterrows():
-                eta = row.get("ETA")
-                delivery_status = row.get(status_col, "Pending")
-                # Only show pending or shipped items
-                if delivery_status not in ["Delivered"]:
-                    if eta:
-                        try:
-                            # ETA is now in YYYY-MM format
-                            eta_month = str(eta)[:7]  # Get YYYY-MM part
-                            if eta_month == current_month or eta_month == next_month:
-                                upcoming_arrivals.append({
-                                    "serial": row.get("S.No", "N/A"),
-                                    "models": row.get("Models", "N/A"),
-                                    "eta": eta_month,
-                                    "month": eta_month,
-                                    "seller": row.get("Seller", "N/A"),
-                                    "status": delivery_status
-                                })
-                        except:
-                            pass
-        
-        return {
-            "total_preorders": total_preorders,
-            "total_value": round(total_value, 2),
-            "total_po_amount": round(total_po_amount, 2),
-            "total_on_arrival": round(total_on_arrival, 2),
-            "payment_done": round(payment_done, 2),
-            "payment_remaining": round(payment_remaining, 2),
-            "status_breakdown": status_breakdown,
-            "upcoming_arrivals": sorted(upcoming_arrivals, key=lambda x: x.get("month", x.get("eta", "")))
-        }
+        return preorder_statistics(df)
     except Exception as e:
         raise Exception(f"Error getting preorders statistics: {str(e)}")
-
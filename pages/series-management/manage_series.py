@@ -15,7 +15,7 @@ sys.path.insert(0, os.path.dirname(__file__))
 # Import from same directory (series-management folder)
 from series_config import (
     SERIES_OPTIONS, SERIES_METADATA, get_all_series, get_subseries,
-    get_series_info, validate_series_combination
+    get_series_info, validate_series_combination, rebuild_series_index
 )
 
 def get_series_config():
@@ -40,6 +40,7 @@ def add_series(series_name: str, description: str = None, price_range: str = Non
             "price_range": price_range or "Varies",
             "rarity": rarity or "Unknown"
         }
+        rebuild_series_index()
         
         # Save to file
         save_series_config()
@@ -60,6 +61,7 @@ def add_subseries(main_series: str, subseries: str):
             raise Exception(f"Subseries '{subseries}' already exists in '{main_series}'")
         
         SERIES_OPTIONS[main_series].append(subseries)
+        rebuild_series_index()
         save_series_config()
         
         return {
@@ -78,6 +80,7 @@ def remove_subseries(main_series: str, subseries: str):
             raise Exception(f"Subseries '{subseries}' not found in '{main_series}'")
         
         SERIES_OPTIONS[main_series].remove(subseries)
+        rebuild_series_index()
         save_series_config()
         
         return {
@@ -102,6 +105,7 @@ def rename_series(old_name: str, new_name: str):
         # Rename metadata if it exists
         if old_name in SERIES_METADATA:
             SERIES_METADATA[new_name] = SERIES_METADATA.pop(old_name)
+        rebuild_series_index()
         
         save_series_config()
         
@@ -125,6 +129,7 @@ def rename_subseries(main_series: str, old_name: str, new_name: str):
         # Rename the subseries
         index = SERIES_OPTIONS[main_series].index(old_name)
         SERIES_OPTIONS[main_series][index] = new_name
+        rebuild_series_index()
         
         save_series_config()
         
@@ -169,6 +174,28 @@ SERIES_OPTIONS = {series_options_str}
 # Series metadata for additional information
 SERIES_METADATA = {series_metadata_str}
 
+# Lookups derived from SERIES_OPTIONS, rebuilt by rebuild_series_index() after every change
+_series_index = {{}}
+
+def rebuild_series_index():
+    """Rebuild the subseries lookups from SERIES_OPTIONS (call after changing it)"""
+    global _series_index
+    subseries_to_series = {{}}
+    all_subseries = []
+    for main_series, subseries_list in SERIES_OPTIONS.items():
+        for subseries in subseries_list:
+            # The first main series listing a subseries wins
+            subseries_to_series.setdefault(subseries, main_series)
+        all_subseries.extend(subseries_list)
+    # Swapped in with one assignment so readers never see a half-built index
+    _series_index = {{
+        "subseries_to_series": subseries_to_series,
+        "all_subseries": tuple(all_subseries),
+        "count": (len(SERIES_OPTIONS), len(all_subseries)),
+    }}
+
+rebuild_series_index()
+
 def get_all_series():
     """Get all main series categories"""
     return list(SERIES_OPTIONS.keys())
@@ -179,10 +206,7 @@ def get_subseries(main_series):
 
 def get_all_subseries():
     """Get all subseries as a flat list"""
-    all_subseries = []
-    for subseries_list in SERIES_OPTIONS.values():
-        all_subseries.extend(subseries_list)
-    return all_subseries
+    return list(_series_index["all_subseries"])
 
 def get_series_info(main_series):
     """Get metadata information for a main series"""
@@ -190,10 +214,7 @@ def get_series_info(main_series):
 
 def find_main_series_for_subseries(subseries):
     """Find which main series a subseries belongs to"""
-    for main_series, subseries_list in SERIES_OPTIONS.items():
-        if subseries in subseries_list:
-            return main_series
-    return None
+    return _series_index["subseries_to_series"].get(subseries)
 
 def validate_series_combination(main_series, subseries):
     """Validate if a main series and subseries combination is valid"""
@@ -203,9 +224,7 @@ def validate_series_combination(main_series, subseries):
 
 def get_series_count():
     """Get total count of series and subseries"""
-    main_count = len(SERIES_OPTIONS)
-    sub_count = sum(len(subseries_list) for subseries_list in SERIES_OPTIONS.values())
-    return main_count, sub_count
+    return _series_index["count"]
 
 def print_series_summary():
     """Print a summary of all series options"""
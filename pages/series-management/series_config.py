@@ -10,6 +10,28 @@ SERIES_OPTIONS = {'Mainlines': ['Mainlines', '54th Anniversary Series', '57th An
 # Series metadata for additional information
 SERIES_METADATA = {'Mainlines': {'description': 'Basic Hot Wheels cars available in most stores', 'price_range': '₹180', 'rarity': 'Common'}, 'Premiums': {'description': 'High-quality cars with premium details and packaging', 'price_range': '₹550', 'rarity': 'Rare'}, 'Others': {'description': 'Special categories and track sets', 'price_range': 'Varies', 'rarity': 'Varies'}, 'Themed Assortments': {'description': 'Mid-tier cars with better details and packaging', 'price_range': '₹300', 'rarity': 'Uncommon'}}
 
+# Lookups derived from SERIES_OPTIONS, rebuilt by rebuild_series_index() after every change
+_series_index = {}
+
+def rebuild_series_index():
+    """Rebuild the subseries lookups from SERIES_OPTIONS (call after changing it)"""
+    global _series_index
+    subseries_to_series = {}
+    all_subseries = []
+    for main_series, subseries_list in SERIES_OPTIONS.items():
+        for subseries in subseries_list:
+            # The first main series listing a subseries wins
+            subseries_to_series.setdefault(subseries, main_series)
+        all_subseries.extend(subseries_list)
+    # Swapped in with one assignment so readers never see a half-built index
+    _series_index = {
+        "subseries_to_series": subseries_to_series,
+        "all_subseries": tuple(all_subseries),
+        "count": (len(SERIES_OPTIONS), len(all_subseries)),
+    }
+
+rebuild_series_index()
+
 def get_all_series():
     """Get all main series categories"""
     return list(SERIES_OPTIONS.keys())
@@ -20,10 +42,7 @@ def get_subseries(main_series):
 
 def get_all_subseries():
     """Get all subseries as a flat list"""
-    all_subseries = []
-    for subseries_list in SERIES_OPTIONS.values():
-        all_subseries.extend(subseries_list)
-    return all_subseries
+    return list(_series_index["all_subseries"])
 
 def get_series_info(main_series):
     """Get metadata information for a main series"""
@@ -31,10 +50,7 @@ def get_series_info(main_series):
 
 def find_main_series_for_subseries(subseries):
     """Find which main series a subseries belongs to"""
-    for main_series, subseries_list in SERIES_OPTIONS.items():
-        if subseries in subseries_list:
-            return main_series
-    return None
+    return _series_index["subseries_to_series"].get(subseries)
 
 def validate_series_combination(main_series, subseries):
     """Validate if a main series and subseries combination is valid"""
@@ -44,9 +60,7 @@ def validate_series_combination(main_series, subseries):
 
 def get_series_count():
     """Get total count of series and subseries"""
-    main_count = len(SERIES_OPTIONS)
-    sub_count = sum(len(subseries_list) for subseries_list in SERIES_OPTIONS.values())
-    return main_count, sub_count
+    return _series_index["count"]
 
 def print_series_summary():
     """Print a summary of all series options"""
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Excel Loader Benchmark
+Compares the peak memory (RSS) of the ways a large workbook can be read:
+pandas, a full openpyxl workbook, the streaming loader and the streaming loader into the in-memory table
+
+Usage: python scripts/benchmark_excel_loader.py [--rows 200000] [--file existing.xlsx]
+Each loader runs in its own process so the peaks do not mix. Needs the resource module (Linux/macOS).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.storage import SERIAL_COLUMN, ID_COLUMN, write_excel_rows
+
+# Loaders compared, in the order they are reported
+MODES = ["pandas", "workbook", "stream", "table"]
+
+# Columns of the synthetic collection
+FIELDS = ["Model Name", "Series", "Color", "Year", "Price"]
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def generate_workbook(file_path, rows):
+    """Write a synthetic collection workbook with the given number of rows"""
+    rng = random.Random(42)
+    series = ["Mainlines", "Premium", "Car Culture", "Team Transport", "Boulevard", "Fast & Furious"]
+    colors = ["Red", "Blue", "Black", "White", "Silver", "Green", "Yellow", "Orange"]
+    headers = [SERIAL_COLUMN] + FIELDS + [ID_COLUMN]
+    data = (
+        [n, f"Model {rng.randrange(100000)} {rng.choice(colors)} Edition", rng.choice(series),
+         rng.choice(colors), rng.randrange(1968, 2026), round(rng.uniform(1, 50), 2), n]
+        for n in range(1, rows + 1)
+    )
+    write_excel_rows(file_path, headers, data)
+
+def load(mode, file_path):
+    """Read the workbook with one loader, returns the number of rows seen"""
+    if mode == "pandas":
+        import pandas as pd
+        return len(pd.read_excel(file_path))
+    if mode == "workbook":
+        from openpyxl import load_workbook
+        wb = load_workbook(file_path)
+        count = sum(1 for _ in wb.active.iter_rows(min_row=2, values_only=True))
+        wb.close()
+        return count
+    if mode == "stream":
+        from utils.storage import open_excel_rows
+        with open_excel_rows(file_path) as (headers, rows):
+            return sum(1 for _ in rows)
+    if mode == "table":
+        # What the Excel backend keeps in memory: every row, as plain lists
+        from utils.storage import open_excel_rows, split_excel_rows
+        with open_excel_rows(file_path) as (headers, rows):
+            fields, records = split_excel_rows(headers, rows)
+        return len(records)
+    raise Exception(f"Unknown loader: {mode}")
+
+def measure(mode, file_path):
+    """Run one loader in this process and print its result as JSON"""
+    import pandas  # noqa: F401 (imported up front so every loader starts from the same baseline)
+    import openpyxl  # noqa: F401
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    rows = load(mode, file_path)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "mode": mode,
+        "rows": rows,
+        "seconds": round(seconds, 2),
+        "baseline_mb": round(baseline, 1),
+        "peak_mb": round(peak_rss_mb(), 1),
+    }))
+
+def run(file_path):
+    """Measure every loader in a separate process and print a table"""
+    size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    print(f"Workbook: {file_path} ({size_mb:.1f} MB)\n")
+    print(f"{'Loader':<10} {'Rows':>8} {'Time (s)':>9} {'Peak RSS (MB)':>14} {'Above baseline (MB)':>20}")
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--measure", mode, "--file", file_path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results[mode] = result
+        print(f"{mode:<10} {result['rows']:>8} {result['seconds']:>9} {result['peak_mb']:>14} "
+              f"{result['peak_mb'] - result['baseline_mb']:>20.1f}")
+    workbook = results["workbook"]["peak_mb"] - results["workbook"]["baseline_mb"]
+    stream = results["stream"]["peak_mb"] - results["stream"]["baseline_mb"]
+    if stream > 0:
+        print(f"\nStreaming uses {workbook / stream:.0f}x less memory than a full workbook")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of the Excel loaders")
+    parser.add_argument("--rows", type=int, default=200000, help="rows in the synthetic workbook")
+    parser.add_argument("--file", help="benchmark an existing workbook instead")
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.file)
+        return
+
+    if args.file:
+        run(args.file)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "benchmark.xlsx")
+        print(f"Generating {args.rows} rows...")
+        generate_workbook(file_path, args.rows)
+        run(file_path)
+
+if __name__ == "__main__":
+    main()
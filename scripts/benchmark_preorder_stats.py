@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Preorder Statistics Benchmark
+Times the vectorised preorder statistics on the typed preorders table against the previous
+row-by-row implementation (stringified table, safe_float per cell and iterrows) on synthetic
+preorder tables, and checks both give the same result
+
+Usage: python scripts/benchmark_preorder_stats.py [--rows 10000 100000] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pages', 'preorders'))
+from preorders import preorder_frame, preorder_statistics, upcoming_months
+from utils.storage import SERIAL_COLUMN
+
+def generate_preorders(rows, seed=42):
+    """Build a synthetic preorders table shaped like the cached table the storage returns"""
+    rng = random.Random(seed)
+    sellers = ["Karzone", "Toycra", "Hobby Shop", "Diecast Depot", "Collector's Corner"]
+    statuses = ["Pending", "Shipped", "Delivered", " pending ", "Cancelled"]
+    months = [month.strftime("%Y-%m") for month in upcoming_months()] + ["2024-05", "2025-11", "2026-02", "2027-08"]
+
+    def amount():
+        choice = rng.random()
+        if choice < 0.1:
+            return ""
+        if choice < 0.15:
+            return f"₹{rng.randrange(100, 20000):,}"
+        return float(rng.randrange(100, 20000))
+
+    return pd.DataFrame({
+        SERIAL_COLUMN: range(1, rows + 1),
+        "Seller": [rng.choice(sellers) for _ in range(rows)],
+        "Models": [f"Model {rng.randrange(10000)}" for _ in range(rows)],
+        "ETA": [rng.choice(months) if rng.random() > 0.05 else "" for _ in range(rows)],
+        "Total Price": [amount() for _ in range(rows)],
+        "PO Amount": [amount() for _ in range(rows)],
+        "On Arrival Amount": [amount() for _ in range(rows)],
+        "Delivery Status": [rng.choice(statuses) for _ in range(rows)],
+    })
+
+def legacy_frame(df):
+    """The previous load_preorders_data(): every numeric column turned into strings"""
+    df = df.replace([float('inf'), float('-inf')], '').fillna("")
+    for col in df.columns:
+        if df[col].dtype in ['float64', 'int64', 'float32', 'int32']:
+            df[col] = df[col].apply(lambda x: '' if pd.isna(x) else str(x))
+        else:
+            df[col] = df[col].astype(str).replace('nan', '').replace('None', '')
+    return df
+
+def legacy_statistics(df):
+    """The previous implementation of get_preorders_statistics(), kept for comparison"""
+    def safe_float(value):
+        if pd.isna(value) or value == '' or value is None:
+            return 0.0
+        try:
+            if isinstance(value, (int, float)):
+                return float(value)
+            value_str = str(value).strip()
+            value_str = value_str.replace('₹', '').replace(',', '').replace(' ', '').replace('$', '').strip()
+            if value_str == '' or value_str == '-' or value_str.lower() == 'nan':
+                return 0.0
+            return float(value_str)
+        except (ValueError, TypeError):
+            return 0.0
+
+    total_value = df["Total Price"].apply(safe_float).sum()
+    total_po_amount = df["PO Amount"].apply(safe_float).sum()
+    on_arrival_col = "On Arrival Amount"
+    total_on_arrival = df[on_arrival_col].apply(safe_float).sum()
+
+    payment_done = total_po_amount
+    payment_remaining = 0
+    status_col = "Delivery Status"
+    for idx, row in df.iterrows():
+        on_arrival = safe_float(row.get(on_arrival_col, 0))
+        delivery_status = str(row.get(status_col, "Pending")).strip()
+        if delivery_status.lower() in ["shipped", "delivered"]:
+            payment_done += on_arrival
+        elif delivery_status.lower() == "pending":
+            payment_remaining += on_arrival
+
+    status_breakdown = df[status_col].value_counts().to_dict()
+
+    upcoming_arrivals = []
+    current_month, next_month = [month.strftime("%Y-%m") for month in upcoming_months()]
+    for idx, row in df.iterrows():
+        eta = row.get("ETA")
+        delivery_status = row.get(status_col, "Pending")
+        if delivery_status not in ["Delivered"] and eta:
+            eta_month = str(eta)[:7]
+            if eta_month == current_month or eta_month == next_month:
+                upcoming_arrivals.append({
+                    "serial": row.get("S.No", "N/A"),
+                    "models": row.get("Models", "N/A"),
+                    "eta": eta_month,
+                    "month": eta_month,
+                    "seller": row.get("Seller", "N/A"),
+                    "status": delivery_status
+                })
+
+    return {
+        "total_preorders": len(df),
+        "total_value": round(total_value, 2),
+        "total_po_amount": round(total_po_amount, 2),
+        "total_on_arrival": round(total_on_arrival, 2),
+        "payment_done": round(payment_done, 2),
+        "payment_remaining": round(payment_remaining, 2),
+        "status_breakdown": status_breakdown,
+        "upcoming_arrivals": sorted(upcoming_arrivals, key=lambda x: x.get("month", x.get("eta", "")))
+    }
+
+def best_time(func, df, repeat):
+    """Fastest of repeat runs, in seconds, and the last result"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def same_statistics(a, b):
+    """
+    Compare two results, allowing for the last-digit differences of summing in another order
+    Serial numbers are compared as text, the previous implementation returned them as strings.
+    """
+    amounts = ["total_value", "total_po_amount", "total_on_arrival", "payment_done", "payment_remaining"]
+
+    def arrivals(result):
+        return [{**arrival, "serial": str(arrival["serial"])} for arrival in result["upcoming_arrivals"]]
+
+    return all(abs(a[key] - b[key]) <= 0.01 for key in amounts) and arrivals(a) == arrivals(b) and \
+        all(a[key] == b[key] for key in a if key not in amounts + ["upcoming_arrivals"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Preorder statistics: vectorised vs row by row")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="preorder table sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per implementation (the fastest is reported)")
+    args = parser.parse_args()
+
+    print(f"Benchmark run: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
+    print(f"{'Rows':>8} {'Row by row (s)':>15} {'Vectorised (s)':>15} {'Speedup':>8} {'Typed load (s)':>15}  Same result")
+    for rows in args.rows:
+        df = generate_preorders(rows)
+        # Both tables are built once per change of the preorders, so only the statistics are timed
+        legacy_seconds, legacy_result = best_time(legacy_statistics, legacy_frame(df), args.repeat)
+        load_seconds, typed = best_time(preorder_frame, df, args.repeat)
+        seconds, result = best_time(preorder_statistics, typed, args.repeat)
+        print(f"{rows:>8} {legacy_seconds:>15.3f} {seconds:>15.4f} {legacy_seconds / seconds:>7.0f}x "
+              f"{load_seconds:>15.4f}  {'yes' if same_statistics(legacy_result, result) else 'NO'}")
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,11 @@ import os
 import sys
 import re
 import pandas as pd
-from openpyxl import load_workbook
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from utils.backup_utils import create_backup
+from utils.storage import COLLECTION, ID_COLUMN, get_storage
+from utils.file_lock import write_lock
 
 # Path to the Excel file
 EXCEL_FILE_PATH = os.path.join("data", "HW_list.xlsx")
@@ -72,94 +72,81 @@ def convert_year_format(text):
 def convert_model_names():
     """Convert year formats in all model names"""
     try:
-        # Check if file exists
-        if not os.path.exists(EXCEL_FILE_PATH):
-            print(f"❌ Excel file not found: {EXCEL_FILE_PATH}")
-            return False
+        storage = get_storage()
         
-        # Create backup before making changes
-        print("📦 Creating backup...")
-        if not create_backup(EXCEL_FILE_PATH):
-            print("❌ Failed to create backup. Aborting.")
-            return False
-        
-        # Load Excel file
-        print("📖 Loading Excel file...")
-        df = pd.read_excel(EXCEL_FILE_PATH)
-        
-        # Find the Model Name column
-        model_column = None
-        for col in df.columns:
-            if 'model' in col.lower() and 'name' in col.lower():
-                model_column = col
-                break
-        
-        if model_column is None:
-            # Try to find it by position (usually second column)
-            if len(df.columns) > 1:
-                model_column = df.columns[1]
-            else:
-                print("❌ Could not find Model Name column")
+        # Hold the write lock from loading to saving so the web app or CLI cannot change rows in between
+        with write_lock():
+            # Check if the collection exists
+            if not storage.exists(COLLECTION):
+                print(f"❌ Excel file not found: {EXCEL_FILE_PATH}")
                 return False
-        
-        print(f"✅ Found Model Name column: {model_column}")
-        
-        # Track changes
-        changes = []
-        original_names = df[model_column].copy()
-        
-        # Convert year formats
-        print("🔄 Converting year formats...")
-        for idx, name in enumerate(df[model_column]):
-            if pd.notna(name):
-                original = str(name)
-                converted = convert_year_format(original)
-                if original != converted:
-                    df.at[idx, model_column] = converted
-                    changes.append({
-                        'index': idx + 1,  # Excel row number (1-indexed, accounting for header)
-                        'original': original,
-                        'converted': converted
-                    })
-        
-        # Save changes if any were made
-        if changes:
-            print(f"\n📝 Found {len(changes)} model names to update:")
-            for change in changes[:10]:  # Show first 10
-                print(f"  Row {change['index']}: '{change['original']}' -> '{change['converted']}'")
-            if len(changes) > 10:
-                print(f"  ... and {len(changes) - 10} more")
             
-            # Save using openpyxl to preserve formatting
-            print("\n💾 Saving changes...")
-            wb = load_workbook(EXCEL_FILE_PATH)
-            ws = wb.active
+            # Create backup before making changes
+            print("📦 Creating backup...")
+            if not storage.backup(COLLECTION):
+                print("❌ Failed to create backup. Aborting.")
+                return False
             
-            # Find the column index for Model Name
-            header_row = 1
-            model_col_idx = None
-            for col_idx, cell in enumerate(ws[header_row], start=1):
-                if cell.value and 'model' in str(cell.value).lower() and 'name' in str(cell.value).lower():
-                    model_col_idx = col_idx
+            # Load the collection
+            print("📖 Loading collection...")
+            df = storage.read_frame(COLLECTION)
+            
+            # Find the Model Name column
+            model_column = None
+            for col in df.columns:
+                if 'model' in col.lower() and 'name' in col.lower():
+                    model_column = col
                     break
             
-            if model_col_idx is None:
-                # Fallback: use second column
-                model_col_idx = 2
+            if model_column is None:
+                # Try to find it by position (usually second column)
+                if len(df.columns) > 1:
+                    model_column = df.columns[1]
+                else:
+                    print("❌ Could not find Model Name column")
+                    return False
             
-            # Update the cells
-            for change in changes:
-                row_num = change['index'] + 1  # +1 for header row
-                ws.cell(row=row_num, column=model_col_idx, value=change['converted'])
+            print(f"✅ Found Model Name column: {model_column}")
+            
+            # Track changes
+            changes = []
+            original_names = df[model_column].copy()
+            
+            # Convert year formats
+            print("🔄 Converting year formats...")
+            for idx, name in enumerate(df[model_column]):
+                if pd.notna(name):
+                    original = str(name)
+                    converted = convert_year_format(original)
+                    if original != converted:
+                        df.at[idx, model_column] = converted
+                        changes.append({
+                            'index': idx + 1,  # Excel row number (1-indexed, accounting for header)
+                            'record_id': df.at[idx, ID_COLUMN],
+                            'original': original,
+                            'converted': converted
+                        })
+            
+            # Save changes if any were made
+            if changes:
+                print(f"\n📝 Found {len(changes)} model names to update:")
+                for change in changes[:10]:  # Show first 10
+                    print(f"  Row {change['index']}: '{change['original']}' -> '{change['converted']}'")
+                if len(changes) > 10:
+                    print(f"  ... and {len(changes) - 10} more")
+                
+                print("\n💾 Saving changes...")
+                storage.update_rows(COLLECTION, {
+                    change['record_id']: {model_column: change['converted']} for change in changes
+                })
+                storage.export_excel(COLLECTION)
+                print(f"✅ Successfully updated {len(changes)} model names!")
+                print(f"✅ Changes saved to {EXCEL_FILE_PATH}")
+            else:
+                print("ℹ️  No changes needed. All year formats are already in 'XX format.")
+            
+            return True
             
-            wb.save(EXCEL_FILE_PATH)
-            print(f"✅ Successfully updated {len(changes)} model names!")
-            print(f"✅ Changes saved to {EXCEL_FILE_PATH}")
-        else:
-            print("ℹ️  No changes needed. All year formats are already in 'XX format.")
-        
-        return True
-        
     except Exception as e:
         print(f"❌ Error converting year formats: {str(e)}")
         import traceback
@@ -0,0 +1,43 @@
+// Shared conditional GET: sends the ETag of the copy we already have and reuses it on 304 Not Modified
+const CACHED_FETCH_PREFIX = 'cachedFetch:';
+
+function clearCachedFetches() {
+    Object.keys(sessionStorage)
+        .filter(key => key.startsWith(CACHED_FETCH_PREFIX))
+        .forEach(key => sessionStorage.removeItem(key));
+}
+
+async function fetchJSONCached(url) {
+    const key = CACHED_FETCH_PREFIX + url;
+    let cached = null;
+    try {
+        cached = JSON.parse(sessionStorage.getItem(key));
+    } catch (error) {
+        cached = null;
+    }
+
+    const headers = cached && cached.etag ? { 'If-None-Match': cached.etag } : {};
+    // no-store so the 304 reaches us instead of being answered from the browser's own cache
+    const response = await fetch(url, { headers, cache: 'no-store' });
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        const entry = JSON.stringify({ etag, data });
+        try {
+            sessionStorage.setItem(key, entry);
+        } catch (error) {
+            // Storage is full: drop the older copies and try once more
+            clearCachedFetches();
+            try {
+                sessionStorage.setItem(key, entry);
+            } catch (retryError) {
+                // Too large to keep, it will simply be fetched in full next time
+            }
+        }
+    }
+    return data;
+}
@@ -0,0 +1,11 @@
+// Live updates: the server pushes { table, version } over Server-Sent Events whenever a table changes
+function onTableChange(handler) {
+    if (!window.EventSource) return null;
+    // The browser reconnects by itself; the first events after connecting carry every table's current version
+    const source = new EventSource('/api/events');
+    source.addEventListener('change', (event) => {
+        const change = JSON.parse(event.data);
+        handler(change.table, change.version);
+    });
+    return source;
+}
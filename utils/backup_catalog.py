@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Backup Catalogue
+The backups of each table, looked up in the backup index: listing, comparing and point-in-time restores
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.collection_store import edit_table
+from utils.storage import EXCEL_FILES, get_storage
+from utils.backup_utils import backup_catalog, compare_backups, find_backup, restore_backup, stored_name
+from utils.backup_worker import BACKUP_DIR, get_backup_worker
+
+def backup_base(table):
+    """Get the base filename a table's backups are named after (e.g. HW_list)"""
+    if table not in EXCEL_FILES:
+        raise Exception(f"Unknown table: {table}")
+    return os.path.splitext(os.path.basename(EXCEL_FILES[table]))[0]
+
+def list_table_backups(table, backup_dir=BACKUP_DIR):
+    """Get the backups of a table, newest first"""
+    return backup_catalog(backup_dir, backup_base(table))[::-1]
+
+def get_table_backup(table, name=None, at=None, backup_dir=BACKUP_DIR):
+    """
+    Find a backup of a table by name, or the last one taken at or before a datetime (ISO string or datetime)
+    With neither, the newest backup is returned.
+    """
+    entries = backup_catalog(backup_dir, backup_base(table))
+    if name:
+        for entry in entries:
+            if entry["name"] == name or stored_name(backup_dir, name) == entry["name"]:
+                return entry
+        raise Exception(f"Backup not found: {name}")
+    if at:
+        try:
+            moment = at if isinstance(at, datetime) else datetime.fromisoformat(at)
+        except ValueError:
+            raise Exception(f"Invalid date/time: {at}")
+        entry = find_backup(backup_dir, backup_base(table), moment)
+        if entry is None:
+            raise Exception(f"No backup of '{table}' was taken at or before {at}")
+        return entry
+    if not entries:
+        raise Exception(f"No backups of '{table}' found")
+    return entries[-1]
+
+def compare_table_backups(table, old_name, new_name=None, backup_dir=BACKUP_DIR):
+    """Compare two backups of a table (the newest one if new_name is not given)"""
+    old = get_table_backup(table, old_name, backup_dir=backup_dir)
+    new = get_table_backup(table, new_name, backup_dir=backup_dir)
+    return {"from": old["name"], "to": new["name"], **compare_backups(backup_dir, old["name"], new["name"])}
+
+def restore_table(table, name=None, at=None, backup_dir=BACKUP_DIR):
+    """
+    Replace a table's rows with one of its backups (see get_table_backup)
+    The Excel file is brought up to date first and backed up right after, so the rows being replaced can
+    be restored in turn.
+    """
+    entry = get_table_backup(table, name, at, backup_dir)
+    storage = get_storage()
+    if storage.exists(table):
+        storage.export_excel(table)
+
+    temp_path = os.path.join(backup_dir, f".restore.{backup_base(table)}.xlsx")
+    if not restore_backup(temp_path, entry["name"], backup_dir):
+        raise Exception(f"Error reading backup {entry['name']}")
+    try:
+        with edit_table(table) as editor:
+            count = editor.import_excel(temp_path)
+        storage.export_excel(table)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    get_backup_worker().run_once(force=True)
+    return {"success": True, "message": f"Restored {count} rows from backup {entry['name']}", "backup": entry}
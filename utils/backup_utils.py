@@ -1,47 +1,450 @@
 #!/usr/bin/env python3
 """
 DieCastTracker - Backup Utilities
-Utility functions for creating backups before updates/deletes
-Keeps at most 5 backups per Excel file
+Backups taken before an Excel file is overwritten, kept in a content-addressed store
+Keeps at most 5 backups per Excel file: the newest one as a workbook, the older ones as row-level diffs
 """
 
 import os
+import re
+import sys
+import gzip
+import json
 import shutil
+import bisect
+from contextlib import contextmanager
 from datetime import datetime
-import glob
 
-def create_backup(file_path, backup_dir="data/backups", max_backups=5):
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.snapshot import file_checksum
+
+try:
+    import fcntl
+except ImportError:
+    # fcntl is Unix-only; without it files are always copied instead of reflinked
+    fcntl = None
+
+# Full snapshots, stored once per content hash (data/backups/objects/<sha256>.xlsx)
+OBJECTS_DIR = "objects"
+
+# Backup catalogue, {backup file name: {"file": ..., "created": ..., "size": ..., "sha256": ..., "rows": ...}}
+INDEX_FILE = "index.json"
+
+# Suffix of the backups stored as a row-level diff against the next newer backup
+DIFF_SUFFIX = ".diff.json.gz"
+
+# Bumped whenever the diff layout changes
+DIFF_FORMAT = 1
+
+# ioctl that makes a copy-on-write clone of a file (Linux, on btrfs/XFS/...)
+FICLONE = 0x40049409
+
+# Timestamp part of a backup name: YYYYMMDD_HHMMSS, with _<n> for a second backup within the same second
+BACKUP_NAME_PATTERN = re.compile(r"^(\d{8}_\d{6})(?:_(\d+))?$")
+
+def clone_file(source, target):
+    """Copy a file, as a copy-on-write reflink when the filesystem supports it"""
+    temp_path = target + ".tmp"
+    try:
+        with open(source, "rb") as src, open(temp_path, "wb") as dst:
+            try:
+                if fcntl is None:
+                    raise OSError("reflinks are not supported")
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except OSError:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(source, temp_path)
+        os.replace(temp_path, target)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def link_file(source, target):
+    """Point target at the same file as source (a hard link, or a copy where links are not supported)"""
+    temp_path = target + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copy2(source, temp_path)
+    os.replace(temp_path, target)
+
+def object_path(backup_dir, digest):
+    """Get the path of the stored snapshot with a content hash"""
+    return os.path.join(backup_dir, OBJECTS_DIR, f"{digest}.xlsx")
+
+def load_index(backup_dir):
+    """Read the backup index ({} if there is none yet)"""
+    try:
+        with open(os.path.join(backup_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_index(backup_dir, index):
+    """Write the backup index, replacing it atomically"""
+    path = os.path.join(backup_dir, INDEX_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def backup_order(stamp):
+    """Sort key of a backup's timestamp part"""
+    match = BACKUP_NAME_PATTERN.match(stamp)
+    return (match.group(1), int(match.group(2) or 0))
+
+def list_backups(backup_dir, base_filename):
+    """Get the timestamped backups of a file (workbooks and diffs), oldest first"""
+    prefix = f"{base_filename}_backup_"
+    backups = []
+    for name in os.listdir(backup_dir) if os.path.isdir(backup_dir) else []:
+        if not name.startswith(prefix):
+            continue
+        stamp = name[len(prefix):]
+        for suffix in (DIFF_SUFFIX, ".xlsx"):
+            if stamp.endswith(suffix):
+                stamp = stamp[:-len(suffix)]
+                if BACKUP_NAME_PATTERN.match(stamp):
+                    backups.append((backup_order(stamp), name))
+                break
+    return [name for _, name in sorted(backups)]
+
+def backup_stamp(name):
+    """Get the timestamp part of a backup's name, e.g. 20250101_120000 or 20250101_120000_2"""
+    return name.split("_backup_")[-1].split(".")[0]
+
+def backup_time(name):
+    """Get the datetime in a backup's name"""
+    return datetime.strptime(backup_stamp(name)[:15], "%Y%m%d_%H%M%S")
+
+def new_backup_name(backup_dir, base_filename, timestamp):
+    """Get an unused backup name for a datetime"""
+    stamp = timestamp.strftime("%Y%m%d_%H%M%S")
+    candidate, n = stamp, 1
+    while any(os.path.exists(os.path.join(backup_dir, f"{base_filename}_backup_{candidate}{suffix}"))
+              for suffix in (".xlsx", DIFF_SUFFIX)):
+        n += 1
+        candidate = f"{stamp}_{n}"
+    return f"{base_filename}_backup_{candidate}.xlsx"
+
+def remove_unused_objects(backup_dir):
+    """Delete the stored snapshots no backup links to any more"""
+    objects_dir = os.path.join(backup_dir, OBJECTS_DIR)
+    if not os.path.isdir(objects_dir):
+        return
+    for name in os.listdir(objects_dir):
+        path = os.path.join(objects_dir, name)
+        try:
+            if os.stat(path).st_nlink <= 1:
+                os.remove(path)
+        except OSError as e:
+            print(f"[WARNING] Could not delete unused backup object {name}: {e}")
+
+def stored_name(backup_dir, name):
+    """Get the file a backup is stored in now: its workbook, or its diff once a newer backup replaced it"""
+    if name.endswith(".xlsx") and not os.path.exists(os.path.join(backup_dir, name)):
+        return name[:-len(".xlsx")] + DIFF_SUFFIX
+    return name
+
+def count_rows(backup_dir, name):
+    """Count the rows of a backup"""
+    with open_backup_rows(backup_dir, name) as (_, rows):
+        return sum(1 for _ in rows)
+
+def sync_index(backup_dir, base_filename, index):
+    """
+    Make the index match the backups of a file on disk: add the ones it does not know yet (e.g. made by an
+    older version), fill in missing details and drop the ones that are gone. Returns True if it changed.
+    """
+    names = list_backups(backup_dir, base_filename)
+    changed = False
+    for name in [name for name, entry in index.items() if entry.get("file", base_filename) == base_filename
+                 and name.startswith(f"{base_filename}_backup_") and name not in names]:
+        del index[name]
+        changed = True
+    for name in names:
+        entry = index.get(name, {})
+        if all(key in entry for key in ("file", "created", "size", "sha256", "rows")):
+            continue
+        path = os.path.join(backup_dir, name)
+        index[name] = {
+            "file": base_filename,
+            "created": entry.get("created") or backup_time(name).isoformat(timespec="seconds"),
+            "size": os.path.getsize(path),
+            "sha256": entry.get("sha256") or (file_checksum(path) if name.endswith(".xlsx") else None),
+            "rows": entry["rows"] if "rows" in entry else count_rows(backup_dir, name),
+        }
+        changed = True
+    return changed
+
+def backup_catalog(backup_dir, base_filename=None):
+    """
+    Get the backups (of one file, or of all), oldest first, as index entries with their "name" added
+    Read from the index alone; the directory is only scanned to build the index the first time.
+    """
+    index = load_index(backup_dir)
+    if not os.path.exists(os.path.join(backup_dir, INDEX_FILE)) and os.path.isdir(backup_dir):
+        bases = {name.split("_backup_")[0] for name in os.listdir(backup_dir) if "_backup_" in name}
+        for base in bases:
+            sync_index(backup_dir, base, index)
+        save_index(backup_dir, index)
+    entries = [{"name": name, **entry} for name, entry in index.items()
+               if base_filename is None or entry.get("file") == base_filename]
+    return sorted(entries, key=lambda entry: backup_order(backup_stamp(entry["name"])))
+
+def find_backup(backup_dir, base_filename, at):
+    """Get the catalogue entry of the last backup of a file taken at or before a datetime (None if there is none)"""
+    if at.tzinfo is not None:
+        # Backups are named in local time
+        at = at.astimezone().replace(tzinfo=None)
+    entries = backup_catalog(backup_dir, base_filename)
+    position = bisect.bisect_right([entry["created"] for entry in entries], at.isoformat(timespec="seconds"))
+    return entries[position - 1] if position else None
+
+def keyed_rows(headers, rows):
+    """
+    Key rows for diffing: by record ID when the sheet has them, otherwise (and for rows without a unique ID) by position
+    Yields (key, S.No, values) with S.No blanked out of values, since it changes whenever an earlier row is deleted.
+    """
+    from utils.storage import ID_COLUMN, SERIAL_COLUMN
+    id_index = headers.index(ID_COLUMN) if ID_COLUMN in headers else None
+    serial_index = headers.index(SERIAL_COLUMN) if SERIAL_COLUMN in headers else None
+    seen = set()
+    for position, row in enumerate(rows, start=1):
+        record_id = row[id_index] if id_index is not None else None
+        if isinstance(record_id, (int, float)) and not isinstance(record_id, bool) and record_id not in seen:
+            seen.add(record_id)
+            key = str(int(record_id))
+        else:
+            key = f"#{position}"
+        values = list(row)
+        serial = None
+        if serial_index is not None:
+            serial, values[serial_index] = values[serial_index], None
+        yield key, serial, values
+
+def key_order(key):
+    """Order of rows rebuilt from a diff when it has no explicit order: record IDs, then positions"""
+    return (key.startswith("#"), int(key.lstrip("#")))
+
+def read_backup_rows(backup_dir, name):
+    """
+    Get (headers, rows) of a backup, rebuilding it from the newer backups when it is stored as a diff
+    rows are plain value lists, as read by open_excel_rows().
+    """
+    from utils.storage import SERIAL_COLUMN, open_excel_rows
+    name = stored_name(backup_dir, name)
+    path = os.path.join(backup_dir, name)
+    if not name.endswith(DIFF_SUFFIX):
+        with open_excel_rows(path) as (headers, rows):
+            return headers, list(rows)
+    
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        diff = json.load(f)
+    if diff.get("format") != DIFF_FORMAT:
+        raise Exception(f"Unsupported backup diff format in {name}")
+    next_headers, next_rows = read_backup_rows(backup_dir, diff["next"])
+    headers = diff["headers"]
+    remap = [next_headers.index(h) if h in next_headers else None for h in headers]
+    records = {key: [values[i] if i is not None else None for i in remap]
+               for key, _, values in keyed_rows(next_headers, next_rows)}
+    for key in diff["deleted"]:
+        records.pop(key, None)
+    records.update(diff["rows"])
+    order = diff["order"] if diff["order"] is not None else sorted(records, key=key_order)
+    rows = [records[key] for key in order]
+    if SERIAL_COLUMN in headers:
+        serial_index = headers.index(SERIAL_COLUMN)
+        serials = diff["serials"] or range(1, len(rows) + 1)
+        for values, serial in zip(rows, serials):
+            values[serial_index] = serial
+    return headers, rows
+
+@contextmanager
+def open_backup_rows(backup_dir, name):
+    """Stream (headers, rows) of a backup: straight from its workbook, or rebuilt from the diffs"""
+    from utils.storage import open_excel_rows
+    name = stored_name(backup_dir, name)
+    if name.endswith(DIFF_SUFFIX):
+        headers, rows = read_backup_rows(backup_dir, name)
+        yield headers, iter(rows)
+    else:
+        with open_excel_rows(os.path.join(backup_dir, name)) as (headers, rows):
+            yield headers, rows
+
+def compare_backups(backup_dir, old_name, new_name):
+    """
+    Get the row-level differences between two backups: {"fields", "added", "removed", "changed"}
+    Both are read side by side in record ID order, so only the differing rows are held in memory (rows out
+    of order are matched up at the end instead).
+    """
+    from utils.storage import ID_COLUMN, SERIAL_COLUMN
+    with open_backup_rows(backup_dir, old_name) as (old_headers, old_rows), \
+            open_backup_rows(backup_dir, new_name) as (new_headers, new_rows):
+        # Rows are keyed by their record ID, so only the fields are compared
+        fields = [h for h in new_headers if h not in (SERIAL_COLUMN, ID_COLUMN)]
+        fields += [h for h in old_headers if h not in (SERIAL_COLUMN, ID_COLUMN) and h not in fields]
+        
+        def records(headers, rows):
+            indexes = [headers.index(field) if field in headers else None for field in fields]
+            for key, _, values in keyed_rows(headers, rows):
+                yield key, [values[i] if i is not None else None for i in indexes]
+        
+        unmatched_old, unmatched_new, changed = {}, {}, []
+        
+        def match(key, old_values, new_values):
+            differing = [i for i, (a, b) in enumerate(zip(old_values, new_values)) if a != b]
+            if differing:
+                changed.append({
+                    "key": key,
+                    "before": {fields[i]: old_values[i] for i in differing},
+                    "after": {fields[i]: new_values[i] for i in differing},
+                })
+        
+        def take_old(key, values):
+            if key in unmatched_new:
+                match(key, values, unmatched_new.pop(key))
+            else:
+                unmatched_old[key] = values
+        
+        def take_new(key, values):
+            if key in unmatched_old:
+                match(key, unmatched_old.pop(key), values)
+            else:
+                unmatched_new[key] = values
+        
+        old_iter, new_iter = records(old_headers, old_rows), records(new_headers, new_rows)
+        old_row, new_row = next(old_iter, None), next(new_iter, None)
+        while old_row is not None or new_row is not None:
+            if new_row is None or (old_row is not None and key_order(old_row[0]) < key_order(new_row[0])):
+                take_old(*old_row)
+                old_row = next(old_iter, None)
+            elif old_row is None or key_order(new_row[0]) < key_order(old_row[0]):
+                take_new(*new_row)
+                new_row = next(new_iter, None)
+            else:
+                match(old_row[0], old_row[1], new_row[1])
+                old_row, new_row = next(old_iter, None), next(new_iter, None)
+    
+    return {
+        "fields": fields,
+        "added": [{"key": key, "values": dict(zip(fields, values))} for key, values in unmatched_new.items()],
+        "removed": [{"key": key, "values": dict(zip(fields, values))} for key, values in unmatched_old.items()],
+        "changed": changed,
+    }
+
+def diff_backups(backup_dir, name, next_name):
+    """
+    Build the row-level diff that turns backup next_name back into backup name
+    The newer backup is read into memory and the older one streamed past it.
+    """
+    from utils.storage import SERIAL_COLUMN, open_excel_rows
+    next_headers, next_rows = read_backup_rows(backup_dir, next_name)
+    remaining = {key: values for key, _, values in keyed_rows(next_headers, next_rows)}
+    del next_rows
+    
+    with open_excel_rows(os.path.join(backup_dir, name)) as (headers, rows):
+        remap = [next_headers.index(h) if h in next_headers else None for h in headers]
+        order, serials, changed = [], [], {}
+        for key, serial, values in keyed_rows(headers, rows):
+            order.append(key)
+            serials.append(serial)
+            newer = remaining.pop(key, None)
+            if newer is None or [newer[i] if i is not None else None for i in remap] != values:
+                changed[key] = values
+    
+    return {
+        "format": DIFF_FORMAT,
+        "next": next_name,
+        "headers": headers,
+        # Keys and S.No are only spelled out when they are not simply in order
+        "order": None if order == sorted(order, key=key_order) else order,
+        "serials": None if SERIAL_COLUMN not in headers or serials == list(range(1, len(serials) + 1)) else serials,
+        "deleted": list(remaining),
+        "rows": changed,
+    }
+
+def store_as_diff(backup_dir, name, next_name, index):
+    """Replace a full backup by its diff against the next newer backup, unless the diff is not smaller"""
+    path = os.path.join(backup_dir, name)
+    diff_name = name[:-len(".xlsx")] + DIFF_SUFFIX
+    diff_path = os.path.join(backup_dir, diff_name)
+    diff = diff_backups(backup_dir, name, next_name)
+    with gzip.open(diff_path + ".tmp", "wt", encoding="utf-8") as f:
+        json.dump(diff, f, default=str, separators=(",", ":"))
+    if os.path.getsize(diff_path + ".tmp") >= os.path.getsize(path):
+        os.remove(diff_path + ".tmp")
+        return False
+    os.replace(diff_path + ".tmp", diff_path)
+    os.remove(path)
+    index[diff_name] = {**index.pop(name, {}), "size": os.path.getsize(diff_path)}
+    return True
+
+def create_backup(file_path, backup_dir="data/backups", max_backups=5, base_filename=None, timestamp=None, move=False):
     """
     Create a backup of the Excel file before making changes
-    Keeps at most max_backups (default 5) backups per file, deleting the oldest ones
+    Nothing is copied when the file is unchanged since the last backup. The file is stored once under its
+    content hash (reflinked where possible) and the timestamped and "latest" backups are hard links to it; the
+    previous newest backup is turned into a row-level diff against it. Keeps at most max_backups (default 5)
+    backups per file, deleting the oldest ones (None leaves that to the caller).
+    base_filename and timestamp default to the file's name and now; move=True moves a file nobody else
+    uses into the store instead of copying it.
     """
     try:
-        # Create backup directory if it doesn't exist
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
+        os.makedirs(os.path.join(backup_dir, OBJECTS_DIR), exist_ok=True)
+        timestamp = timestamp or datetime.now()
         
         # Extract base filename without extension (e.g., "HW_list" or "preorders")
-        base_filename = os.path.splitext(os.path.basename(file_path))[0]
+        base_filename = base_filename or os.path.splitext(os.path.basename(file_path))[0]
+        latest_backup = os.path.join(backup_dir, f"{base_filename}_backup_latest.xlsx")
         
-        # Create backup filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"{base_filename}_backup_{timestamp}.xlsx"
-        backup_path = os.path.join(backup_dir, backup_filename)
+        index = load_index(backup_dir)
+        sync_index(backup_dir, base_filename, index)
+        backups = list_backups(backup_dir, base_filename)
+        previous = backups[-1] if backups else None
+        digest = file_checksum(file_path)
+        if previous is not None and index.get(previous, {}).get("sha256") == digest and os.path.exists(latest_backup):
+            print(f"[INFO] {base_filename} is unchanged since backup {previous}")
+            return True
         
-        # Copy the file
-        shutil.copy2(file_path, backup_path)
+        # Store the contents once, then link the backup names to them
+        stored = object_path(backup_dir, digest)
+        if not os.path.exists(stored):
+            if move:
+                os.replace(file_path, stored)
+            else:
+                clone_file(file_path, stored)
+        backup_filename = new_backup_name(backup_dir, base_filename, timestamp)
+        link_file(stored, os.path.join(backup_dir, backup_filename))
+        link_file(stored, latest_backup)
+        index[backup_filename] = {
+            "file": base_filename,
+            "created": timestamp.isoformat(timespec="seconds"),
+            "size": os.path.getsize(stored),
+            "sha256": digest,
+            "rows": count_rows(backup_dir, backup_filename),
+        }
         
-        # Also create/overwrite the "latest" backup
-        latest_backup = os.path.join(backup_dir, f"{base_filename}_backup_latest.xlsx")
-        shutil.copy2(file_path, latest_backup)
+        # Only the newest backup is kept whole
+        if previous is not None and previous.endswith(".xlsx"):
+            try:
+                store_as_diff(backup_dir, previous, backup_filename, index)
+            except Exception as e:
+                print(f"[WARNING] Keeping {previous} as a full copy, could not diff it: {e}")
+        save_index(backup_dir, index)
         
         # Clean up old backups - keep only the most recent max_backups
-        cleanup_old_backups(backup_dir, base_filename, max_backups)
+        if max_backups is not None:
+            cleanup_old_backups(backup_dir, base_filename, max_backups)
         
         print(f"[SUCCESS] Backup created: {backup_filename}")
         print(f"[SUCCESS] Latest backup: {base_filename}_backup_latest.xlsx")
         return True
-        
+    
     except Exception as e:
         print(f"[ERROR] Error creating backup: {e}")
         return False
@@ -49,34 +452,45 @@ def create_backup(file_path, backup_dir="data/backups", max_backups=5):
 def cleanup_old_backups(backup_dir, base_filename, max_backups=5):
     """
     Remove old backups, keeping only the most recent max_backups backups
-    Excludes the "latest" backup from the count
+    Excludes the "latest" backup from the count. Diffs only depend on newer backups, so the oldest can always go.
     """
     try:
-        # Find all backup files for this base filename (excluding "latest")
-        pattern = os.path.join(backup_dir, f"{base_filename}_backup_*.xlsx")
-        backup_files = glob.glob(pattern)
-        
-        # Filter out the "latest" backup
-        backup_files = [f for f in backup_files if not f.endswith(f"{base_filename}_backup_latest.xlsx")]
-        
-        if len(backup_files) <= max_backups:
-            return  # No cleanup needed
-        
-        # Sort by modification time (newest first)
-        backup_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-        
-        # Delete the oldest backups beyond max_backups
-        files_to_delete = backup_files[max_backups:]
-        for file_path in files_to_delete:
-            try:
-                os.remove(file_path)
-                print(f"[INFO] Deleted old backup: {os.path.basename(file_path)}")
-            except Exception as e:
-                print(f"[WARNING] Could not delete old backup {os.path.basename(file_path)}: {e}")
-        
+        backups = list_backups(backup_dir, base_filename)
+        files_to_delete = backups[:-max_backups] if max_backups > 0 else backups
+        if files_to_delete:
+            index = load_index(backup_dir)
+            for name in files_to_delete:
+                try:
+                    os.remove(os.path.join(backup_dir, name))
+                    index.pop(name, None)
+                    print(f"[INFO] Deleted old backup: {name}")
+                except Exception as e:
+                    print(f"[WARNING] Could not delete old backup {name}: {e}")
+            save_index(backup_dir, index)
+        remove_unused_objects(backup_dir)
+    
     except Exception as e:
         print(f"[WARNING] Error cleaning up old backups: {e}")
 
+def restore_backup(file_path, name, backup_dir="data/backups"):
+    """
+    Restore a file from one of its timestamped backups (rebuilt from the diffs if needed)
+    """
+    from utils.storage import write_excel_rows
+    try:
+        name = stored_name(backup_dir, name)
+        if not name.endswith(DIFF_SUFFIX):
+            shutil.copy2(os.path.join(backup_dir, name), file_path)
+        else:
+            headers, rows = read_backup_rows(backup_dir, name)
+            write_excel_rows(file_path, headers, rows)
+        print(f"[SUCCESS] Restored {os.path.basename(file_path)} from backup: {name}")
+        return True
+    
+    except Exception as e:
+        print(f"[ERROR] Error restoring from backup: {e}")
+        return False
+
 def restore_from_backup(file_path, backup_dir="data/backups"):
     """
     Restore from the latest backup
@@ -93,7 +507,7 @@ def restore_from_backup(file_path, backup_dir="data/backups"):
         shutil.copy2(latest_backup, file_path)
         print(f"[SUCCESS] Restored from latest backup: {os.path.basename(latest_backup)}")
         return True
-        
+    
     except Exception as e:
         print(f"[ERROR] Error restoring from backup: {e}")
         return False
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Backup Worker
+Takes the Excel backups on a background thread instead of in the middle of a write.
+Before an Excel file is replaced, the writer only hard-links it into data/backups/pending/; the worker turns
+those into backups at most once per BACKUP_INTERVAL seconds or BACKUP_WRITES overwrites, and runs the
+backup retention afterwards.
+"""
+
+import os
+import sys
+import time
+import threading
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.backup_utils import create_backup, link_file
+from utils.cleanup_backups import cleanup_all_backups
+from utils.file_lock import FileLock
+
+# Where the backups are kept
+BACKUP_DIR = os.path.join("data", "backups")
+
+# Files waiting to be backed up: pending/<name>.<time_ns>.xlsx, survives a crash or restart
+PENDING_DIR = "pending"
+
+# Lock file that keeps two processes (the web app and the CLI) from backing up the same pending files
+LOCK_FILE = ".lock"
+
+# A file is backed up once its oldest pending copy is this many seconds old...
+BACKUP_INTERVAL = float(os.environ.get("DIECAST_BACKUP_INTERVAL", 300))
+
+# ...or once it has been overwritten this many times since its last backup
+BACKUP_WRITES = int(os.environ.get("DIECAST_BACKUP_WRITES", 20))
+
+# Backups kept per Excel file
+MAX_BACKUPS = 5
+
+# How often the worker looks for backups that are due, in seconds
+CHECK_INTERVAL = float(os.environ.get("DIECAST_BACKUP_CHECK", 5))
+
+class BackupWorker:
+    """
+    Daemon thread that backs up the Excel files from their pending copies
+    Pending copies that arrive before a backup is due are coalesced: only the newest one becomes a backup.
+    """
+
+    def __init__(self, backup_dir=BACKUP_DIR, interval=BACKUP_INTERVAL, writes=BACKUP_WRITES,
+                 max_backups=MAX_BACKUPS, check_interval=CHECK_INTERVAL):
+        self.backup_dir = backup_dir
+        self.pending_dir = os.path.join(backup_dir, PENDING_DIR)
+        self.interval = interval
+        self.writes = writes
+        self.max_backups = max_backups
+        self.check_interval = check_interval
+        self._lock = FileLock(os.path.join(backup_dir, LOCK_FILE))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def preserve(self, file_path):
+        """
+        Keep the current contents of an Excel file that is about to be replaced, returns False if it failed
+        A hard link costs no copying as long as the file is replaced (os.replace) rather than rewritten in place.
+        """
+        try:
+            os.makedirs(self.pending_dir, exist_ok=True)
+            base_filename = os.path.splitext(os.path.basename(file_path))[0]
+            link_file(file_path, os.path.join(self.pending_dir, f"{base_filename}.{time.time_ns()}.xlsx"))
+            return True
+        except Exception as e:
+            print(f"[ERROR] Error keeping {file_path} for backup: {e}")
+            return False
+
+    def pending(self):
+        """Get {base filename: [(time_ns, path), ...]} of the pending copies, oldest first"""
+        pending = {}
+        if not os.path.isdir(self.pending_dir):
+            return pending
+        for name in os.listdir(self.pending_dir):
+            parts = name.rsplit(".", 2)
+            if len(parts) != 3 or parts[2] != "xlsx" or not parts[1].isdigit():
+                continue
+            pending.setdefault(parts[0], []).append((int(parts[1]), os.path.join(self.pending_dir, name)))
+        for copies in pending.values():
+            copies.sort()
+        return pending
+
+    def run_once(self, force=False):
+        """Back up the files that are due (every file with force=True), returns their base filenames"""
+        backed_up = []
+        with self._lock:
+            for base_filename, copies in self.pending().items():
+                age = time.time() - copies[0][0] / 1e9
+                if not force and len(copies) < self.writes and age < self.interval:
+                    continue
+                taken_at, newest = copies[-1]
+                # A pending copy only the worker links to can be moved into the store as is
+                move = os.stat(newest).st_nlink == 1
+                if not create_backup(newest, self.backup_dir, max_backups=None, base_filename=base_filename,
+                                     timestamp=datetime.fromtimestamp(taken_at / 1e9), move=move):
+                    continue
+                for _, path in copies:
+                    if os.path.exists(path):
+                        os.remove(path)
+                backed_up.append(base_filename)
+            if backed_up:
+                cleanup_all_backups(self.backup_dir, self.max_backups, verbose=False)
+        return backed_up
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[ERROR] Error taking backups: {e}")
+
+    def start(self):
+        """Start the background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="diecast-backups", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread (pending copies are backed up by the next run)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+_backup_worker = None
+_backup_worker_lock = threading.Lock()
+
+def get_backup_worker():
+    """Get the shared backup worker"""
+    global _backup_worker
+    if _backup_worker is None:
+        with _backup_worker_lock:
+            if _backup_worker is None:
+                _backup_worker = BackupWorker()
+    return _backup_worker
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Change Events
+Tells the open pages when the collection or the preorders change (Server-Sent Events at /api/events):
+after the web app's own writes, and when a watcher sees an Excel file or another process change the data
+"""
+
+import os
+import sys
+import json
+import asyncio
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.storage import EXCEL_FILES, file_signature, get_storage
+from utils.worker_pool import get_worker_pool
+
+# How often the watcher checks the Excel files and the table versions, in seconds
+WATCH_INTERVAL = float(os.environ.get("DIECAST_WATCH_INTERVAL", 1))
+
+# Events kept for a page that is slow to read them (the oldest are dropped, the last version always arrives)
+MAX_PENDING_EVENTS = 100
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_INTERVAL = 15
+
+# Streams end after this many seconds and the browser reconnects, so stopping the server never waits on them
+STREAM_LIFETIME = 30
+
+# How long the browser waits before reconnecting, in milliseconds
+RECONNECT_DELAY = 1000
+
+def format_event(event):
+    """Format a change as a Server-Sent Event"""
+    return f"event: change\ndata: {json.dumps(event)}\n\n"
+
+class ChangeEvents:
+    """
+    Publishes {"table": ..., "version": ...} to every subscribed event stream when a table's version changes
+    check() runs after every write batch and every WATCH_INTERVAL seconds on a daemon thread, which also
+    lets the storage re-read an Excel file whose modification time changed.
+    """
+
+    def __init__(self, storage=None, watch_interval=WATCH_INTERVAL):
+        self.storage = storage or get_storage()
+        self.watch_interval = watch_interval
+        self._versions = {}       # last published version of each table
+        self._files = {}          # file_signature() of each Excel file when last looked at
+        self._subscribers = {}    # queue -> the event loop it belongs to
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self):
+        """Register an event stream and return its queue (call from the event loop)"""
+        queue = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue):
+        """Stop sending events to a queue"""
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    @staticmethod
+    def _offer(queue, event):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    def publish(self, event):
+        """Send an event to every subscribed stream (safe to call from any thread)"""
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # The stream's event loop is closed
+                self.unsubscribe(queue)
+
+    def versions(self):
+        """Get the current version of every table (None if it does not exist)"""
+        self.check()
+        with self._lock:
+            return dict(self._versions)
+
+    def check(self):
+        """Publish the tables whose version changed since the last check, returns their names"""
+        changed = []
+        for table in EXCEL_FILES:
+            try:
+                version = self.storage.version(table) if self.storage.exists(table) else None
+            except Exception as e:
+                print(f"[WARNING] Could not read the version of '{table}': {str(e)}")
+                continue
+            with self._lock:
+                if table in self._versions and self._versions[table] != version:
+                    changed.append(table)
+                self._versions[table] = version
+            if table in changed:
+                self.publish({"table": table, "version": version})
+        return changed
+
+    async def stream(self):
+        """Server-Sent Events for one page: the current version of each table, then every change"""
+        queue = self.subscribe()
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + STREAM_LIFETIME
+            yield f"retry: {RECONNECT_DELAY}\n\n"
+            # Versions first, so a page that reconnects catches up on what it missed
+            for table, version in (await get_worker_pool().run(self.versions)).items():
+                yield format_event({"table": table, "version": version})
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(queue.get(), min(KEEPALIVE_INTERVAL, remaining))
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            self.unsubscribe(queue)
+
+    def watch_files(self):
+        """Let the storage pick up Excel files edited outside the app, returns the tables it re-checked"""
+        refreshed = []
+        for table, file_path in EXCEL_FILES.items():
+            signature = file_signature(file_path)
+            if table in self._files and self._files[table] != signature:
+                try:
+                    self.storage.refresh(table)
+                    refreshed.append(table)
+                except Exception as e:
+                    print(f"[ERROR] Error reloading {file_path}: {str(e)}")
+            self._files[table] = signature
+        return refreshed
+
+    def _run(self):
+        while not self._stop.wait(self.watch_interval):
+            self.watch_files()
+            self.check()
+
+    def start(self):
+        """Start the watcher thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self.watch_files()
+            self.check()
+            self._thread = threading.Thread(target=self._run, name="diecast-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+_change_events = None
+_change_events_lock = threading.Lock()
+
+def get_change_events():
+    """Get the shared change event publisher"""
+    global _change_events
+    if _change_events is None:
+        with _change_events_lock:
+            if _change_events is None:
+                _change_events = ChangeEvents()
+    return _change_events
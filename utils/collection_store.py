@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Collection Store
+Shared in-memory cache of the parsed tables, reloaded only when the storage backend reports a change
+"""
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.storage import COLLECTION, SERIAL_COLUMN, ID_COLUMN, get_storage, to_storage_value
+from utils.serial_index import SerialIndex
+
+# Cached DataFrames keyed by table name: {table: (signature, df)}
+_cache = {}
+# Structures derived from a cached DataFrame: {table: {name: (df, value)}}
+_derived = {}
+_lock = threading.RLock()
+# The write_batch() open on each thread
+_local = threading.local()
+
+def load_table(table):
+    """
+    Load a table as a DataFrame, reusing the cached copy while the stored data is unchanged
+    Returns None if the table does not exist. The returned DataFrame is shared, treat it as read-only.
+    """
+    storage = get_storage()
+    if not storage.exists(table):
+        invalidate(table)
+        return None
+
+    # Take the signature before reading so a write during the read forces another reload
+    signature = storage.signature(table)
+    with _lock:
+        cached = _cache.get(table)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+    df = storage.read_frame(table)
+    if df is None:
+        return None
+    # Convert NaN values to empty strings for better JSON serialization
+    df = df.fillna("")
+
+    with _lock:
+        _cache[table] = (signature, df)
+        _derived.pop(table, None)
+    return df
+
+def get_derived(table, name, builder):
+    """
+    Get a structure derived from a table (an index, a sorted order...), built with builder(df)
+    Structures with an apply_change(kind, positions, old_df, df) method are patched by writes made
+    through edit_table(); anything else is rebuilt the next time it is asked for.
+    """
+    df = load_table(table)
+    if df is None:
+        return None
+    with _lock:
+        cached = _derived.get(table, {}).get(name)
+        if cached is not None and cached[0] is df:
+            return cached[1]
+
+    value = builder(df)
+
+    with _lock:
+        # Only keep it if the table was not reloaded while building
+        current = _cache.get(table)
+        if current is not None and current[1] is df:
+            _derived.setdefault(table, {})[name] = (df, value)
+    return value
+
+def loaded_version(table, df):
+    """Get the storage version a cached DataFrame holds (None if it is no longer the cached copy)"""
+    with _lock:
+        cached = _cache.get(table)
+    return cached[0][1] if cached is not None and cached[1] is df else None
+
+def table_changes(table, since):
+    """
+    Get what changed in a table after a version, for pages that patch the rows they already have
+    Returns (df, version, changes): changes is {record_id: "insert" | "update" | "delete"}, or None when
+    the table has to be loaded again; df is the cached table as of version (use record_rows() on it).
+    """
+    storage = get_storage()
+    if not storage.exists(table):
+        return None, None, None
+    # Retry if a write lands between listing the changes and loading the table
+    for _ in range(3):
+        version, changes = storage.changes_since(table, since)
+        df = load_table(table)
+        if df is not None and loaded_version(table, df) == version:
+            return df, version, changes
+    return df, loaded_version(table, df), None
+
+def row_count(table):
+    """
+    Count the rows of a table, from the cached copy plus the writes already made in the open write_batch()
+    The table is only loaded when that is not possible (nothing cached yet, or a column change in the batch).
+    """
+    storage = get_storage()
+    batch = getattr(_local, "batch", None) or {}
+    signature, operations = batch.get(table) or (storage.signature(table) if storage.exists(table) else None, [])
+    with _lock:
+        cached = _cache.get(table)
+    if cached is not None and cached[0] == signature:
+        count = len(cached[1])
+        for operation in operations:
+            if operation[0] == "insert":
+                count += len(operation[2])
+            elif operation[0] == "delete":
+                count -= operation[2]
+            elif operation[0] != "update":
+                break
+        else:
+            return count
+    df = load_table(table)
+    return 0 if df is None else len(df)
+
+def record_rows(df, record_ids):
+    """Get the rows of a cached table with the given record IDs, in record ID order (unknown IDs are skipped)"""
+    return df.iloc[_record_positions(df, record_ids)]
+
+def load_collection():
+    """Load the collection table (cached until it changes)"""
+    return load_table(COLLECTION)
+
+def get_serial_index(table):
+    """Get the serial number / record ID -> row position index of a table (None if the table does not exist)"""
+    return get_derived(table, "serial_index", SerialIndex)
+
+def find_row(table, serial_number):
+    """Get the row shown with a serial number as a dict, or None if there is no such row"""
+    index = get_serial_index(table)
+    return None if index is None else index.row(serial_number)
+
+def find_record(table, record_id):
+    """Get the row with a record ID as a dict, or None if there is no such row"""
+    index = get_serial_index(table)
+    return None if index is None else index.record(record_id)
+
+def record_ids_for_serials(table, serial_numbers):
+    """
+    Translate the serial numbers shown to the user into record IDs
+    Returns (record IDs in the given order, serial numbers with no row).
+    """
+    index = get_serial_index(table)
+    record_ids, missing = [], []
+    for serial_number in serial_numbers:
+        record_id = None if index is None else index.record_id(serial_number)
+        if record_id is None:
+            missing.append(int(serial_number))
+        else:
+            record_ids.append(record_id)
+    return record_ids, missing
+
+def missing_record_ids(table, record_ids):
+    """Get the record IDs that are not in a table, sorted"""
+    wanted = {int(record_id) for record_id in record_ids}
+    index = get_serial_index(table)
+    if index is None:
+        return sorted(wanted)
+    return sorted(record_id for record_id in wanted if index.record_position(record_id) is None)
+
+def invalidate(table=None):
+    """Drop the cached copy of a table (or of every table) so the next load re-reads it"""
+    with _lock:
+        if table is None:
+            _cache.clear()
+            _derived.clear()
+        else:
+            _cache.pop(table, None)
+            _derived.pop(table, None)
+
+class TableEditor:
+    """Runs writes against one table and records them so the cached copy can be patched afterwards"""
+
+    def __init__(self, storage, table):
+        self.storage = storage
+        self.table = table
+        self.operations = []
+
+    def insert_rows(self, rows):
+        """Append rows and return their record IDs"""
+        record_ids = self.storage.insert_rows(self.table, rows)
+        self.operations.append(("insert", rows, record_ids))
+        return record_ids
+
+    def update_rows(self, updates):
+        """Apply {record_id: {column: value}} updates and return the number of rows found"""
+        found = self.storage.update_rows(self.table, updates)
+        self.operations.append(("update", updates))
+        return found
+
+    def delete_rows(self, record_ids):
+        """Delete rows by record ID and return the number deleted"""
+        deleted = self.storage.delete_rows(self.table, record_ids)
+        self.operations.append(("delete", record_ids, deleted))
+        return deleted
+
+    def add_column(self, name):
+        """Add an empty column (the cached copy is re-read afterwards)"""
+        self.storage.add_column(self.table, name)
+        self.operations.append(("reset",))
+
+    def rename_column(self, old_name, new_name):
+        """Rename a column (the cached copy is re-read afterwards)"""
+        self.storage.rename_column(self.table, old_name, new_name)
+        self.operations.append(("reset",))
+
+    def import_excel(self, file_path):
+        """Replace every row with the contents of an Excel file, returns the row count (the cached copy is re-read afterwards)"""
+        count = self.storage.import_excel(self.table, file_path)
+        self.operations.append(("reset",))
+        return count
+
+def _stored_value(value):
+    """Convert a written value to what reading it back gives"""
+    value = to_storage_value(value)
+    return "" if value is None else value
+
+def _record_positions(df, record_ids):
+    """Get the row positions of record IDs in a DataFrame ordered by record ID"""
+    ids = df[ID_COLUMN].to_numpy()
+    wanted = np.array(sorted({int(r) for r in record_ids}), dtype=np.int64)
+    positions = np.searchsorted(ids, wanted)
+    found = positions < len(ids)
+    found[found] = ids[positions[found]] == wanted[found]
+    return positions[found]
+
+def _apply_operation(df, operation):
+    """Apply one recorded write to a DataFrame, returns (new_df, change kind, row positions)"""
+    kind = operation[0]
+    if kind == "insert":
+        _, rows, record_ids = operation
+        records = []
+        for serial_number, (row, record_id) in enumerate(zip(rows, record_ids), start=len(df) + 1):
+            record = {column: _stored_value(row.get(column)) for column in df.columns}
+            record[SERIAL_COLUMN] = serial_number
+            record[ID_COLUMN] = record_id
+            records.append(record)
+        new_df = pd.concat([df, pd.DataFrame(records, columns=df.columns)], ignore_index=True)
+        return new_df, kind, np.arange(len(df), len(new_df))
+
+    if kind == "update":
+        updates = {int(record_id): fields for record_id, fields in operation[1].items()}
+        positions = _record_positions(df, updates)
+        new_df = df.copy()
+        ids = new_df[ID_COLUMN].to_numpy()
+        for position in positions:
+            for column, value in updates[int(ids[position])].items():
+                if column in (SERIAL_COLUMN, ID_COLUMN) or column not in new_df.columns:
+                    continue
+                if new_df[column].dtype != object:
+                    new_df[column] = new_df[column].astype(object)
+                new_df.iat[position, new_df.columns.get_loc(column)] = _stored_value(value)
+        return new_df, kind, positions
+
+    if kind == "delete":
+        positions = _record_positions(df, operation[1])
+        new_df = df.drop(index=df.index[positions]).reset_index(drop=True)
+        # S.No is only the display order, so the rows after the deleted ones just move up
+        new_df[SERIAL_COLUMN] = np.arange(1, len(new_df) + 1)
+        return new_df, kind, positions
+
+    return None, kind, None
+
+def _apply_changes(table, before, after, operations):
+    """Patch the cached DataFrame and its derived structures, or drop them if that is not possible"""
+    with _lock:
+        cached = _cache.get(table)
+        if cached is None or cached[0] != before:
+            invalidate(table)
+            return
+
+        df = cached[1]
+        derived = {name: value for name, (_, value) in _derived.get(table, {}).items()}
+        for operation in operations:
+            old_df = df
+            df, kind, positions = _apply_operation(old_df, operation)
+            if df is None:
+                invalidate(table)
+                return
+            for name, value in list(derived.items()):
+                patch = getattr(value, "apply_change", None)
+                if patch is None or not patch(kind, positions, old_df, df):
+                    del derived[name]
+
+        _cache[table] = (after, df)
+        _derived[table] = {name: (df, value) for name, value in derived.items()}
+
+@contextmanager
+def write_batch():
+    """
+    Group the edit_table() calls made inside into one storage transaction
+    The cached copies are patched once the whole batch has committed. Nested calls join the outer batch.
+    """
+    if getattr(_local, "batch", None) is not None:
+        yield _local.batch
+        return
+
+    storage = get_storage()
+    batch = _local.batch = {}   # table -> (signature before the batch, recorded operations)
+    try:
+        with storage.transaction():
+            yield batch
+            # Engines that bump a version inside the transaction report the exact new signature here
+            inside = {table: storage.signature(table) for table in batch}
+    except BaseException:
+        for table in batch:
+            invalidate(table)
+        raise
+    finally:
+        _local.batch = None
+
+    for table, (before, operations) in batch.items():
+        after = inside[table] if inside[table] != before else storage.signature(table)
+        _apply_changes(table, before, after, operations)
+
+@contextmanager
+def edit_table(table):
+    """
+    Write to a table through a TableEditor in one transaction (or in the enclosing write_batch())
+    The cached copy (and any index built from it) is patched with the changes instead of re-read.
+    """
+    storage = get_storage()
+    if getattr(_local, "batch", None) is None and storage.in_transaction():
+        # Part of a larger transaction that may still roll back, so just drop the cached copy
+        try:
+            yield TableEditor(storage, table)
+        finally:
+            invalidate(table)
+        return
+
+    with write_batch() as batch:
+        if table not in batch:
+            batch[table] = (storage.signature(table) if storage.exists(table) else None, [])
+        editor = TableEditor(storage, table)
+        try:
+            yield editor
+        finally:
+            # Writes that went through stay part of the batch even if the caller raised afterwards
+            batch[table][1].extend(editor.operations)
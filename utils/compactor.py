@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Background Compactor
+Folds pending changes into the Excel files once they grow past a size or age threshold
+"""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.storage import EXCEL_FILES, get_storage
+
+# How often the thresholds are checked, in seconds
+CHECK_INTERVAL = float(os.environ.get("DIECAST_COMPACT_CHECK", 5))
+
+class Compactor:
+    """Daemon thread that compacts every table whose pending changes passed a threshold"""
+
+    def __init__(self, storage=None, check_interval=CHECK_INTERVAL):
+        self.storage = storage or get_storage()
+        self.check_interval = check_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        """Compact the tables that need it, returns the ones that were compacted"""
+        compacted = []
+        for table in EXCEL_FILES:
+            try:
+                if self.storage.needs_compaction(table) and self.storage.compact(table):
+                    compacted.append(table)
+            except Exception as e:
+                print(f"[ERROR] Error compacting '{table}': {e}")
+        return compacted
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.run_once()
+
+    def start(self):
+        """Start the background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="diecast-compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread (pending changes stay in the journal until the next export)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+_compactor = None
+
+def start_compactor():
+    """Start the shared background compactor"""
+    global _compactor
+    if _compactor is None:
+        _compactor = Compactor()
+    _compactor.start()
+    return _compactor
+
+def stop_compactor():
+    """Stop the shared background compactor"""
+    if _compactor is not None:
+        _compactor.stop()
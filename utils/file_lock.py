@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Write Lock
+Exclusive lock on the data directory shared by the web app, the CLI and the scripts
+"""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # fcntl is not available on Windows; the lock then only covers the threads of one process
+    fcntl = None
+
+# Lock file every process takes before changing the stored data
+WRITE_LOCK_PATH = os.path.join("data", ".write.lock")
+
+class FileLock:
+    """
+    Re-entrant exclusive lock held across processes with fcntl.flock
+    Threads of the same process queue on an RLock; the outermost acquire takes the file lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        """Take the lock, waiting for other threads and processes to release it"""
+        self._lock.acquire()
+        try:
+            if self._depth == 0 and fcntl is not None:
+                self._fd = self._lock_file()
+        except BaseException:
+            self._lock.release()
+            raise
+        self._depth += 1
+
+    def _lock_file(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def release(self):
+        """Release the lock (the file lock is dropped when the outermost holder releases it)"""
+        self._depth -= 1
+        try:
+            if self._depth == 0 and self._fd is not None:
+                fd, self._fd = self._fd, None
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                finally:
+                    os.close(fd)
+        finally:
+            self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+_write_lock = FileLock(WRITE_LOCK_PATH)
+
+def write_lock():
+    """Get the shared write lock (use as `with write_lock():`)"""
+    return _write_lock
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - HTTP Caching
+ETags derived from the data versions a response is built from, so unchanged data is answered with 304 Not Modified
+"""
+
+import os
+import sys
+import time
+import hashlib
+
+from fastapi.responses import Response
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.storage import get_storage
+
+# Changes on every server start, so an ETag is never matched against data versions from another run
+ETAG_SEED = f"{os.getpid()}:{time.time_ns()}"
+
+# Browsers may keep the responses but have to check the ETag before reusing them
+CACHE_CONTROL = "no-cache"
+
+def make_etag(*parts):
+    """Build a strong ETag from everything a response depends on (data versions, query parameters...)"""
+    return '"' + hashlib.sha1(repr((ETAG_SEED,) + parts).encode("utf-8")).hexdigest() + '"'
+
+def table_etag(name, tables, *parts):
+    """Build the ETag of a response made from tables, without reading them (uses the storage's version of each table)"""
+    storage = get_storage()
+    versions = [storage.signature(table) if storage.exists(table) else None for table in tables]
+    return make_etag(name, versions, *parts)
+
+def etag_matches(request, etag):
+    """Check whether a request's If-None-Match header names the ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/"..." matches too
+    tags = [tag.strip() for tag in header.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+def not_modified(etag):
+    """304 Not Modified response for an ETag the client already has"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def with_etag(response, etag):
+    """Add the ETag to a successful response (errors are never cached)"""
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - JSON Responses
+orjson-backed JSON responses for the web app, and responses for bodies that were serialised ahead of time
+"""
+
+import os
+import json
+import gzip
+import threading
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; without it responses are encoded with the standard json module
+    orjson = None
+
+# orjson options: numpy scalars/arrays are encoded directly and non-string dict keys become strings like json does
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.environ.get("DIECAST_COMPRESS_MIN_BYTES", 1024))
+
+# gzip level for responses (6 keeps large row lists quick to compress)
+GZIP_LEVEL = 6
+
+def dump_json(content):
+    """Serialise content to JSON bytes (NaN and inf become null with orjson)"""
+    if orjson is not None:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when it is installed"""
+
+    def render(self, content):
+        return dump_json(content)
+
+class RawJSONResponse(Response):
+    """Response for a body that is already serialised JSON (bytes), sent as is"""
+    media_type = "application/json"
+
+class JSONPayload:
+    """
+    A serialised response body kept for reuse until the data changes
+    Its gzip copy is made the first time a client that accepts gzip asks for it, then reused as well.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self._gzipped = None
+        self._lock = threading.Lock()
+
+    def gzipped(self):
+        """Get the gzip-compressed body"""
+        with self._lock:
+            if self._gzipped is None:
+                self._gzipped = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+            return self._gzipped
+
+    def response(self, accept_encoding=""):
+        """Build the response, compressed if the client accepts gzip and the body is large enough"""
+        if "gzip" in accept_encoding and len(self.body) >= COMPRESS_MIN_BYTES:
+            return RawJSONResponse(content=self.gzipped(), headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+        return RawJSONResponse(content=self.body)
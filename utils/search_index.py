@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Search Index
+Inverted token index with an n-gram index over the vocabulary, for case-insensitive substring search
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Longest n-gram kept in the vocabulary index (shorter query parts are looked up directly)
+GRAM_SIZE = 3
+
+# Query parts matching more tokens than this are left to the substring check instead of being intersected
+MAX_NARROWING_TOKENS = 32
+
+def grams(token):
+    """Get every substring of a token of length 1 to GRAM_SIZE"""
+    return {token[i:i + n] for n in range(1, GRAM_SIZE + 1) for i in range(len(token) - n + 1)}
+
+class SearchIndex:
+    """
+    Search index over the text columns of one table
+    Rows get internal document ids so inserts and deletes can be patched in without rebuilding.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = self.text_columns(df)
+        self.postings = {}      # token -> set of document ids
+        self.vocabulary = {}    # n-gram -> set of tokens containing it
+        self.texts = {}         # document id -> lowercase cell texts
+        self.doc_ids = np.arange(len(df), dtype=np.int64)  # row position -> document id
+        self.next_doc = len(df)
+        self._positions = None  # document id -> row position, built on demand
+        self._lock = threading.Lock()
+
+        for doc, texts in enumerate(self._row_texts(df)):
+            self._add(doc, texts)
+
+    @staticmethod
+    def text_columns(df):
+        """Columns that are searched (the text columns)"""
+        return [column for column in df.columns if df[column].dtype == object]
+
+    def _row_texts(self, df, positions=None):
+        rows = df if positions is None else df.iloc[positions]
+        columns = [rows[column].astype(str).str.lower().tolist() for column in self.columns]
+        return zip(*columns) if columns else ((),) * len(rows)
+
+    def _add(self, doc, texts):
+        self.texts[doc] = texts
+        for token in {token for text in texts for token in text.split()}:
+            docs = self.postings.get(token)
+            if docs is None:
+                self.postings[token] = docs = set()
+                for gram in grams(token):
+                    self.vocabulary.setdefault(gram, set()).add(token)
+            docs.add(doc)
+
+    def _remove(self, doc):
+        texts = self.texts.pop(doc)
+        for token in {token for text in texts for token in text.split()}:
+            docs = self.postings[token]
+            docs.discard(doc)
+            if not docs:
+                del self.postings[token]
+                for gram in grams(token):
+                    tokens = self.vocabulary[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self.vocabulary[gram]
+
+    def _tokens_containing(self, part):
+        """Get the vocabulary tokens that contain a whitespace-free query part"""
+        if len(part) <= GRAM_SIZE:
+            return self.vocabulary.get(part, ())
+        candidates = sorted(
+            (self.vocabulary.get(part[i:i + GRAM_SIZE], set()) for i in range(len(part) - GRAM_SIZE + 1)),
+            key=len
+        )
+        tokens = candidates[0].intersection(*candidates[1:])
+        return [token for token in tokens if part in token]
+
+    def _docs_matching(self, query):
+        if not query:
+            return None
+        parts = query.split()
+        if not parts:
+            # Only whitespace: there is no token to look it up by, so every cell is checked for it
+            return {doc for doc, texts in self.texts.items() if any(query in text for text in texts)}
+
+        # Start from the part that matches the fewest rows, then narrow it down with the other
+        # parts that match few tokens; the substring check below covers the rest
+        token_lists = [self._tokens_containing(part) for part in parts]
+        best, best_size = 0, None
+        for i, tokens in enumerate(token_lists):
+            size = 0
+            for token in tokens:
+                size += len(self.postings[token])
+                if best_size is not None and size >= best_size:
+                    break
+            if best_size is None or size < best_size:
+                best, best_size = i, size
+
+        docs = set().union(*(self.postings[token] for token in token_lists[best]))
+        for i, tokens in enumerate(token_lists):
+            if not docs:
+                break
+            if i != best and len(tokens) <= MAX_NARROWING_TOKENS:
+                docs = set().union(*(docs.intersection(self.postings[token]) for token in tokens))
+
+        # A query with whitespace must still match as one substring of a single cell
+        if query != parts[0]:
+            docs = {doc for doc in docs if any(query in text for text in self.texts[doc])}
+        return docs
+
+    def _position_lookup(self):
+        if self._positions is None:
+            positions = np.full(self.next_doc, -1, dtype=np.int64)
+            positions[self.doc_ids] = np.arange(len(self.doc_ids), dtype=np.int64)
+            self._positions = positions
+        return self._positions
+
+    def search(self, query):
+        """
+        Find the rows with a cell containing the query (case-insensitive)
+        Returns (df, positions): the DataFrame the index describes and the matching row positions in order.
+        """
+        with self._lock:
+            docs = self._docs_matching(query.lower())
+            if docs is None:
+                return self.df, np.arange(len(self.df))
+            positions = self._position_lookup()[np.fromiter(docs, dtype=np.int64, count=len(docs))]
+            return self.df, np.sort(positions)
+
+    def apply_change(self, kind, positions, old_df, df):
+        """
+        Patch the index after rows were inserted, updated or deleted
+        positions are row positions in the new DataFrame (in the old one for deletes).
+        Returns False if the index has to be rebuilt instead.
+        """
+        if self.text_columns(df) != self.columns:
+            return False
+
+        with self._lock:
+            if kind == "insert":
+                docs = np.arange(self.next_doc, self.next_doc + len(positions), dtype=np.int64)
+                for doc, texts in zip(docs.tolist(), self._row_texts(df, positions)):
+                    self._add(doc, texts)
+                self.doc_ids = np.concatenate([self.doc_ids, docs])
+                self.next_doc += len(positions)
+                self._positions = None
+            elif kind == "update":
+                for position, texts in zip(positions, self._row_texts(df, positions)):
+                    doc = int(self.doc_ids[position])
+                    self._remove(doc)
+                    self._add(doc, texts)
+            elif kind == "delete":
+                for position in positions:
+                    self._remove(int(self.doc_ids[position]))
+                self.doc_ids = np.delete(self.doc_ids, positions)
+                self._positions = None
+            else:
+                return False
+            self.df = df
+        return True
+
+def substring_matches(df, columns, query):
+    """Row positions with a cell containing the query, found by scanning every cell (what the index must match)"""
+    if not query:
+        return np.arange(len(df))
+    mask = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        mask |= df[column].astype(str).str.lower().str.contains(query.lower(), regex=False).to_numpy()
+    return np.flatnonzero(mask)
+
+def verify_search_index(df, queries):
+    """Compare the index's results with a scan of every cell, returns the queries that differ"""
+    index = SearchIndex(df)
+    return [query for query in queries
+            if not np.array_equal(index.search(query)[1], substring_matches(df, index.columns, query))]
+
+if __name__ == "__main__":
+    # Check the index against a plain substring search of the collection
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.collection_store import load_collection
+    
+    df = load_collection()
+    if df is None:
+        print("[ERROR] Collection not found")
+        sys.exit(1)
+    words = sorted({word for text in df["Model Name"].astype(str) for word in text.lower().split()})[:50]
+    queries = ["", " ", "  ", "\t", "a", "mainlines", " mainlines", "car culture", "ar cu", "no such model"]
+    queries += words + [word[1:-1] for word in words if len(word) > 2]
+    mismatches = verify_search_index(df, queries)
+    if mismatches:
+        print(f"[ERROR] Search index results differ for: {', '.join(repr(query) for query in mismatches)}")
+        sys.exit(1)
+    print(f"[SUCCESS] Search index matches a substring search for {len(queries)} queries")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Serial Number Index
+Serial number / record ID -> row position lookup for the cached tables, patched on every write
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.storage import ID_COLUMN
+
+class SerialIndex:
+    """
+    Row lookup for one table by the serial number shown to the user or by record ID
+    Serial numbers always run 1..n in row order, so a row's position is its serial number - 1;
+    record IDs increase with the row order and are found with a binary search.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.ids = df[ID_COLUMN].to_numpy(dtype=np.int64)
+
+    def position(self, serial_number):
+        """Get the row position of a serial number (None if there is no such row)"""
+        serial_number = int(serial_number)
+        return serial_number - 1 if 1 <= serial_number <= len(self.ids) else None
+
+    def record_position(self, record_id):
+        """Get the row position of a record ID (None if there is no such row)"""
+        record_id = int(record_id)
+        position = int(np.searchsorted(self.ids, record_id))
+        return position if position < len(self.ids) and self.ids[position] == record_id else None
+
+    def record_id(self, serial_number):
+        """Get the record ID of the row shown with a serial number (None if there is no such row)"""
+        position = self.position(serial_number)
+        return None if position is None else int(self.ids[position])
+
+    def row(self, serial_number):
+        """Get the row with a serial number as a dict (None if there is no such row)"""
+        position = self.position(serial_number)
+        return None if position is None else self.df.iloc[position].to_dict()
+
+    def record(self, record_id):
+        """Get the row with a record ID as a dict (None if there is no such row)"""
+        position = self.record_position(record_id)
+        return None if position is None else self.df.iloc[position].to_dict()
+
+    def apply_change(self, kind, positions, old_df, df):
+        """
+        Patch the index after rows were inserted, updated or deleted
+        Returns False if the index has to be rebuilt instead.
+        """
+        if kind == "insert":
+            added = df[ID_COLUMN].to_numpy(dtype=np.int64)[positions]
+            # New rows are appended with new (higher) IDs, anything else needs a rebuild
+            if len(added) and len(self.ids) and added[0] <= self.ids[-1]:
+                return False
+            self.ids = np.concatenate([self.ids, added])
+        elif kind == "delete":
+            self.ids = np.delete(self.ids, positions)
+        elif kind != "update":
+            return False
+        self.df = df
+        return True
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Columnar Snapshots
+Arrow copies of the Excel files (data/<name>.arrow) that load in milliseconds instead of re-parsing the xlsx XML
+"""
+
+import os
+import json
+import hashlib
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    # pyarrow is optional; without it every load parses the Excel file
+    pa = None
+
+# Bumped whenever the snapshot layout changes, older snapshots are then ignored
+SNAPSHOT_FORMAT = "1"
+
+def snapshot_path(file_path):
+    """Get the snapshot file that goes with an Excel file"""
+    return os.path.splitext(file_path)[0] + ".arrow"
+
+def file_checksum(file_path):
+    """Get the SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _column_array(values):
+    """
+    Build the Arrow array for one column, returns (array, is_json)
+    Columns holding more than one type (e.g. numbers and text) are stored as JSON text so every value
+    comes back exactly as it was.
+    """
+    if len({type(v) for v in values if v is not None}) <= 1:
+        try:
+            return pa.array(values), False
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            pass
+    return pa.array([None if v is None else json.dumps(v) for v in values], type=pa.string()), True
+
+def write_snapshot(file_path, checksum, fields, rows):
+    """
+    Write the snapshot of an Excel file from its rows ([record_id, *values]), replacing it atomically
+    checksum is the file_checksum() of the Excel file the rows match. Returns False without pyarrow.
+    """
+    if pa is None:
+        return False
+    columns = list(zip(*rows)) if rows else [()] * (len(fields) + 1)
+    arrays, json_columns = [], []
+    for index, values in enumerate(columns):
+        array, is_json = _column_array(list(values))
+        arrays.append(array)
+        if is_json:
+            json_columns.append(index)
+    metadata = {
+        "format": SNAPSHOT_FORMAT,
+        "checksum": checksum,
+        "fields": json.dumps(list(fields)),
+        "json_columns": json.dumps(json_columns),
+    }
+    table = pa.Table.from_arrays(arrays, names=[f"c{i}" for i in range(len(arrays))], metadata=metadata)
+
+    path = snapshot_path(file_path)
+    temp_path = path + ".tmp"
+    with pa.OSFile(temp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+    return True
+
+class Snapshot:
+    """
+    A fresh snapshot, memory-mapped
+    Its columns become a DataFrame without going through Python objects; the row lists the journal
+    works on are only built if they are needed.
+    """
+
+    def __init__(self, fields, table, json_columns):
+        self.fields = fields
+        self.table = table
+        self.json_columns = json_columns
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def last_record_id(self):
+        """Get the highest record ID (rows are in record ID order), None if there are no rows"""
+        return self.table.column(0)[-1].as_py() if self.table.num_rows else None
+
+    def _decode(self, index, values):
+        return [None if v is None else json.loads(v) for v in values] if index in self.json_columns else values
+
+    def rows(self):
+        """Get the rows as [record_id, *values] lists"""
+        columns = [self._decode(index, column.to_pylist()) for index, column in enumerate(self.table.columns)]
+        return [list(row) for row in zip(*columns)]
+
+    def frame(self, names):
+        """Get the rows as a DataFrame with the given column names"""
+        df = self.table.to_pandas()
+        for index in self.json_columns:
+            df[df.columns[index]] = self._decode(index, df.iloc[:, index].tolist())
+        df.columns = names
+        return df
+
+def read_snapshot(file_path, checksum):
+    """Get the snapshot of an Excel file if it matches the file's checksum, None if there is no fresh snapshot"""
+    path = snapshot_path(file_path)
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        metadata = {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()}
+        if metadata.get("format") != SNAPSHOT_FORMAT or metadata.get("checksum") != checksum:
+            return None
+        return Snapshot(json.loads(metadata["fields"]), table, set(json.loads(metadata["json_columns"])))
+    except (pa.ArrowException, OSError, KeyError, ValueError):
+        print(f"[WARNING] Ignoring unreadable snapshot {path}")
+        return None
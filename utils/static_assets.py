@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Static Assets
+Content-hashed asset URLs with long-lived caching, and gzip/brotli copies of the assets made at startup
+"""
+
+import os
+import sys
+import gzip
+import hashlib
+import threading
+from mimetypes import guess_type
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.json_response import COMPRESS_MIN_BYTES
+
+try:
+    import brotli
+except ImportError:
+    # brotli is optional; without it only gzip copies are made
+    brotli = None
+
+# Where the compressed copies are kept, named after the content hash of the file they belong to
+ASSET_CACHE_DIR = os.path.join("data", ".static_cache")
+
+# File types worth compressing (images and fonts are compressed already)
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".html", ".svg", ".json", ".txt"}
+
+# Cache headers for versioned (?v=<hash>) URLs and for everything else
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Encodings we can serve, in order of preference, with the suffix of their copies
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# {file path: (mtime_ns, size, hash)}
+_hashes = {}
+_hashes_lock = threading.Lock()
+
+def file_hash(path):
+    """Get the short content hash of a file (cached until the file changes)"""
+    stat = os.stat(path)
+    with _hashes_lock:
+        cached = _hashes.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    with _hashes_lock:
+        _hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+def compressed_path(digest, suffix):
+    """Get the path of the compressed copy of the file with a content hash"""
+    return os.path.join(ASSET_CACHE_DIR, digest + suffix)
+
+def is_compressible(path):
+    """Check whether a file is of a type and size that is served compressed"""
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS and os.path.getsize(path) >= COMPRESS_MIN_BYTES
+
+def compress_file(path):
+    """Write the gzip (and brotli) copies of a file if they do not exist yet, returns how many were written"""
+    digest = file_hash(path)
+    written = 0
+    with open(path, "rb") as f:
+        content = f.read()
+    for encoding, suffix in ENCODINGS:
+        target = compressed_path(digest, suffix)
+        if os.path.exists(target) or (encoding == "br" and brotli is None):
+            continue
+        data = brotli.compress(content) if encoding == "br" else gzip.compress(content, compresslevel=9, mtime=0)
+        temp_path = target + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, target)
+        written += 1
+    return written
+
+def precompress_assets(directories):
+    """Make the compressed copies of every compressible file under the asset directories"""
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+    written = 0
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if is_compressible(path):
+                    written += compress_file(path)
+    if written:
+        print(f"[INFO] Compressed {written} static asset copies into {ASSET_CACHE_DIR}")
+    return written
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles that serves the precompressed copy of a file when the browser accepts it
+    Requests carrying the file's current content hash (?v=<hash>, see asset_url) may be cached for good.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        if status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        request_headers = Headers(scope=scope)
+        digest = file_hash(full_path)
+        versioned = QueryParams(scope.get("query_string", b"").decode("latin-1")).get("v") == digest
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL}
+
+        response = None
+        if is_compressible(full_path):
+            headers["Vary"] = "Accept-Encoding"
+            accepted = request_headers.get("accept-encoding", "")
+            for encoding, suffix in ENCODINGS:
+                variant = compressed_path(digest, suffix)
+                if encoding in accepted and os.path.exists(variant):
+                    # The copy has its own ETag (from its own file), so conditional requests still work
+                    response = FileResponse(variant, stat_result=os.stat(variant),
+                                            media_type=guess_type(full_path)[0] or "text/plain",
+                                            headers={**headers, "Content-Encoding": encoding})
+                    break
+        if response is None:
+            response = FileResponse(full_path, stat_result=stat_result, headers=headers)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+def asset_url(url, directories):
+    """Add the content hash of a mounted file to its URL, e.g. /static/shared.css?v=<hash>"""
+    for prefix, directory in directories.items():
+        if url.startswith(prefix + "/"):
+            path = os.path.join(directory, *url[len(prefix) + 1:].split("/"))
+            if os.path.isfile(path):
+                return f"{url}?v={file_hash(path)}"
+    return url
@@ -0,0 +1,1264 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Storage Backends
+Pluggable storage for the collection and preorders tables.
+SQLite is the live store by default; the Excel files are used for import and export.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils import get_column_letter
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.backup_worker import get_backup_worker
+from utils.file_lock import write_lock
+from utils.snapshot import file_checksum, read_snapshot, write_snapshot
+
+# Table names
+COLLECTION = "collection"
+PREORDERS = "preorders"
+
+# Excel file backing each table (live store for the excel backend, import/export for sqlite)
+EXCEL_FILES = {
+    COLLECTION: os.path.join("data", "HW_list.xlsx"),
+    PREORDERS: os.path.join("data", "preorders.xlsx"),
+}
+
+# Headers used when a table is created from scratch
+DEFAULT_HEADERS = {
+    COLLECTION: ["S.No", "Model Name", "Series"],
+    PREORDERS: ["S.No", "Seller", "Models", "ETA", "Total Price", "PO Amount", "On Arrival Amount", "Delivery Status", "Date Added"],
+}
+
+# Display serial number: the row's position (1..n in record ID order), computed on read and on export
+SERIAL_COLUMN = "S.No"
+
+# Stable record ID: assigned on insert and never renumbered or reused (a hidden column in the Excel files)
+ID_COLUMN = "Record ID"
+
+# Path to the SQLite database
+DATABASE_PATH = os.path.join("data", "diecast.db")
+
+# Storage engine: "sqlite" (default) or "excel" (.xlsx snapshots plus an append-only journal)
+STORAGE_BACKEND = os.environ.get("DIECAST_STORAGE", "sqlite").lower()
+
+# Pending changes are folded into the Excel files once the journal reaches this many bytes...
+COMPACT_JOURNAL_BYTES = int(os.environ.get("DIECAST_COMPACT_BYTES", 1024 * 1024))
+# ...or once they have been pending for this many seconds
+COMPACT_INTERVAL = float(os.environ.get("DIECAST_COMPACT_INTERVAL", 60))
+
+# Versions whose row changes are kept for changes_since(); clients further behind reload the whole table
+CHANGE_LOG_VERSIONS = int(os.environ.get("DIECAST_CHANGE_LOG_VERSIONS", 1000))
+
+def quote_identifier(name):
+    """Quote a column or table name for use in SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+def to_storage_value(value):
+    """Convert a pandas/numpy/Excel value into a plain Python value (None for empty cells)"""
+    if value is None:
+        return None
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        # numpy scalars
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, str) and value == "":
+        return None
+    if isinstance(value, (datetime, date)):
+        return str(value)
+    return value
+
+@contextmanager
+def open_excel_rows(file_path):
+    """
+    Stream the first sheet of an Excel file as (headers, rows)
+    rows is a generator of plain value lists, one per non-empty row. openpyxl's read-only mode parses the
+    sheet XML as it is iterated, so no cell objects (or list of all rows) are ever held in memory.
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            yield [], iter(())
+            return
+        headers = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header_row)]
+
+        def typed_rows():
+            for row in rows:
+                if row is None or all(v is None for v in row):
+                    continue
+                values = [to_storage_value(v) for v in row[:len(headers)]]
+                values.extend([None] * (len(headers) - len(values)))
+                yield values
+
+        yield headers, typed_rows()
+    finally:
+        wb.close()
+
+def excel_fields(headers):
+    """Get the stored field columns of an Excel sheet (everything but S.No and the record ID)"""
+    return [h for h in headers if h not in (SERIAL_COLUMN, ID_COLUMN)]
+
+def iter_excel_records(headers, rows):
+    """Turn rows read from an Excel file into (record_id or None, values) pairs in file order, IDs seen before become None"""
+    field_indexes = [headers.index(h) for h in excel_fields(headers)]
+    id_index = headers.index(ID_COLUMN) if ID_COLUMN in headers else None
+    seen = set()
+    for row in rows:
+        record_id = row[id_index] if id_index is not None else None
+        record_id = int(record_id) if isinstance(record_id, (int, float)) and not isinstance(record_id, bool) else None
+        if record_id in seen:
+            record_id = None
+        seen.add(record_id)
+        yield record_id, [row[i] for i in field_indexes]
+
+def split_excel_rows(headers, rows):
+    """
+    Split the rows read from an Excel file into field values and record IDs
+    Returns (field names, [(record_id or None, values)]) in display order: by record ID if the file has them
+    (rows without one go last), otherwise by S.No. Duplicated IDs are treated as new rows.
+    """
+    fields = excel_fields(headers)
+    if ID_COLUMN in headers:
+        records = list(iter_excel_records(headers, rows))
+        # Files written by the app are already in record ID order
+        key = lambda record: (record[0] is None, record[0] or 0)
+        if any(key(a) > key(b) for a, b in zip(records, records[1:])):
+            records.sort(key=key)
+        return fields, records
+
+    field_indexes = [headers.index(h) for h in fields]
+    serial_index = headers.index(SERIAL_COLUMN) if SERIAL_COLUMN in headers else None
+    keys, records = [], []
+    for position, row in enumerate(rows, start=1):
+        serial = row[serial_index] if serial_index is not None else None
+        keys.append(serial if isinstance(serial, (int, float)) else position)
+        records.append((None, [row[i] for i in field_indexes]))
+    if any(a > b for a, b in zip(keys, keys[1:])):
+        order = sorted(range(len(records)), key=keys.__getitem__)
+        records = [records[i] for i in order]
+    return fields, records
+
+def excel_layout(fields, records):
+    """Lay out (record_id, values) records for an Excel file: S.No first, the record ID last (rows are generated lazily)"""
+    headers = [SERIAL_COLUMN] + list(fields) + [ID_COLUMN]
+    rows = ([serial_number] + list(values) + [record_id] for serial_number, (record_id, values) in enumerate(records, start=1))
+    return headers, rows
+
+def write_excel_temp(file_path, headers, rows):
+    """Write headers and rows to a temporary file next to an Excel file and return its path"""
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    if ID_COLUMN in headers:
+        # Record IDs are for the app, keep them out of the way
+        ws.column_dimensions[get_column_letter(headers.index(ID_COLUMN) + 1)].hidden = True
+    ws.append(list(headers))
+    for row in rows:
+        ws.append(list(row))
+    temp_path = os.path.join(directory, f".{os.path.basename(file_path)}.tmp")
+    wb.save(temp_path)
+    with open(temp_path, "rb+") as f:
+        os.fsync(f.fileno())
+    return temp_path
+
+def write_excel_rows(file_path, headers, rows):
+    """Write headers and rows to an Excel file, replacing it atomically"""
+    os.replace(write_excel_temp(file_path, headers, rows), file_path)
+
+def file_signature(file_path):
+    """Get [mtime_ns, size, inode] of a file (kept by os.replace), None if it does not exist"""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+def merge_changes(entries):
+    """
+    Fold (record_id, op) entries, oldest first, into {record_id: "insert" | "update" | "delete"}
+    A row inserted and then updated is still an insert; a row inserted and deleted again is left out.
+    """
+    changes = {}
+    for record_id, op in entries:
+        previous = changes.get(record_id)
+        if op == "delete" and previous == "insert":
+            del changes[record_id]
+        elif op != "update" or previous != "insert":
+            changes[record_id] = op
+    return changes
+
+def journal_paths(file_path):
+    """Get the journal and checkpoint files that go with an Excel file"""
+    base = os.path.splitext(file_path)[0]
+    return f"{base}.journal.jsonl", f"{base}.checkpoint.json"
+
+class StorageBackend:
+    """Interface shared by the storage engines"""
+
+    name = None
+
+    def exists(self, table):
+        """Check whether a table has any stored data"""
+        raise NotImplementedError
+
+    def signature(self, table):
+        """Get a value that changes whenever the table changes: (engine name, version)"""
+        return (self.name, self.version(table))
+
+    def version(self, table):
+        """Get the table's version, a number that goes up with every change"""
+        raise NotImplementedError
+
+    def changes_since(self, table, since):
+        """
+        Get the rows changed after a version: (current version, {record_id: "insert" | "update" | "delete"})
+        The changes are None when they are no longer known (too old, a column change or a reload from Excel).
+        """
+        raise NotImplementedError
+
+    def refresh(self, table):
+        """Pick up changes made to the table's Excel file outside the app"""
+        raise NotImplementedError
+
+    def headers(self, table):
+        """Get the column names of a table (S.No and the fields, not the record ID)"""
+        raise NotImplementedError
+
+    def read_frame(self, table):
+        """
+        Read a whole table as a DataFrame ordered by record ID (None if missing)
+        Columns are S.No (the row's position, 1..n), the fields and the record ID.
+        """
+        raise NotImplementedError
+
+    def get_row(self, table, record_id):
+        """Get a single row as a dict (None if not found)"""
+        raise NotImplementedError
+
+    def insert_rows(self, table, rows):
+        """Append rows (dicts keyed by column name) and return their new record IDs"""
+        raise NotImplementedError
+
+    def update_rows(self, table, updates):
+        """Apply {record_id: {column: value}} updates and return the number of rows found"""
+        raise NotImplementedError
+
+    def delete_rows(self, table, record_ids):
+        """Delete rows by record ID and return the number deleted (no other row changes)"""
+        raise NotImplementedError
+
+    def add_column(self, table, name):
+        """Add an empty column to a table"""
+        raise NotImplementedError
+
+    @staticmethod
+    def check_column_name(name):
+        """Refuse column names the storage engines use themselves"""
+        if str(name).strip().lower() in (SERIAL_COLUMN.lower(), ID_COLUMN.lower(), "id"):
+            raise Exception(f"'{name}' is a reserved column name")
+
+    def rename_column(self, table, old_name, new_name):
+        """Rename a column"""
+        raise NotImplementedError
+
+    def backup(self, table):
+        """Take a safety backup before a write, returns False if it failed"""
+        raise NotImplementedError
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes so they are committed together"""
+        raise NotImplementedError
+
+    def in_transaction(self):
+        """Check whether the current thread is inside a transaction"""
+        raise NotImplementedError
+
+    def import_excel(self, table, file_path=None):
+        """Replace a table with the contents of an Excel file"""
+        raise NotImplementedError
+
+    def export_excel(self, table, file_path=None, force=False):
+        """Write a table out to its Excel file"""
+        raise NotImplementedError
+
+    def export_all(self, force=False):
+        """Export every table that changed since it was last exported"""
+        for table in EXCEL_FILES:
+            if self.exists(table):
+                self.export_excel(table, force=force)
+
+    def needs_compaction(self, table):
+        """Check whether a table has pending changes big or old enough to fold into its Excel file"""
+        raise NotImplementedError
+
+    def compact(self, table, force=False):
+        """Fold pending changes into a table's Excel file, returns True if the file was rewritten"""
+        raise NotImplementedError
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite storage engine (WAL mode)
+    Each table's AUTOINCREMENT primary key is the record ID, so updates and deletes touch single rows;
+    S.No is not stored but computed from the row order when reading.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path=DATABASE_PATH, excel_files=None):
+        self.db_path = db_path
+        self.excel_files = dict(excel_files or EXCEL_FILES)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._checked_tables = set()
+        self._dirty_since = {}
+
+    def _connect(self):
+        """Get this thread's connection, creating it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+            conn.execute("CREATE TABLE IF NOT EXISTS change_log (tbl TEXT, version INTEGER, record_id INTEGER, op TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_change_log_version ON change_log (tbl, version)")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run the enclosed writes in one SQLite transaction (nested calls join the outer one)
+        The outermost transaction holds the shared write lock so Excel exports never see half a change.
+        """
+        conn = self._connect()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        with write_lock():
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+            finally:
+                self._local.depth = 0
+
+    def in_transaction(self):
+        return getattr(self._local, "depth", 0) > 0
+
+    def _get_meta(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self._connect().execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def _bump_version(self, table):
+        self._connect().execute(
+            "INSERT INTO meta (key, value) VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            (f"version:{table}",)
+        )
+
+    def _log_changes(self, table, op, record_ids):
+        """Bump the table's version and record the rows the change touched (inside a transaction)"""
+        self._bump_version(table)
+        conn = self._connect()
+        version = self._get_meta(f"version:{table}")
+        conn.executemany(
+            "INSERT INTO change_log (tbl, version, record_id, op) VALUES (?, ?, ?, ?)",
+            [(table, version, record_id, op) for record_id in record_ids]
+        )
+        # The log starts with the first change recorded and keeps the last CHANGE_LOG_VERSIONS versions
+        floor = self._get_meta(f"changes_floor:{table}")
+        if floor is None or floor < version - CHANGE_LOG_VERSIONS:
+            floor = version - 1 if floor is None else version - CHANGE_LOG_VERSIONS
+            conn.execute("DELETE FROM change_log WHERE tbl = ? AND version <= ?", (table, floor))
+            self._set_meta(f"changes_floor:{table}", floor)
+
+    def _reset_changes(self, table):
+        """Bump the table's version and drop its change log, so clients from before reload the table"""
+        self._bump_version(table)
+        self._connect().execute("DELETE FROM change_log WHERE tbl = ?", (table,))
+        self._set_meta(f"changes_floor:{table}", self._get_meta(f"version:{table}"))
+
+    def _table_exists(self, table):
+        row = self._connect().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        return row is not None
+
+    def _excel_signature(self, table):
+        file_path = self.excel_files.get(table)
+        if not file_path or not os.path.exists(file_path):
+            return None
+        stat = os.stat(file_path)
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _ensure_table(self, table, create=False):
+        """
+        Make sure a table is loaded: import it from Excel on first use, and re-import it
+        if the Excel file was edited outside the app while the database had no unexported changes
+        """
+        if table not in self._checked_tables:
+            with self._init_lock:
+                if table not in self._checked_tables:
+                    self._migrate_serial_column(table)
+                    self._sync_from_excel(table)
+                    self._checked_tables.add(table)
+        if create and not self._table_exists(table):
+            with self.transaction():
+                if not self._table_exists(table):
+                    self._create_table(table, DEFAULT_HEADERS[table])
+                    self._reset_changes(table)
+
+    def _migrate_serial_column(self, table):
+        """Rebuild tables from before record IDs, which stored (and renumbered) S.No, in S.No order"""
+        if not self._table_exists(table) or SERIAL_COLUMN not in self._columns(table):
+            return
+        fields = self._fields(table)
+        column_sql = "".join(f", {quote_identifier(f)}" for f in fields)
+        old_table = f"{table}_before_record_ids"
+        with self.transaction() as conn:
+            conn.execute(f"ALTER TABLE {quote_identifier(table)} RENAME TO {quote_identifier(old_table)}")
+            conn.execute(f"DROP INDEX IF EXISTS {quote_identifier(f'idx_{table}_serial')}")
+            self._create_table(table, fields)
+            conn.execute(
+                f"INSERT INTO {quote_identifier(table)} (id{column_sql}) "
+                f"SELECT ROW_NUMBER() OVER (ORDER BY {quote_identifier(SERIAL_COLUMN)}, id){column_sql} "
+                f"FROM {quote_identifier(old_table)}"
+            )
+            conn.execute(f"DROP TABLE {quote_identifier(old_table)}")
+            self._reset_changes(table)
+        print(f"[INFO] Moved '{table}' to stable record IDs")
+
+    def _sync_from_excel(self, table):
+        excel_signature = self._excel_signature(table)
+        if excel_signature is None:
+            return
+        if not self._table_exists(table):
+            self.import_excel(table)
+            return
+        if excel_signature == self._get_meta(f"synced_signature:{table}"):
+            return
+        if self._get_meta(f"version:{table}", 0) != self._get_meta(f"synced_version:{table}", 0):
+            print(f"[WARNING] {self.excel_files[table]} changed outside the app but the database has unexported changes; keeping the database copy")
+            return
+        print(f"[INFO] {self.excel_files[table]} changed outside the app, re-importing")
+        self.import_excel(table)
+
+    def _create_table(self, table, headers):
+        columns = [quote_identifier(h) for h in headers if h not in (SERIAL_COLUMN, ID_COLUMN)]
+        column_sql = "".join(f", {c}" for c in columns)
+        self._connect().execute(
+            f"CREATE TABLE {quote_identifier(table)} (id INTEGER PRIMARY KEY AUTOINCREMENT{column_sql})"
+        )
+
+    def _columns(self, table):
+        rows = self._connect().execute(f"PRAGMA table_info({quote_identifier(table)})").fetchall()
+        return [row[1] for row in rows]
+
+    def _fields(self, table):
+        """Get the stored field columns of a table (everything but the record ID and S.No)"""
+        return [c for c in self._columns(table) if c not in ("id", SERIAL_COLUMN)]
+
+    def exists(self, table):
+        self._ensure_table(table)
+        return self._table_exists(table)
+
+    def version(self, table):
+        self._ensure_table(table)
+        return self._get_meta(f"version:{table}", 0)
+
+    def changes_since(self, table, since):
+        self._ensure_table(table)
+        conn = self._connect()
+        # Read the version, the log's start and the log in one snapshot
+        nested = self.in_transaction()
+        if not nested:
+            conn.execute("BEGIN")
+        try:
+            version = self._get_meta(f"version:{table}", 0)
+            if since > version or since < self._get_meta(f"changes_floor:{table}", version):
+                return version, None
+            entries = conn.execute(
+                "SELECT record_id, op FROM change_log WHERE tbl = ? AND version > ? ORDER BY version",
+                (table, since)
+            ).fetchall()
+        finally:
+            if not nested:
+                conn.execute("COMMIT")
+        return version, merge_changes(entries)
+
+    def refresh(self, table):
+        self._ensure_table(table)
+        # Tables are only compared with their Excel file on first use, so look again
+        with self._init_lock:
+            self._sync_from_excel(table)
+
+    def headers(self, table):
+        self._ensure_table(table)
+        return [SERIAL_COLUMN] + self._fields(table)
+
+    def _iter_records(self, table, fields, where="", params=()):
+        """Stream (record_id, values) pairs in record ID order straight from the cursor"""
+        column_sql = "".join(f", {quote_identifier(f)}" for f in fields)
+        cursor = self._connect().execute(
+            f"SELECT id{column_sql} FROM {quote_identifier(table)} {where} ORDER BY id", params
+        )
+        for row in cursor:
+            yield row[0], row[1:]
+
+    def read_frame(self, table):
+        if not self.exists(table):
+            return None
+        fields = self._fields(table)
+        column_sql = "".join(f", {quote_identifier(f)}" for f in fields)
+        rows = self._connect().execute(f"SELECT id{column_sql} FROM {quote_identifier(table)} ORDER BY id").fetchall()
+        df = pd.DataFrame(rows, columns=[ID_COLUMN] + fields)
+        df.insert(0, SERIAL_COLUMN, range(1, len(df) + 1))
+        return df[[SERIAL_COLUMN] + fields + [ID_COLUMN]]
+
+    def get_row(self, table, record_id):
+        if not self.exists(table):
+            return None
+        fields = self._fields(table)
+        records = list(self._iter_records(table, fields, "WHERE id = ?", (int(record_id),)))
+        if not records:
+            return None
+        serial_number = self._connect().execute(
+            f"SELECT COUNT(*) FROM {quote_identifier(table)} WHERE id <= ?", (int(record_id),)
+        ).fetchone()[0]
+        return {SERIAL_COLUMN: serial_number, **dict(zip(fields, records[0][1])), ID_COLUMN: records[0][0]}
+
+    def insert_rows(self, table, rows):
+        self._ensure_table(table, create=True)
+        with self.transaction() as conn:
+            fields = self._fields(table)
+            if fields:
+                sql = (
+                    f"INSERT INTO {quote_identifier(table)} ({', '.join(quote_identifier(f) for f in fields)}) "
+                    f"VALUES ({', '.join('?' for _ in fields)})"
+                )
+            else:
+                sql = f"INSERT INTO {quote_identifier(table)} DEFAULT VALUES"
+            record_ids = []
+            for row in rows:
+                cursor = conn.execute(sql, [to_storage_value(row.get(f)) for f in fields])
+                record_ids.append(cursor.lastrowid)
+            self._log_changes(table, "insert", record_ids)
+        return record_ids
+
+    def update_rows(self, table, updates):
+        if not self.exists(table):
+            return 0
+        with self.transaction() as conn:
+            columns = set(self._fields(table))
+            found = 0
+            updated = []
+            for record_id, fields in updates.items():
+                record_id = int(record_id)
+                fields = {k: v for k, v in fields.items() if k in columns}
+                if fields:
+                    assignments = ", ".join(f"{quote_identifier(k)} = ?" for k in fields)
+                    cursor = conn.execute(
+                        f"UPDATE {quote_identifier(table)} SET {assignments} WHERE id = ?",
+                        [to_storage_value(v) for v in fields.values()] + [record_id]
+                    )
+                    found += cursor.rowcount
+                    if cursor.rowcount:
+                        updated.append(record_id)
+                elif conn.execute(f"SELECT 1 FROM {quote_identifier(table)} WHERE id = ?", (record_id,)).fetchone():
+                    found += 1
+            self._log_changes(table, "update", updated)
+        return found
+
+    def delete_rows(self, table, record_ids):
+        if not self.exists(table):
+            return 0
+        with self.transaction() as conn:
+            deleted = []
+            for record_id in {int(r) for r in record_ids}:
+                if conn.execute(f"DELETE FROM {quote_identifier(table)} WHERE id = ?", (record_id,)).rowcount:
+                    deleted.append(record_id)
+            self._log_changes(table, "delete", deleted)
+        return len(deleted)
+
+    def add_column(self, table, name):
+        self.check_column_name(name)
+        self._ensure_table(table, create=True)
+        with self.transaction() as conn:
+            conn.execute(f"ALTER TABLE {quote_identifier(table)} ADD COLUMN {quote_identifier(name)}")
+            self._reset_changes(table)
+
+    def rename_column(self, table, old_name, new_name):
+        self.check_column_name(new_name)
+        self._ensure_table(table)
+        with self.transaction() as conn:
+            conn.execute(
+                f"ALTER TABLE {quote_identifier(table)} RENAME COLUMN {quote_identifier(old_name)} TO {quote_identifier(new_name)}"
+            )
+            self._reset_changes(table)
+
+    def backup(self, table):
+        # Writes are transactional; the Excel backups are taken when a table is exported
+        return True
+
+    def import_excel(self, table, file_path=None):
+        file_path = file_path or self.excel_files[table]
+        with open_excel_rows(file_path) as (headers, rows), self.transaction() as conn:
+            if not headers:
+                headers = list(DEFAULT_HEADERS[table])
+            fields = excel_fields(headers)
+            # Keep the ID sequence so IDs of rows deleted before the import are never handed out again
+            sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone() \
+                if self._table_exists("sqlite_sequence") else None
+            conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(table)}")
+            self._create_table(table, fields)
+            if sequence:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, sequence[0]))
+            columns = ["id"] + fields
+            sql = (
+                f"INSERT INTO {quote_identifier(table)} ({', '.join(quote_identifier(c) for c in columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})"
+            )
+            if ID_COLUMN in headers:
+                # Stream the rows straight from the sheet; rows without an ID go in last and get new ones
+                new_rows = []
+
+                def rows_with_ids():
+                    for record_id, values in iter_excel_records(headers, rows):
+                        if record_id is None:
+                            new_rows.append(values)
+                        else:
+                            yield [record_id] + values
+
+                conn.executemany(sql, rows_with_ids())
+                conn.executemany(sql, ([None] + values for values in new_rows))
+            else:
+                # Files without record IDs are ordered by S.No, which needs every row first
+                conn.executemany(sql, ([record_id] + values for record_id, values in split_excel_rows(headers, rows)[1]))
+            count = conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(table)}").fetchone()[0]
+            self._reset_changes(table)
+            if file_path == self.excel_files[table]:
+                self._set_meta(f"synced_signature:{table}", self._excel_signature(table))
+                self._set_meta(f"synced_version:{table}", self._get_meta(f"version:{table}", 0))
+        print(f"[SUCCESS] Imported {count} rows into '{table}' from {file_path}")
+        return count
+
+    def export_excel(self, table, file_path=None, force=False):
+        if not self.exists(table):
+            return False
+        target = file_path or self.excel_files[table]
+        is_live_file = target == self.excel_files[table]
+        # Hold the write lock so no other process writes between reading the rows and recording the export
+        with write_lock():
+            version = self._get_meta(f"version:{table}", 0)
+            if is_live_file and not force and version == self._get_meta(f"synced_version:{table}") \
+                    and self._excel_signature(table) == self._get_meta(f"synced_signature:{table}"):
+                return False
+
+            if is_live_file and os.path.exists(target):
+                # The backup itself is taken later by the backup worker
+                if not get_backup_worker().preserve(target):
+                    raise Exception("Failed to create backup")
+            # Rows go from the cursor to the write-only workbook one at a time
+            fields = self._fields(table)
+            headers, rows = excel_layout(fields, self._iter_records(table, fields))
+            write_excel_rows(target, headers, rows)
+            count = self._connect().execute(f"SELECT COUNT(*) FROM {quote_identifier(table)}").fetchone()[0]
+            if is_live_file:
+                with self.transaction():
+                    self._set_meta(f"synced_signature:{table}", self._excel_signature(table))
+                    self._set_meta(f"synced_version:{table}", version)
+        print(f"[SUCCESS] Exported {count} rows from '{table}' to {target}")
+        return True
+
+    def needs_compaction(self, table):
+        # The WAL already makes writes durable, so only the time since the first unexported change matters
+        if not self.exists(table) or \
+                self._get_meta(f"version:{table}", 0) == self._get_meta(f"synced_version:{table}", 0):
+            self._dirty_since.pop(table, None)
+            return False
+        since = self._dirty_since.setdefault(table, time.time())
+        return time.time() - since >= COMPACT_INTERVAL
+
+    def compact(self, table, force=False):
+        self._dirty_since.pop(table, None)
+        return self.export_excel(table, force=force)
+
+class JournalTable:
+    """In-memory copy of one table: its Excel snapshot with the journal records applied on top"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.journal_path, self.checkpoint_path = journal_paths(file_path)
+        self.fields = []
+        self._rows = []           # [record_id, *values] in record ID order
+        self.columnar = None      # columnar snapshot the rows have not been built from yet
+        self.next_id = 1          # record ID the next inserted row gets
+        self.seq = 0              # last journal record applied
+        self.base_seq = 0         # last journal record already folded into the snapshot
+        self.offset = 0           # bytes of the journal read so far
+        self.snapshot = None      # signature of the snapshot the rows were loaded from
+        self.checkpoint = None    # signature of the checkpoint file last read
+        self.generation = 0       # bumped every time the table is reloaded from disk
+        self.version = 0          # goes up with every record applied and every reload
+        self.changes = deque()    # (version, op, record IDs) of the row changes after changes_floor
+        self.changes_floor = 0    # oldest version changes can be listed from
+        self.pending_since = None
+        self.loaded = False
+
+    @property
+    def rows(self):
+        """The rows, built from the columnar snapshot the first time they are needed"""
+        if self.columnar is not None:
+            self._rows, self.columnar = self.columnar.rows(), None
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows):
+        self._rows, self.columnar = rows, None
+
+    def log_change(self, op, record_ids):
+        """Bump the version and record the rows a change touched"""
+        self.version += 1
+        self.changes.append((self.version, op, record_ids))
+        if len(self.changes) > CHANGE_LOG_VERSIONS:
+            self.changes_floor = self.changes.popleft()[0]
+
+    def reset_changes(self):
+        """Bump the version and forget the row changes, so clients from before reload the table"""
+        # Versions restart above the clock, so a version handed out before a restart is never taken for a current one
+        self.version = max(self.version + 1, time.time_ns() // 1_000_000)
+        self.changes.clear()
+        self.changes_floor = self.version
+
+    def find(self, record_id):
+        """Get the index of the row with a record ID (None if not found)"""
+        # Binary search on the record IDs (bisect only takes a key function from Python 3.10)
+        rows = self.rows
+        low, high = 0, len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            if rows[middle][0] < record_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(rows) and rows[low][0] == record_id:
+            return low
+        return None
+
+    def snapshot_layout(self):
+        """
+        Copy the rows and lay them out for an Excel file (call with the backend lock held)
+        Returns (headers, layout rows generator, copied rows); the layout is built while writing.
+        """
+        rows = [list(row) for row in self.rows]
+        headers, layout = excel_layout(self.fields, ((row[0], row[1:]) for row in rows))
+        return headers, layout, rows
+
+class ExcelBackend(StorageBackend):
+    """
+    Excel storage engine: each .xlsx file is a snapshot, and writes are appended to an fsync'd
+    journal next to it (data/<name>.journal.jsonl) instead of rewriting the workbook.
+    The journal is folded back into the .xlsx file by compact() once it grows or ages.
+    """
+
+    name = "excel"
+
+    def __init__(self, excel_files=None):
+        self.excel_files = dict(excel_files or EXCEL_FILES)
+        self._tables = {}
+        self._pending = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Apply the enclosed writes in memory and append them to the journal as one record at the end
+        The shared write lock is held throughout, so the rows read inside are current across processes.
+        """
+        with self._lock, write_lock():
+            depth = getattr(self._local, "depth", 0)
+            self._local.depth = depth + 1
+            try:
+                yield self
+                if depth == 0:
+                    for table, records in self._pending.items():
+                        self._append(self._tables[table], records)
+            except BaseException:
+                if depth == 0:
+                    # Roll back by reloading the changed tables from disk
+                    for table in self._pending:
+                        self._tables[table].loaded = False
+                raise
+            finally:
+                self._local.depth = depth
+                if depth == 0:
+                    self._pending = {}
+
+    def in_transaction(self):
+        return getattr(self._local, "depth", 0) > 0
+
+    def _table(self, table):
+        """Get the in-memory copy of a table, catching up with changes made by other processes"""
+        with self._lock:
+            state = self._tables.get(table)
+            if state is None:
+                state = self._tables[table] = JournalTable(self.excel_files[table])
+            # Tables with unsaved writes in the current transaction are already up to date
+            if table not in self._pending:
+                self._refresh(state)
+            return state
+
+    def _refresh(self, state):
+        journal = file_signature(state.journal_path)
+        journal_size = journal[1] if journal else 0
+        if not state.loaded or file_signature(state.checkpoint_path) != state.checkpoint or journal_size < state.offset:
+            self._load(state)
+        elif file_signature(state.file_path) != state.snapshot:
+            print(f"[INFO] {state.file_path} changed outside the app, reloading")
+            self._load(state)
+        elif journal_size > state.offset:
+            self._replay(state)
+
+    def _load(self, state):
+        """Load the snapshot and replay the journal records that are not in it yet"""
+        checkpoint = None
+        if os.path.exists(state.checkpoint_path):
+            with open(state.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        snapshot = file_signature(state.file_path)
+
+        base_seq = 0
+        external_edit = False
+        if checkpoint:
+            previous = checkpoint.get("previous") or {}
+            if checkpoint["snapshot"] == snapshot:
+                base_seq = checkpoint["seq"]
+            elif previous and previous.get("snapshot") == snapshot:
+                # A compaction stopped before replacing the snapshot
+                base_seq = previous["seq"]
+            else:
+                base_seq = checkpoint["seq"]
+                external_edit = True
+
+        # IDs of rows deleted since the last compaction must not be handed out again
+        state.next_id = checkpoint.get("next_id", 1) if checkpoint else 1
+        if snapshot is not None:
+            # Use the columnar snapshot of the workbook if it is fresh, otherwise parse the xlsx and write one
+            checksum = file_checksum(state.file_path)
+            columnar = read_snapshot(state.file_path, checksum)
+            if columnar is not None:
+                state.fields, state.columnar = columnar.fields, columnar
+                if len(columnar):
+                    state.next_id = max(state.next_id, columnar.last_record_id() + 1)
+            else:
+                with open_excel_rows(state.file_path) as (headers, rows):
+                    self._set_rows(state, headers, rows)
+                self._save_snapshot(state.file_path, checksum, state.fields, state.rows)
+        else:
+            self._set_rows(state, [], [])
+        state.seq = state.base_seq = base_seq
+        state.offset = 0
+        state.snapshot = snapshot
+        state.checkpoint = file_signature(state.checkpoint_path)
+        state.generation += 1
+        state.pending_since = None
+        state.loaded = True
+        replayed = self._replay(state)
+        state.reset_changes()
+        if external_edit and replayed:
+            print(f"[WARNING] {state.file_path} was edited outside the app with {replayed} journal records pending; they were applied on top of it")
+
+    def _set_rows(self, state, headers, rows):
+        """
+        Replace the in-memory rows with rows streamed from an Excel file
+        Rows without a record ID (e.g. added in Excel) get a new one.
+        """
+        if not headers:
+            table = next(table for table, path in self.excel_files.items() if path == state.file_path)
+            headers = list(DEFAULT_HEADERS[table])
+        fields, records = split_excel_rows(headers, rows)
+        state.next_id = max(state.next_id, max((record_id + 1 for record_id, _ in records if record_id is not None), default=1))
+        state.rows = []
+        for record_id, values in records:
+            if record_id is None:
+                record_id = state.next_id
+                state.next_id += 1
+            # Reuse the value list rather than copying every row
+            values.insert(0, record_id)
+            state.rows.append(values)
+        state.fields = fields
+
+    def _save_snapshot(self, file_path, checksum, fields, rows):
+        """Write the columnar snapshot of an Excel file; a failure only costs the next load a full parse"""
+        try:
+            write_snapshot(file_path, checksum, fields, rows)
+        except Exception as e:
+            print(f"[WARNING] Could not write the snapshot of {file_path}: {str(e)}")
+
+    def _replay(self, state):
+        """Apply journal records appended since the last read, returns how many were applied"""
+        if not os.path.exists(state.journal_path):
+            return 0
+        with open(state.journal_path, "rb") as f:
+            f.seek(state.offset)
+            data = f.read()
+        # Only complete lines; a torn final line is left for the next read
+        end = data.rfind(b"\n") + 1
+        applied = 0
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"[WARNING] Skipping damaged record in {state.journal_path}")
+                continue
+            for item in record["records"] if record["op"] == "batch" else [record]:
+                if item["seq"] > state.seq:
+                    self._apply(state, item)
+                    state.seq = item["seq"]
+                    applied += 1
+        state.offset += end
+        if applied and state.pending_since is None:
+            state.pending_since = time.time()
+        return applied
+
+    def _append(self, state, records):
+        """Append records to the journal as one line and fsync it"""
+        record = records[0] if len(records) == 1 else {"seq": records[-1]["seq"], "op": "batch", "records": records}
+        line = (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+        os.makedirs(os.path.dirname(state.journal_path) or ".", exist_ok=True)
+        with open(state.journal_path, "ab+") as f:
+            start = f.seek(0, os.SEEK_END)
+            if start:
+                # Never append to a torn line left by a crash
+                f.seek(start - 1)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            end = f.tell()
+        if start != state.offset:
+            # Another process wrote in the meantime, re-read everything on the next access
+            state.loaded = False
+        state.offset = end
+        if state.pending_since is None:
+            state.pending_since = time.time()
+
+    def _apply(self, state, record):
+        """Apply one journal record to the in-memory rows and return its result"""
+        op = record["op"]
+        fields, rows = state.fields, state.rows
+        if op == "insert":
+            # Journals from before record IDs list serial numbers; those rows get the next IDs
+            record_ids = record.get("ids") or list(range(state.next_id, state.next_id + len(record["rows"])))
+            for record_id, values in zip(record_ids, record["rows"]):
+                rows.append([record_id] + [values.get(f) for f in fields])
+            state.next_id = max(state.next_id, record_ids[-1] + 1) if record_ids else state.next_id
+            state.log_change("insert", record_ids)
+            return record_ids
+        if op == "update":
+            if "changes" in record:
+                indexes = [(state.find(int(record_id)), changes) for record_id, changes in record["changes"].items()]
+            else:
+                # Serial numbers from before record IDs were the row positions
+                indexes = [(int(s) - 1 if 0 < int(s) <= len(rows) else None, changes) for s, changes in record["updates"].items()]
+            updated = []
+            for index, changes in indexes:
+                if index is None:
+                    continue
+                updated.append(rows[index][0])
+                for field_name, value in changes.items():
+                    if field_name in fields:
+                        rows[index][fields.index(field_name) + 1] = value
+            state.log_change("update", updated)
+            return len(updated)
+        if op == "delete":
+            if "ids" in record:
+                indexes = {state.find(int(record_id)) for record_id in record["ids"]}
+            else:
+                indexes = {int(s) - 1 for s in record["serials"] if 0 < int(s) <= len(rows)}
+            indexes.discard(None)
+            deleted = [rows[index][0] for index in indexes]
+            # Highest first so deleting a row does not shift the ones still to delete
+            for index in sorted(indexes, reverse=True):
+                del rows[index]
+            state.log_change("delete", deleted)
+            return len(indexes)
+        if op == "add_column":
+            fields.append(record["name"])
+            for row in rows:
+                row.append(None)
+            state.reset_changes()
+            return None
+        if op == "rename_column":
+            fields[fields.index(record["old"])] = record["new"]
+            state.reset_changes()
+            return None
+        raise Exception(f"Unknown journal record: {op}")
+
+    def _write(self, table, record):
+        """Apply a change in memory and queue its journal record for the end of the transaction"""
+        with self.transaction():
+            state = self._table(table)
+            record = {"seq": state.seq + 1, **record}
+            result = self._apply(state, record)
+            state.seq = record["seq"]
+            self._pending.setdefault(table, []).append(record)
+            return result
+
+    def exists(self, table):
+        if os.path.exists(self.excel_files[table]):
+            return True
+        journal = file_signature(journal_paths(self.excel_files[table])[0])
+        return bool(journal and journal[1])
+
+    def version(self, table):
+        return self._table(table).version
+
+    def changes_since(self, table, since):
+        with self._lock:
+            state = self._table(table)
+            if since > state.version or since < state.changes_floor:
+                return state.version, None
+            entries = [
+                (record_id, op)
+                for version, op, record_ids in state.changes if version > since
+                for record_id in record_ids
+            ]
+            return state.version, merge_changes(entries)
+
+    def refresh(self, table):
+        # Every access already compares the snapshot and the journal with the files
+        self._table(table)
+
+    def headers(self, table):
+        return [SERIAL_COLUMN] + self._table(table).fields
+
+    def read_frame(self, table):
+        if not self.exists(table):
+            return None
+        with self._lock:
+            state = self._table(table)
+            if state.columnar is not None:
+                df = state.columnar.frame([ID_COLUMN] + state.fields)
+            else:
+                df = pd.DataFrame(state.rows, columns=[ID_COLUMN] + state.fields)
+        df.insert(0, SERIAL_COLUMN, range(1, len(df) + 1))
+        return df[[SERIAL_COLUMN] + list(df.columns[2:]) + [ID_COLUMN]]
+
+    def get_row(self, table, record_id):
+        if not self.exists(table):
+            return None
+        with self._lock:
+            state = self._table(table)
+            index = state.find(int(record_id))
+            if index is None:
+                return None
+            row = state.rows[index]
+            return {SERIAL_COLUMN: index + 1, **dict(zip(state.fields, row[1:])), ID_COLUMN: row[0]}
+
+    def insert_rows(self, table, rows):
+        with self.transaction():
+            state = self._table(table)
+            record_ids = list(range(state.next_id, state.next_id + len(rows)))
+            values = [{k: to_storage_value(v) for k, v in row.items()} for row in rows]
+            return self._write(table, {"op": "insert", "ids": record_ids, "rows": values})
+
+    def update_rows(self, table, updates):
+        changes = {
+            str(int(record_id)): {k: to_storage_value(v) for k, v in fields.items()}
+            for record_id, fields in updates.items()
+        }
+        return self._write(table, {"op": "update", "changes": changes})
+
+    def delete_rows(self, table, record_ids):
+        return self._write(table, {"op": "delete", "ids": [int(r) for r in record_ids]})
+
+    def add_column(self, table, name):
+        self.check_column_name(name)
+        self._write(table, {"op": "add_column", "name": name})
+
+    def rename_column(self, table, old_name, new_name):
+        self.check_column_name(new_name)
+        self._write(table, {"op": "rename_column", "old": old_name, "new": new_name})
+
+    def backup(self, table):
+        # Journal records are durable; the Excel backups are taken when the journal is compacted
+        return True
+
+    def needs_compaction(self, table):
+        if not self.exists(table):
+            return False
+        state = self._table(table)
+        if state.seq == state.base_seq:
+            return False
+        pending_since = state.pending_since or time.time()
+        return state.offset >= COMPACT_JOURNAL_BYTES or time.time() - pending_since >= COMPACT_INTERVAL
+
+    def compact(self, table, force=False):
+        """
+        Fold the journal into the Excel file
+        The rows are written out without holding the lock, so writes made meanwhile stay in the journal.
+        """
+        with self._lock:
+            state = self._table(table)
+            if state.seq == state.base_seq and not force:
+                return False
+            headers, layout, rows = state.snapshot_layout()
+            fields = list(state.fields)
+            seq, offset, generation, next_id = state.seq, state.offset, state.generation, state.next_id
+
+        temp_path = write_excel_temp(state.file_path, headers, layout)
+        checksum = file_checksum(temp_path)
+        try:
+            with self._lock, write_lock():
+                if table in self._pending or state.generation != generation:
+                    # Reloaded or mid-transaction meanwhile, try again later
+                    return False
+                self._refresh(state)
+                if state.generation != generation:
+                    return False
+                if os.path.exists(state.file_path) and not get_backup_worker().preserve(state.file_path):
+                    raise Exception("Failed to create backup")
+
+                # Point the checkpoint at the new snapshot first; its signature survives os.replace
+                checkpoint = {
+                    "seq": seq,
+                    "next_id": next_id,
+                    "snapshot": file_signature(temp_path),
+                    "previous": {"seq": state.base_seq, "snapshot": state.snapshot},
+                }
+                checkpoint_temp = state.checkpoint_path + ".tmp"
+                with open(checkpoint_temp, "w", encoding="utf-8") as f:
+                    json.dump(checkpoint, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(checkpoint_temp, state.checkpoint_path)
+                os.replace(temp_path, state.file_path)
+
+                # Keep only the records written after the snapshot was taken (no journal: nothing written yet)
+                tail = b""
+                if os.path.exists(state.journal_path):
+                    with open(state.journal_path, "rb") as f:
+                        f.seek(offset)
+                        tail = f.read()
+                journal_temp = state.journal_path + ".tmp"
+                with open(journal_temp, "wb") as f:
+                    f.write(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(journal_temp, state.journal_path)
+
+                state.base_seq = seq
+                state.snapshot = checkpoint["snapshot"]
+                state.checkpoint = file_signature(state.checkpoint_path)
+                state.offset = len(tail)
+                state.pending_since = time.time() if state.seq != seq else None
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        # The next process start loads the new snapshot instead of parsing the workbook
+        self._save_snapshot(state.file_path, checksum, fields, rows)
+        print(f"[SUCCESS] Compacted '{table}' into {state.file_path} ({len(rows)} rows)")
+        return True
+
+    def import_excel(self, table, file_path=None):
+        if not file_path or file_path == self.excel_files[table]:
+            return 0
+        with self._lock, write_lock(), open_excel_rows(file_path) as (headers, rows):
+            # Replace the rows in memory, then fold them (and the journal) into the snapshot
+            state = self._table(table)
+            self._set_rows(state, headers, rows)
+            state.seq += 1
+            state.generation += 1
+            state.reset_changes()
+            try:
+                if not self.compact(table, force=True):
+                    raise Exception("Failed to write the imported rows")
+            except Exception:
+                state.loaded = False
+                raise
+        print(f"[SUCCESS] Imported {len(state.rows)} rows into '{table}' from {file_path}")
+        return len(state.rows)
+
+    def export_excel(self, table, file_path=None, force=False):
+        if file_path and file_path != self.excel_files[table]:
+            if not self.exists(table):
+                return False
+            with self._lock:
+                state = self._table(table)
+                headers, rows, _ = state.snapshot_layout()
+            write_excel_rows(file_path, headers, rows)
+            return True
+        # The Excel file is the snapshot, exporting it means folding the journal in
+        return self.compact(table, force=force)
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def get_storage():
+    """Get the configured storage backend (created once per process)"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if STORAGE_BACKEND == "excel":
+                    _storage = ExcelBackend()
+                elif STORAGE_BACKEND == "sqlite":
+                    _storage = SQLiteBackend()
+                else:
+                    raise Exception(f"Unknown storage backend: {STORAGE_BACKEND}")
+    return _storage
+
+if __name__ == "__main__":
+    # python utils/storage.py [export|import] [collection|preorders]
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    tables = [sys.argv[2]] if len(sys.argv) > 2 else list(EXCEL_FILES)
+    storage = get_storage()
+    print(f"Storage backend: {storage.name}")
+    for table in tables:
+        if command == "export":
+            storage.export_excel(table, force=True)
+        elif command == "import":
+            storage.import_excel(table)
+        else:
+            print(f"[ERROR] Unknown command: {command} (use 'export' or 'import')")
+            sys.exit(1)
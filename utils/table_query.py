@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Table Queries
+Server-side sorting, filtering and keyset pagination over the cached tables
+"""
+
+import os
+import sys
+import json
+import base64
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.storage import SERIAL_COLUMN, ID_COLUMN
+
+# Largest page size a client can ask for
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(sort, key, record_id):
+    """Encode the position after a row as an opaque cursor string"""
+    payload = json.dumps({"sort": sort, "key": key, "id": record_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """Decode a cursor string back into (sort, key, record_id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return payload["sort"], payload["key"], int(payload["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def parse_sort(sort, columns):
+    """Parse a sort spec like 'Series' or '-Series' into (column, descending)"""
+    sort = sort or SERIAL_COLUMN
+    descending = sort.startswith("-")
+    column = sort[1:] if descending else sort
+    if column not in columns:
+        raise ValueError(f"Unknown sort column: {column}")
+    return column, descending
+
+class SortIndex:
+    """
+    Row positions of a table pre-sorted by one column, ties broken by record ID
+    Cursors hold the record ID rather than the serial number, which shifts when an earlier row is deleted.
+    """
+
+    def __init__(self, df, column):
+        # S.No follows the record ID order but changes on delete, so sort by the ID itself
+        values = df[ID_COLUMN if column == SERIAL_COLUMN else column]
+        self.numeric = pd.api.types.is_numeric_dtype(values)
+        if self.numeric:
+            self.keys = values.to_numpy(dtype=float)
+        else:
+            self.keys = values.astype(str).str.lower().to_numpy(dtype=str)
+        self.ids = df[ID_COLUMN].to_numpy()
+        # Rows are stored in record ID order, so a stable sort keeps ties ordered by record ID
+        self.order = np.argsort(self.keys, kind="stable")
+        self.sorted_keys = self.keys[self.order]
+        self.sorted_ids = self.ids[self.order]
+
+    def key_at(self, position):
+        """Get the JSON-friendly sort key of the row at a position"""
+        key = self.keys[position]
+        return float(key) if self.numeric else str(key)
+
+    def positions(self, descending=False, after=None):
+        """Get row positions in sort order, starting after an optional (key, record_id) cursor"""
+        if after is None:
+            return self.order[::-1] if descending else self.order
+
+        key, record_id = after
+        key = float(key) if self.numeric else str(key)
+        # Rows with the same key form a run ordered by record ID
+        left = np.searchsorted(self.sorted_keys, key, side="left")
+        right = np.searchsorted(self.sorted_keys, key, side="right")
+        run = self.sorted_ids[left:right]
+        if descending:
+            end = left + np.searchsorted(run, record_id, side="left")
+            return self.order[:end][::-1]
+        start = left + np.searchsorted(run, record_id, side="right")
+        return self.order[start:]
+
+class TableQuery:
+    """Sort indexes and lowercase text columns for one version of a table, built lazily"""
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = df.columns.tolist()
+        self._sort_indexes = {}
+        self._text_columns = {}
+        self._lock = threading.Lock()
+
+    def sort_index(self, column):
+        """Get (building on first use) the sort index for a column"""
+        with self._lock:
+            index = self._sort_indexes.get(column)
+            if index is None:
+                index = SortIndex(self.df, column)
+                self._sort_indexes[column] = index
+            return index
+
+    def text_column(self, column):
+        """Get (building on first use) a lowercase string copy of a column for filtering"""
+        with self._lock:
+            values = self._text_columns.get(column)
+            if values is None:
+                values = self.df[column].astype(str).str.lower()
+                self._text_columns[column] = values
+            return values
+
+    def filter_mask(self, filters=None, search=""):
+        """Build a boolean mask for per-column filters and a free-text search (None if no filtering)"""
+        mask = None
+        for column, value in (filters or {}).items():
+            if column not in self.columns:
+                raise ValueError(f"Unknown filter column: {column}")
+            if value == "":
+                continue
+            column_mask = self.text_column(column).str.contains(value.lower(), regex=False).to_numpy()
+            mask = column_mask if mask is None else mask & column_mask
+        if search:
+            search_mask = np.zeros(len(self.df), dtype=bool)
+            for column in self.df.select_dtypes(include=["object"]).columns:
+                search_mask |= self.text_column(column).str.contains(search.lower(), regex=False).to_numpy()
+            mask = search_mask if mask is None else mask & search_mask
+        return mask
+
+    def page(self, limit=None, cursor=None, sort=None, filters=None, search="", mask=None):
+        """
+        Get one page of rows
+        Returns (rows, total_matching, next_cursor). Without a limit every matching row is returned.
+        """
+        sort = sort or SERIAL_COLUMN
+        column, descending = parse_sort(sort, self.columns)
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        after = None
+        if cursor:
+            cursor_sort, key, record_id = decode_cursor(cursor)
+            if cursor_sort != sort:
+                raise ValueError("Cursor does not match the requested sort")
+            after = (key, record_id)
+
+        index = self.sort_index(column)
+        positions = index.positions(descending, after)
+
+        filter_mask = self.filter_mask(filters, search)
+        if mask is not None:
+            filter_mask = mask if filter_mask is None else filter_mask & mask
+        if filter_mask is None:
+            total_matching = len(self.df)
+        else:
+            total_matching = int(filter_mask.sum())
+            positions = positions[filter_mask[positions]]
+
+        next_cursor = None
+        if limit is not None and len(positions) > limit:
+            positions = positions[:limit]
+            last = positions[-1]
+            next_cursor = encode_cursor(sort, index.key_at(last), int(index.ids[last]))
+
+        rows = self.df.iloc[positions].to_dict("records")
+        return rows, total_matching, next_cursor
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Worker Pool
+Bounded thread pool that runs blocking pandas/storage reads off the web server's event loop
+"""
+
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of worker threads serving reads
+WORKER_THREADS = max(1, int(os.environ.get("DIECAST_WORKERS", 4)))
+
+class WorkerPool:
+    """
+    Thread pool that keeps count of waiting and running jobs
+    Threads (not processes) so every worker shares the cached tables and their indexes.
+    """
+
+    def __init__(self, workers=WORKER_THREADS):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="diecast-worker")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._peak_queued = 0
+
+    def submit(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on a worker thread, returns a Future"""
+        def task():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        with self._lock:
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+        future = self._executor.submit(task)
+        # A job cancelled before it started never runs task(), so take it off the queue here
+        future.add_done_callback(lambda f: f.cancelled() and self._cancelled())
+        return future
+
+    def _cancelled(self):
+        with self._lock:
+            self._queued -= 1
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking call on the pool and wait for it without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def stats(self):
+        """Get the pool size and how many jobs are waiting, running and done"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "peak_queue_depth": self._peak_queued,
+            }
+
+    def shutdown(self):
+        """Wait for running jobs and stop the worker threads"""
+        self._executor.shutdown(wait=True)
+
+_worker_pool = WorkerPool()
+
+def get_worker_pool():
+    """Get the shared worker pool"""
+    return _worker_pool
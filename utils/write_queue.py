@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+DieCastTracker - Write Queue
+Single writer thread for the web app; mutations that arrive close together are saved in one transaction
+"""
+
+import os
+import sys
+import queue
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.collection_store import write_batch
+from utils.change_events import get_change_events
+
+# How long the writer waits for more mutations to join a batch, in seconds
+BATCH_WINDOW = float(os.environ.get("DIECAST_WRITE_BATCH_WINDOW", 0.005))
+
+# Most mutations saved in one batch
+MAX_BATCH = 100
+
+class WriteQueue:
+    """
+    Runs queued mutations one at a time on a dedicated thread
+    Jobs queued within BATCH_WINDOW of each other share one transaction; if any of them fails,
+    the batch is rolled back and each job is re-run on its own so only the failing one reports an error.
+    """
+
+    def __init__(self, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) and return a Future for its result"""
+        self.start()
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    async def run(self, func, *args, **kwargs):
+        """Queue a mutation and wait for its result without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def depth(self):
+        """Number of mutations waiting for the writer thread"""
+        return self._queue.qsize()
+
+    def _next_batch(self, job):
+        batch = [job]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            try:
+                job = self._queue.get(timeout=max(deadline - time.monotonic(), 0)) \
+                    if self.batch_window > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                # Stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(job)
+        return batch
+
+    def _run_batch(self, batch):
+        jobs = [job for job in batch if job[0].set_running_or_notify_cancel()]
+        if len(jobs) > 1:
+            try:
+                with write_batch():
+                    results = [func(*args, **kwargs) for _, func, args, kwargs in jobs]
+            except Exception:
+                pass
+            else:
+                for (future, _, _, _), result in zip(jobs, results):
+                    future.set_result(result)
+                return
+
+        for future, func, args, kwargs in jobs:
+            try:
+                with write_batch():
+                    result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._run_batch(self._next_batch(job))
+            # Tell the open pages now instead of at the watcher's next check
+            get_change_events().check()
+
+    def start(self):
+        """Start the writer thread (done automatically by submit)"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="diecast-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Finish the queued mutations and stop the writer thread"""
+        with self._start_lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+
+_write_queue = WriteQueue()
+
+def get_write_queue():
+    """Get the shared write queue"""
+    return _write_queue